@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.utils import timezone
+
+
+class ContentStatsSnapshotManager(models.Manager):
+    def get_current(self):
+        """
+        Gets the latest snapshot of the content statistics if it is recent enough.
+
+        :returns ContentStatsSnapshot: The snapshot or None if there is no recent snapshot.
+        """
+        max_age = timedelta(seconds=settings.CONTENT_STATS_SNAPSHOT_MAX_AGE)
+        return self.filter(created_on__gte=timezone.now() - max_age).order_by("-created_on").first()
+
+    def refresh(self):
+        """
+        Computes the content statistics and stores them as the new snapshot, replacing the previous snapshots.
+
+        :returns ContentStatsSnapshot: The new snapshot.
+        """
+        # Imported here because the content statistics are computed from the models of the other apps
+        from api.services.content_stats import compute_content_stats
+
+        stats = compute_content_stats()
+
+        with transaction.atomic():
+            snapshot = self.create(stats=stats)
+            self.exclude(pk=snapshot.pk).delete()
+
+        return snapshot
+
+
+class ContentStatsSnapshot(models.Model):
+    """A snapshot of the aggregated content statistics served by the content-stats API."""
+
+    created_on = models.DateTimeField(auto_now_add=True, db_index=True)
+    stats = models.JSONField(encoder=DjangoJSONEncoder)
+
+    objects = ContentStatsSnapshotManager()
+
+    def __str__(self):
+        return f"Content stats snapshot {self.created_on}"
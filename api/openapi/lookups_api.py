@@ -1,7 +1,7 @@
-import json
-
-from django.conf import settings
 from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import etag
 from rest_framework import viewsets
 from rest_framework.exceptions import (
     APIException,
@@ -10,23 +10,48 @@ from rest_framework.exceptions import (
     ValidationError,
 )
 
+from api.services.lookups import (
+    DEPARTMENTS,
+    UNIVERSITIES,
+    LookupFile,
+    get_departments,
+    get_universities,
+    get_university_list,
+)
 from studio.utils import get_logger
 
 logger = get_logger(__name__)
 
+# The lookups rarely change, so clients may reuse them for a while and then revalidate them by ETag
+LOOKUPS_CACHE_MAX_AGE = 3600
+
+
+def lookup_file_etag(lookup_file: LookupFile):
+    """
+    Makes an ETag function for views returning the data of a lookup file.
+    A request with a matching If-None-Match header is answered with 304 Not Modified without entering the view.
+
+    :param lookup_file LookupFile: The lookup file of the view.
+    """
+
+    def get_etag(request, *args, **kwargs):
+        try:
+            return lookup_file.get_etag()
+        except Exception as e:
+            # Let the view report the error
+            logger.warning(f"Unable to get the ETag of the lookup file {lookup_file.file_name}. {e}")
+            return None
+
+    return get_etag
+
 
 class UniversityLookupAPI(viewsets.GenericViewSet):
     """
     The university lookup API with read-only methods to get university information.
     """
 
-    def __get_universities(self):
-        """Get the universities data from the json file."""
-        with open(settings.STATICFILES_DIRS[0] + "/common/universities.json", "r") as f:
-            universities = json.load(f).get("universities", dict())
-            list = [{"code": k, "name": v} for k, v in universities.items()]
-            return list
-
+    @method_decorator(cache_control(public=True, max_age=LOOKUPS_CACHE_MAX_AGE))
+    @method_decorator(etag(lookup_file_etag(UNIVERSITIES)))
     def list_or_single(self, request):
         """
         This method handles the /universities endpoint.
@@ -38,7 +63,7 @@ class UniversityLookupAPI(viewsets.GenericViewSet):
         logger.info("UniversityLookupAPI. Entered list_or_single")
 
         try:
-            universities = self.__get_universities()
+            universities = get_universities()
         except Exception as e:
             logger.exception("Exception: %s", str(e), exc_info=True)
             raise APIException("Server error. Unable to retrieve list of universities from json file.")
@@ -52,12 +77,10 @@ class UniversityLookupAPI(viewsets.GenericViewSet):
                 if not code.isalpha() or len(code) > 10:
                     raise ValidationError("Invalid input parameter code")
 
-                item = next((item for item in universities if item["code"] == code), None)
-
-                if item is None:
+                if code not in universities:
                     raise NotFound("No university found for the requersted code.")
 
-                data = {"data": item}
+                data = {"data": {"code": code, "name": universities[code]}}
                 return JsonResponse(data)
 
             else:
@@ -69,7 +92,7 @@ class UniversityLookupAPI(viewsets.GenericViewSet):
 
         else:
             # Get all universities
-            data = {"data": universities}
+            data = {"data": get_university_list()}
             return JsonResponse(data)
 
 
@@ -78,18 +101,14 @@ class DepartmentLookupAPI(viewsets.GenericViewSet):
     The department lookup API with read-only methods to get departments.
     """
 
-    def __get_departments(self):
-        """Get the departments data from the json file."""
-        with open(settings.STATICFILES_DIRS[0] + "/common/departments.json", "r") as f:
-            departments = json.load(f).get("departments", [])
-            return departments
-
+    @method_decorator(cache_control(public=True, max_age=LOOKUPS_CACHE_MAX_AGE))
+    @method_decorator(etag(lookup_file_etag(DEPARTMENTS)))
     def list(self, request):
         """Gets a list of departments."""
         logger.info("DepartmentLookupAPI. Entered list")
 
         try:
-            departments = self.__get_departments()
+            departments = get_departments()
         except Exception as e:
             logger.exception("Exception: %s", str(e), exc_info=True)
             raise APIException("Server error. Unable to retrieve list of departments from json file.")
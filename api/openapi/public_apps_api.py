@@ -10,6 +10,7 @@ from rest_framework.request import Request
 
 from apps.app_registry import APP_REGISTRY
 from apps.models import Apps, BaseAppInstance, K8sUserAppStatus
+from portal.models import PublicAppCatalogueEntry
 from studio.utils import get_logger
 
 logger = get_logger(__name__)
@@ -34,7 +35,6 @@ class PublicAppsAPI(viewsets.ReadOnlyModelViewSet):
         """
         logger.info("PublicAppsAPI. Entered list method. Requested API version %s", request.version)
         list_apps = []
-        list_apps_dict = {}
 
         # Handle user input parameters
         limit: int | None = request.GET.get("limit")
@@ -46,63 +46,41 @@ class PublicAppsAPI(viewsets.ReadOnlyModelViewSet):
 
         # NB: It is important that it only returns public apps
         try:
-            for model_class in APP_REGISTRY.iter_orm_models():
-                # Loop over all models, and check if they have the access and description field
-                # Note: It is not possible to use BaseAppInstance.objects.get_app_instances_not_deleted here
-                # This is the reason for looping over model_class instead
-                if hasattr(model_class, "description") and hasattr(model_class, "access"):
-                    queryset = (
-                        model_class.objects.filter(access="public")
-                        .select_related("k8s_user_app_status")
-                        .values(
-                            "id",
-                            "name",
-                            "app_id",
-                            "url",
-                            "description",
-                            "created_on",
-                            "updated_on",
-                            "access",
-                            "latest_user_action",
-                            "k8s_user_app_status",
-                            "k8s_user_app_status__status",
-                        )
-                    )
-
-                    # Using a dictionary to avoid duplicates for shiny apps
-                    for item in queryset:
-                        # k8s_user_app_status must be the string text version, not id
-                        item["k8s_user_app_status"] = item.get("k8s_user_app_status__status")
-                        del item["k8s_user_app_status__status"]
-
-                        app_status = BaseAppInstance.convert_to_app_status(
-                            item.get("latest_user_action"),
-                            item.get("k8s_user_app_status"),
-                        )
-
-                        # Do not include deleted apps
-                        if app_status != "Deleted":
-                            item["app_status"] = app_status
-                            list_apps_dict[item["id"]] = item
-
-                # Order the combined list by "created_on"
-                list_apps = sorted(list_apps_dict.values(), key=lambda x: x["created_on"], reverse=True)
-
-                # Truncate to limit (after sorting is done)
-                if limit is not None and limit > 0:
-                    # This list is small enough that slicing is performant
-                    list_apps = list_apps[:limit]
-
-            for app in list_apps:
-                assert app["app_status"] != "Deleted"
-
-                app["app_type"] = Apps.objects.get(id=app["app_id"]).name
-
-                # Add the previous url key located at app.table_field.url to support clients using the previous schema
-                app["table_field"] = {"url": app["url"]}
-
-                # Remove misleading app_id from the final output because it only refers to the app type
-                del app["app_id"]
+            # The public apps are read from the materialised catalogue, ordered by date created.
+            queryset = (
+                PublicAppCatalogueEntry.objects.with_app_status()
+                .exclude(latest_user_action__in=["Deleting", "SystemDeleting"])
+                .order_by("-created_on", "-app_instance")
+            )
+
+            if limit is not None and limit > 0:
+                queryset = queryset[:limit]
+
+            for entry in queryset:
+                app_status = entry.get_app_status()
+
+                # Deleted apps are excluded by the queryset
+                assert app_status != "Deleted"
+
+                list_apps.append(
+                    {
+                        "id": entry.app_instance_id,
+                        "name": entry.name,
+                        "url": entry.url,
+                        "description": entry.description,
+                        "created_on": entry.created_on,
+                        "updated_on": entry.updated_on,
+                        "access": "public",
+                        "latest_user_action": entry.latest_user_action,
+                        # k8s_user_app_status is the string text version, not id
+                        "k8s_user_app_status": entry.k8s_user_app_status,
+                        "app_status": app_status,
+                        "app_type": entry.app_name,
+                        # Add the previous url key located at app.table_field.url
+                        # to support clients using the previous schema
+                        "table_field": {"url": entry.url},
+                    }
+                )
 
         except Exception as e:
             logger.error("Unable to collect a list of the public apps. %s", e)
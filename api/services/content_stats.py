@@ -0,0 +1,162 @@
+from datetime import datetime, timezone
+from typing import Any
+
+from django.contrib.auth.models import User
+from django.db.models import Count, Q
+from django.db.models.fields.json import KT
+from django.db.models.functions import ExtractYear
+
+from apps.models import BaseAppInstance
+from common.models import UserProfile
+from projects.models import Project
+from studio.utils import get_logger
+
+logger = get_logger(__name__)
+
+
+def compute_content_stats() -> dict[str, Any]:
+    """
+    Computes the aggregated statistics about the content in the system.
+    All counts are aggregated by the database, so that the cost does not grow with the number of rows.
+
+    :returns dict: The content statistics. See ContentStatsAPI for the top-level elements.
+    """
+    stats: dict[str, Any] = {}
+
+    success: bool = True
+    success_msg: str | None = None
+
+    # Set to default values
+    n_default: int = -1
+
+    n_projects = n_default
+    n_users = n_default
+    n_apps = n_default
+    n_apps_public = n_default
+
+    new_users_by_year: dict[int, int] = {}
+
+    users_by_univ: dict[str, int] = {}
+
+    # A dict of pre-defined app types in the system.
+    # Undefined app types are dynamically added during processing.
+    # APP_REGISTRY is not used because its terminology is sligtly different.
+    apps_by_type: dict[str, int] = {
+        "customapp": 0,
+        "dashapp": 0,
+        "gradio": 0,
+        "shinyapp": 0,
+        "streamlit": 0,
+        "tissuumaps": 0,
+    }
+
+    apps_by_image_registry: dict[str, int] = {
+        "dockerhub": 0,
+        "ghcr": 0,
+        "noimage": 0,
+    }
+
+    # Projects
+    try:
+        n_projects = Project.objects.filter(status="active").distinct("pk").count()
+    except Exception as e:
+        success = False
+        success_msg = _append_status_msg(success_msg, "Error setting number of projects (n_projects).")
+        logger.warning(f"Unable to get the number of active projects: {e}", exc_info=True)
+
+    # Users
+    try:
+        users = User.objects.filter(is_active=True).filter(is_superuser=False)
+
+        n_users = users.count()
+
+        # Count the users that joined per year
+        new_users_by_year = dict(
+            users.annotate(year=ExtractYear("date_joined"))
+            .values("year")
+            .annotate(n=Count("pk"))
+            .order_by("year")
+            .values_list("year", "n")
+        )
+    except Exception as e:
+        success = False
+        success_msg = _append_status_msg(success_msg, "Error setting user information (n_users or new_users_by_year).")
+        logger.warning(f"Unable to get user information: {e}", exc_info=True)
+
+    # User affiliation from UserProfile
+    try:
+        user_profiles = UserProfile.objects.filter(user__is_active=True).filter(user__is_superuser=False)
+        users_by_univ = dict(
+            user_profiles.values("affiliation")
+            .annotate(n=Count("pk"))
+            .order_by("affiliation")
+            .values_list("affiliation", "n")
+        )
+    except Exception as e:
+        success = False
+        success_msg = _append_status_msg(success_msg, "Error setting user information (n_users or new_users_by_year).")
+        logger.warning(f"Unable to get user information: {e}", exc_info=True)
+
+    # Apps
+    # The public permission and the image are extracted from the k8s_values json by the database.
+    try:
+        apps = (
+            BaseAppInstance.objects.get_app_instances_not_deleted()
+            .filter(app__category="serve")
+            .annotate(image=KT("k8s_values__appconfig__image"))
+        )
+
+        app_counts = apps.aggregate(
+            n_apps=Count("pk"),
+            n_apps_public=Count("pk", filter=Q(k8s_values__permission="public")),
+            noimage=Count("pk", filter=Q(image__isnull=True)),
+            ghcr=Count("pk", filter=Q(image__contains="ghcr.io")),
+        )
+
+        n_apps = app_counts["n_apps"]
+        n_apps_public = app_counts["n_apps_public"]
+
+        # Collect app image registry information
+        apps_by_image_registry["noimage"] = app_counts["noimage"]
+        apps_by_image_registry["ghcr"] = app_counts["ghcr"]
+        apps_by_image_registry["dockerhub"] = n_apps - app_counts["noimage"] - app_counts["ghcr"]
+
+        # Collect app type information
+        for app_slug, n in apps.values("app__slug").annotate(n=Count("pk")).order_by().values_list("app__slug", "n"):
+            # Combine all shiny types into one app type
+            app_type = "shinyapp" if "shiny" in app_slug else app_slug
+            apps_by_type[app_type] = apps_by_type.get(app_type, 0) + n
+
+    except Exception as e:
+        success = False
+        msg = f"Error setting apps information (n_apps, n_apps_public or apps_by_image_registry). {e}"
+        success_msg = _append_status_msg(success_msg, msg)
+        logger.warning(f"Unable to get the number of user apps: {e}", exc_info=True)
+
+    # Add the generic top-level elements
+    stats["stats_date_utz"] = datetime.now(timezone.utc)
+    stats["stats_success"] = success
+    stats["stats_message"] = success_msg
+    stats[
+        "stats_notes"
+    ] = "The number of users (n_users) in 2023 is the number of all active users registered in 2023 or earlier."
+
+    # Add content-specific elements
+    stats["n_projects"] = n_projects
+    stats["n_users"] = n_users
+    stats["n_apps"] = n_apps
+    stats["n_apps_public"] = n_apps_public
+    stats["apps_by_type"] = apps_by_type
+    stats["new_users_by_year"] = new_users_by_year
+    stats["users_by_university"] = users_by_univ
+    stats["apps_by_image_registry"] = apps_by_image_registry
+
+    return stats
+
+
+def _append_status_msg(status_msg: str | None, new_msg: str) -> str:
+    """Simple helper function to format status messages."""
+    if status_msg is None:
+        return new_msg
+    else:
+        return f"{status_msg} {new_msg}"
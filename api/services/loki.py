@@ -1,7 +1,6 @@
 from typing import Any, Dict, Set
 
-import requests
-
+from studio.async_http import get_json
 from studio.utils import get_logger
 
 logger = get_logger(__name__)
@@ -33,7 +32,7 @@ def process_loki_response(response_json: Dict[str, Any]) -> Set[str]:
     return unique_ips
 
 
-def query_unique_ip_count(app_subdomain: str = "") -> int:
+async def query_unique_ip_count(app_subdomain: str = "") -> int:
     """
     Query Loki for unique IP addresses accessing a specific app subdomain.
 
@@ -60,8 +59,6 @@ def query_unique_ip_count(app_subdomain: str = "") -> int:
         "since": "30d",
     }
 
-    response = requests.get(endpoint, params=params)
-    response.raise_for_status()
-    data = response.json()
+    data = await get_json(endpoint, params=params)
     unique_ips = process_loki_response(data)
     return len(unique_ips)
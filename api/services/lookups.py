@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Callable, NamedTuple
+
+from django.conf import settings
+
+from studio.utils import get_logger
+
+logger = get_logger(__name__)
+
+UNIVERSITIES_FILE = "common/universities.json"
+DEPARTMENTS_FILE = "common/departments.json"
+
+
+class Universities(NamedTuple):
+    by_code: dict[str, str]
+    as_list: list[dict[str, str]]
+
+
+class LookupFile:
+    """
+    A lookup json file in the static files directory, loaded once per process and shared by all callers.
+    The file is reloaded when its modification time changes, so that edits take effect without a restart.
+    """
+
+    def __init__(self, file_name: str, key: str, transform: Callable[[Any], Any]):
+        """
+        :param file_name str: The path of the file relative to the static files directory.
+        :param key str: The key of the lookup data in the json file.
+        :param transform Callable: A function building the lookup value from the lookup data.
+        """
+        self.file_name = file_name
+        self.key = key
+        self.transform = transform
+        self._lock = threading.Lock()
+        # The modification time, value and ETag of the loaded file, replaced at once on reload
+        self._state: tuple[int, Any, str] | None = None
+
+    @property
+    def path(self) -> str:
+        return settings.STATICFILES_DIRS[0] + "/" + self.file_name
+
+    def _get_state(self) -> tuple[int, Any, str]:
+        path = self.path
+        mtime = os.stat(path).st_mtime_ns
+        state = self._state
+
+        if state is None or state[0] != mtime:
+            with self._lock:
+                state = self._state
+
+                if state is None or state[0] != mtime:
+                    content = _load_lookup_file(path)
+                    value = self.transform(json.loads(content).get(self.key))
+                    etag = '"' + hashlib.sha256(content).hexdigest() + '"'
+                    state = self._state = (mtime, value, etag)
+
+        return state
+
+    def get(self) -> Any:
+        """
+        Gets the lookup value. The returned value is shared and must not be modified.
+
+        :returns: The lookup value built by the transform.
+        """
+        return self._get_state()[1]
+
+    def get_etag(self) -> str:
+        """
+        Gets a strong ETag of the current version of the file.
+
+        :returns str: The quoted ETag.
+        """
+        return self._get_state()[2]
+
+
+def _load_lookup_file(path: str) -> bytes:
+    """
+    Reads a lookup json file.
+
+    :param path str: The path of the file.
+    :returns bytes: The content of the file.
+    """
+    logger.info(f"Loading the lookup file {path}")
+
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _build_universities(universities: dict[str, str] | None) -> Universities:
+    universities = universities or dict()
+    return Universities(universities, [{"code": k, "name": v} for k, v in universities.items()])
+
+
+UNIVERSITIES = LookupFile(UNIVERSITIES_FILE, "universities", _build_universities)
+DEPARTMENTS = LookupFile(DEPARTMENTS_FILE, "departments", lambda departments: departments or [])
+
+
+def get_universities() -> dict[str, str]:
+    """
+    Gets the universities, shared by all callers. The returned dict must not be modified.
+
+    :returns dict: The university names keyed by university code.
+    """
+    return UNIVERSITIES.get().by_code
+
+
+def get_university_list() -> list[dict[str, str]]:
+    """
+    Gets the universities as a list, shared by all callers. The returned list must not be modified.
+
+    :returns list of dict: The dicts contain attributes code and name.
+    """
+    return UNIVERSITIES.get().as_list
+
+
+def get_university_name(code: str, default: str | None = None) -> str | None:
+    """
+    Gets the name of a university by code.
+
+    :param code str: The university code.
+    :param default str: The value to return if there is no university with the code.
+    :returns str: The university name.
+    """
+    return get_universities().get(code, default)
+
+
+def get_departments() -> list[str]:
+    """
+    Gets the departments, shared by all callers. The returned list must not be modified.
+
+    :returns list of str: The department names.
+    """
+    return DEPARTMENTS.get()
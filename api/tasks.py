@@ -0,0 +1,13 @@
+from studio.celery import app
+from studio.utils import get_logger
+
+from .models import ContentStatsSnapshot
+
+logger = get_logger(__name__)
+
+
+@app.task
+def refresh_content_stats_snapshot():
+    """Computes the content statistics and stores them as the snapshot served by the content-stats API."""
+    snapshot = ContentStatsSnapshot.objects.refresh()
+    logger.info(f"Refreshed the content stats snapshot, success: {snapshot.stats['stats_success']}")
@@ -1,10 +1,13 @@
 import json
 import os
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
+from rest_framework.authtoken.models import Token
 from rest_framework.test import APITestCase
 
 from apps.models import (
@@ -106,3 +109,94 @@ class ApiTests(APITestCase):
         self.assertEqual(actual["n_apps_not_running"], 1)
         self.assertEqual(actual["n_apps_status_error"], 1)
         self.assertEqual(actual["n_apps_suspect_status"], 0)
+
+    @patch("api.views.validate_static_token")
+    def test_get_content_review_app_lists(self, mock_validate_static_token):
+        """Tests the app lists of the content review and that they take a constant number of queries."""
+        mock_validate_static_token.return_value = True
+
+        url = os.path.join(self.BASE_API_URL, "content-review/")
+        self.client.get(url, query_params={"token": "someunusedvalue"}, format="json")
+
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(url, query_params={"token": "someunusedvalue"}, format="json")
+        n_queries = len(context.captured_queries)
+
+        old = datetime.now(timezone.utc) - timedelta(days=30)
+        for i, (k8s_status, latest_user_action, created_on) in enumerate(
+            [
+                ("Running", "Creating", old),
+                ("Running", "Deleting", old),
+                ("ContainerCreating", "Changing", old),
+                (None, "Creating", old),
+                (None, "Creating", None),
+            ]
+        ):
+            app_instance = CustomAppInstance.objects.create(
+                access="public",
+                owner=self.user,
+                name=f"content_review_{i}",
+                app=self.app,
+                project=self.project,
+                latest_user_action=latest_user_action,
+                k8s_user_app_status=K8sUserAppStatus.objects.create(status=k8s_status) if k8s_status else None,
+            )
+            if created_on is not None:
+                CustomAppInstance.objects.filter(pk=app_instance.pk).update(created_on=created_on)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, query_params={"token": "someunusedvalue", "from_hours": 1}, format="json")
+        self.assertEqual(len(context.captured_queries), n_queries)
+
+        actual = json.loads(response.content)["data"]
+
+        self.assertTrue(actual["stats_success"])
+        self.assertEqual(actual["stats_from_hours"], 1)
+        self.assertEqual(actual["n_recent_apps"], 2)
+        self.assertEqual(actual["apps_link"], ["test_a"])
+        self.assertEqual(actual["apps_not_running"], ["test_app_ins", "content_revi", "content_revi", "content_revi"])
+        self.assertEqual(actual["apps_status_error"], ["test_app_ins"])
+        self.assertEqual(actual["n_apps_suspect_status"], 2)
+        self.assertEqual(
+            [(app["action"], app["k8s_status"]) for app in actual["apps_suspect_status"]],
+            [("Changing", "ContainerCreating"), ("Creating", None)],
+        )
+        self.assertEqual(
+            actual["deploy_queue"],
+            {
+                "pending": 0,
+                "running": 0,
+                "releases": 0,
+                "pending_user": 0,
+                "pending_system": 0,
+                "max_wait_seconds": 0,
+            },
+        )
+
+    def test_update_app_status_bulk(self):
+        """Tests the endpoint app-status/bulk implemented by update_app_status_bulk."""
+
+        admin = User.objects.create_superuser("admin@test.com", "admin@test.com", "password")
+        token = Token.objects.create(user=admin)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+        url = os.path.join(self.BASE_API_URL, "app-status/bulk/")
+        events = [
+            {"release": "test_internal", "new-status": "Running", "event-ts": "2099-01-25T16:02:50.00Z"},
+            {"release": "non-existing-release", "new-status": "Running", "event-ts": "2099-01-25T16:02:50.00Z"},
+            {"release": "test_internal", "new-status": "Running"},
+        ]
+        response = self.client.post(url, events, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        actual = json.loads(response.content)["data"]
+
+        self.assertEqual(len(actual), 3)
+        self.assertEqual(actual[0]["result"], "UPDATED_STATUS")
+        self.assertEqual(actual[1]["result"], "OBJECT_NOT_FOUND")
+        self.assertIsNone(actual[2]["code"])
+        self.assertIn("event-ts", actual[2]["error"])
+
+        self.app_instance.k8s_user_app_status.refresh_from_db()
+        self.assertEqual(self.app_instance.k8s_user_app_status.status, "Running")
@@ -0,0 +1,141 @@
+import asyncio
+import json
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import AsyncMock, patch
+from urllib.parse import parse_qs, urlparse
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.throttling import ContainerImageSearchThrottle
+from api.utils import clear_docker_hub_search_cache, fetch_docker_hub_images_and_tags
+
+User = get_user_model()
+
+REPO_NAMES = ["library/python", "jupyter/base-notebook", "rocker/rstudio", "library/nginx", "library/redis"]
+
+
+class StubDockerHubHandler(BaseHTTPRequestHandler):
+    """Answers the search and tag requests to Docker Hub, recording the queries searched."""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+
+        if url.path == "/search":
+            query = parse_qs(url.query)["query"][0]
+            self.server.queries[query] += 1
+            if self.server.search_fails:
+                return self.send_json({}, status=500)
+            if self.server.search_released:
+                self.server.search_released.wait(timeout=5)
+            return self.send_json(
+                {"results": [{"repo_name": name, "pull_count": 100 - i} for i, name in enumerate(REPO_NAMES)]}
+            )
+
+        if self.server.tag_barrier:
+            # Only passes once all tag requests are made at the same time
+            self.server.tag_barrier.wait()
+        return self.send_json({"results": [{"name": "latest"}]})
+
+    def send_json(self, data, status=200):
+        content = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FetchDockerHubImagesTests(APITestCase):
+    def setUp(self):
+        clear_docker_hub_search_cache()
+        self.addCleanup(clear_docker_hub_search_cache)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubDockerHubHandler)
+        self.server.queries = Counter()
+        self.server.search_fails = False
+        self.server.search_released = None
+        self.server.tag_barrier = None
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        url = f"http://127.0.0.1:{self.server.server_port}"
+        settings_override = override_settings(DOCKER_HUB_REPO_SEARCH=f"{url}/search", DOCKER_HUB_TAG_SEARCH=url)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    async def test_tags_are_fetched_concurrently(self):
+        self.server.tag_barrier = threading.Barrier(len(REPO_NAMES), timeout=5)
+
+        images = await fetch_docker_hub_images_and_tags("python")
+
+        self.assertEqual(images, [f"docker.io/{name}:latest" for name in REPO_NAMES])
+
+    async def test_results_are_cached_by_normalised_query(self):
+        first = await fetch_docker_hub_images_and_tags("Jupyter  Notebook")
+        second = await fetch_docker_hub_images_and_tags(" jupyter notebook ")
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.server.queries, {"jupyter notebook": 1})
+
+    async def test_failed_searches_are_not_cached(self):
+        self.server.search_fails = True
+
+        self.assertEqual(await fetch_docker_hub_images_and_tags("python"), [])
+        self.assertEqual(await fetch_docker_hub_images_and_tags("python"), [])
+
+        self.assertEqual(self.server.queries, {"python": 2})
+
+    async def test_identical_concurrent_queries_share_one_search(self):
+        self.server.search_released = threading.Event()
+
+        searches = asyncio.gather(
+            fetch_docker_hub_images_and_tags("python"), fetch_docker_hub_images_and_tags("Python ")
+        )
+        asyncio.get_running_loop().call_later(0.2, self.server.search_released.set)
+        first, second = await searches
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.server.queries, {"python": 1})
+
+
+class ContainerImageSearchViewTests(APITestCase):
+    url = "/api/container_image_search/"
+
+    def setUp(self):
+        cache.clear()
+
+    def test_query_is_required(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_search_is_throttled_per_user(self):
+        user = User.objects.create_user("foo@test.com", "foo@test.com", "bar")
+        self.client.force_login(user)
+
+        with patch.object(ContainerImageSearchThrottle, "THROTTLE_RATES", {"container_image_search": "2/min"}), patch(
+            "api.views.fetch_docker_hub_images_and_tags",
+            AsyncMock(return_value=["docker.io/library/python:latest"]),
+        ):
+            for _ in range(2):
+                response = self.client.get(self.url, {"query": "python"})
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(response.json(), {"images": ["docker.io/library/python:latest"]})
+
+            response = self.client.get(self.url, {"query": "python"})
+            self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+            self.assertIn("Retry-After", response)
+
+            # The throttling is per user
+            self.client.force_login(User.objects.create_user("bar@test.com", "bar@test.com", "bar"))
+            response = self.client.get(self.url, {"query": "python"})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
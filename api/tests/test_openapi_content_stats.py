@@ -1,11 +1,13 @@
 import json
 import os
-from datetime import datetime
+from datetime import datetime, timezone
 
 from django.contrib.auth import get_user_model
 from rest_framework import status
 from rest_framework.test import APITestCase
 
+from api.models import ContentStatsSnapshot
+from api.services.content_stats import compute_content_stats
 from apps.models import AppCategories, Apps, K8sUserAppStatus, ShinyInstance, Subdomain
 from common.models import UserProfile
 from projects.models import Project
@@ -151,3 +153,69 @@ class ContentStatsApiTests(APITestCase):
         self.assertEqual(actual["apps_by_image_registry"]["dockerhub"], 0)
         self.assertEqual(actual["apps_by_image_registry"]["ghcr"], 0)
         self.assertEqual(actual["apps_by_image_registry"]["noimage"], 0)
+
+    def test_stats_are_served_from_the_snapshot(self):
+        """Tests that the stats are computed once and then served from the snapshot until it is refreshed."""
+        url = os.path.join(self.BASE_API_URL, "content-stats")
+        response = self.client.get(url, format="json")
+        self.assertEqual(json.loads(response.content)["data"]["n_users"], 0)
+
+        self.load_data()
+
+        # A single query reads the current snapshot
+        with self.assertNumQueries(1):
+            response = self.client.get(url, format="json")
+        self.assertEqual(json.loads(response.content)["data"]["n_users"], 0)
+
+        ContentStatsSnapshot.objects.refresh()
+
+        response = self.client.get(url, format="json")
+        self.assertEqual(json.loads(response.content)["data"]["n_users"], 1)
+        self.assertEqual(ContentStatsSnapshot.objects.count(), 1)
+
+    def test_outdated_snapshot_is_recomputed(self):
+        """Tests that an outdated snapshot is not served."""
+        snapshot = ContentStatsSnapshot.objects.refresh()
+        ContentStatsSnapshot.objects.filter(pk=snapshot.pk).update(created_on=datetime(2020, 1, 1, tzinfo=timezone.utc))
+        self.load_data()
+
+        url = os.path.join(self.BASE_API_URL, "content-stats")
+        response = self.client.get(url, format="json")
+
+        self.assertEqual(json.loads(response.content)["data"]["n_users"], 1)
+
+    def test_apps_are_aggregated_by_type_and_image_registry(self):
+        """Tests the aggregation of the apps of several types, images and permissions."""
+        self.load_data()
+
+        develop = AppCategories.objects.create(name="Develop", priority=200, slug="develop")
+        for i, (slug, category, k8s_values, latest_user_action) in enumerate(
+            [
+                ("shinyapp", self.category, {"appconfig": {"image": "docker.io/some/image:1"}}, "Creating"),
+                ("customapp", self.category, {"appconfig": {"image": None}, "permission": "project"}, "Creating"),
+                ("customapp", self.category, {"permission": "public"}, "Creating"),
+                ("customapp", self.category, None, "Creating"),
+                ("customapp", self.category, {"appconfig": {"image": "ghcr.io/some/image"}}, "Deleting"),
+                ("jupyter-lab", develop, {"appconfig": {"image": "ghcr.io/some/image"}}, "Creating"),
+            ]
+        ):
+            app, _ = Apps.objects.get_or_create(name=slug, slug=slug, category=category)
+            ShinyInstance.objects.create(
+                access="project",
+                owner=self.user,
+                name=f"test_content_stats_app_{i}",
+                app=app,
+                project=self.project,
+                k8s_values=k8s_values,
+                latest_user_action=latest_user_action,
+            )
+
+        stats = compute_content_stats()
+
+        self.assertTrue(stats["stats_success"])
+        self.assertEqual(stats["n_apps"], 5)
+        self.assertEqual(stats["n_apps_public"], 2)
+        self.assertEqual(stats["apps_by_type"]["shinyapp"], 2)
+        self.assertEqual(stats["apps_by_type"]["customapp"], 3)
+        self.assertNotIn("jupyter-lab", stats["apps_by_type"])
+        self.assertEqual(stats["apps_by_image_registry"], {"dockerhub": 1, "ghcr": 1, "noimage": 3})
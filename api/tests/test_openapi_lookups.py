@@ -0,0 +1,108 @@
+import json
+import os
+import tempfile
+from unittest.mock import patch
+
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.services import lookups
+from studio.utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class LookupsApiTests(APITestCase):
+    """Tests for the lookups API resource endpoints"""
+
+    BASE_API_URL = "/openapi/v1/"
+
+    def test_universities_list(self):
+        """Tests the API resource lookups/universities default endpoint"""
+        url = os.path.join(self.BASE_API_URL, "lookups/universities")
+        response = self.client.get(url, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        actual = json.loads(response.content)["data"]
+        self.assertIn({"code": "uu", "name": "Uppsala University"}, actual)
+        self.assertEqual(len(actual), len(lookups.get_universities()))
+
+    def test_universities_single(self):
+        """Tests the API resource lookups/universities get single object by code"""
+        url = os.path.join(self.BASE_API_URL, "lookups/universities")
+        response = self.client.get(url, {"code": "UU"}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        actual = json.loads(response.content)["data"]
+        self.assertEqual(actual, {"code": "uu", "name": "Uppsala University"})
+
+    def test_universities_single_notfound(self):
+        """Tests the API resource lookups/universities get single object for a non-existing code"""
+        url = os.path.join(self.BASE_API_URL, "lookups/universities")
+        response = self.client.get(url, {"code": "xyz"}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_departments_list(self):
+        """Tests the API resource lookups/departments default endpoint"""
+        url = os.path.join(self.BASE_API_URL, "lookups/departments")
+        response = self.client.get(url, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        actual = json.loads(response.content)["data"]
+        self.assertIn("Biology Education Centre", actual)
+
+    def test_lookup_files_are_loaded_once(self):
+        """Tests that the lookup files are not re-read from disk by every request"""
+        lookups.get_universities()
+        lookups.get_departments()
+
+        with patch.object(lookups, "_load_lookup_file", side_effect=AssertionError("Lookup file re-read")):
+            for endpoint in ["lookups/universities", "lookups/departments"]:
+                response = self.client.get(os.path.join(self.BASE_API_URL, endpoint), format="json")
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(lookups.get_university_name("uu"), "Uppsala University")
+        self.assertIsNone(lookups.get_university_name("nonexisting"))
+
+    def test_lookups_etag_and_cache_control(self):
+        """Tests that the lookups are served with an ETag and revalidated with If-None-Match"""
+        for endpoint, params in [
+            ("lookups/universities", {}),
+            ("lookups/universities", {"code": "uu"}),
+            ("lookups/departments", {}),
+        ]:
+            url = os.path.join(self.BASE_API_URL, endpoint)
+            response = self.client.get(url, params, format="json")
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            etag = response.headers["ETag"]
+            self.assertTrue(etag.startswith('"') and etag.endswith('"'))
+            self.assertIn("max-age=", response.headers["Cache-Control"])
+
+            response = self.client.get(url, params, format="json", HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+            self.assertEqual(response.content, b"")
+
+            response = self.client.get(url, params, format="json", HTTP_IF_NONE_MATCH='"outdated"')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_lookup_file_is_reloaded_when_modified(self):
+        """Tests that a lookup file is reloaded when its modification time changes"""
+        with tempfile.TemporaryDirectory() as static_dir, override_settings(STATICFILES_DIRS=[static_dir]):
+            path = os.path.join(static_dir, "lookup.json")
+            lookup_file = lookups.LookupFile("lookup.json", "departments", list)
+
+            with open(path, "w") as f:
+                json.dump({"departments": ["Department A"]}, f)
+
+            self.assertEqual(lookup_file.get(), ["Department A"])
+            etag = lookup_file.get_etag()
+
+            with open(path, "w") as f:
+                json.dump({"departments": ["Department A", "Department B"]}, f)
+            os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000_000))
+
+            self.assertEqual(lookup_file.get(), ["Department A", "Department B"])
+            self.assertNotEqual(lookup_file.get_etag(), etag)
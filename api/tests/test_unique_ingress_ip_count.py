@@ -0,0 +1,74 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.models import Apps, CustomAppInstance, Subdomain
+from projects.models import Project
+
+User = get_user_model()
+
+LOKI_RESULT = {
+    "status": "success",
+    "data": {
+        "resultType": "streams",
+        "result": [{"stream": {}, "values": [["1", "10.0.0.1"], ["2", "10.0.0.2"], ["3", "10.0.0.1"]]}],
+    },
+}
+
+
+class StubLokiHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        content = json.dumps(LOKI_RESULT).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class UniqueIngressIpCountTests(APITestCase):
+    url = "/api/monitoring/unique-ip-count/rmonitored"
+
+    def setUp(self):
+        self.owner = User.objects.create_user("foo@test.com", "foo@test.com", "bar")
+        project = Project.objects.create_project(name="test-monitoring", owner=self.owner, description="")
+        CustomAppInstance.objects.create(
+            owner=self.owner,
+            name="test-monitoring",
+            app=Apps.objects.create(name="Custom App", slug="customapp"),
+            project=project,
+            subdomain=Subdomain.objects.create(subdomain="rmonitored", project=project),
+        )
+
+        server = HTTPServer(("127.0.0.1", 0), StubLokiHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        endpoint_patch = patch("api.services.loki.LOKI_READER_ENDPOINT", f"http://127.0.0.1:{server.server_port}")
+        endpoint_patch.start()
+        self.addCleanup(endpoint_patch.stop)
+
+    def test_owner_gets_the_unique_ip_count(self):
+        self.client.force_login(self.owner)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {"app_subdomain": "rmonitored", "unique_ip_count": 2})
+
+    def test_other_users_are_denied(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_login(User.objects.create_user("bar@test.com", "bar@test.com", "bar"))
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,48 @@
+import functools
+import math
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from rest_framework.throttling import UserRateThrottle
+
+
+class ContainerImageSearchThrottle(UserRateThrottle):
+    """
+    Limits the rate of the container image searches per user, or per IP address for anonymous users.
+    The searches are made on every keystroke of the image picker and each is forwarded to Docker Hub.
+    """
+
+    scope = "container_image_search"
+
+
+def async_throttle(throttle_class):
+    """
+    Throttles an async view with a REST framework throttle class, since async views are plain Django views.
+
+    :param throttle_class type: The throttle class, e.g. a UserRateThrottle.
+    :returns: The decorator of the view, responding 429 Too Many Requests to throttled requests.
+    """
+
+    def allow_request(request) -> float | None:
+        throttle = throttle_class()
+        if throttle.allow_request(request, None):
+            return None
+        return throttle.wait() or 0
+
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            # The throttle reads the user from the session and the rate history from the cache
+            wait = await sync_to_async(allow_request)(request)
+            if wait is not None:
+                response = JsonResponse(
+                    {"detail": f"Request was throttled. Expected available in {math.ceil(wait)} seconds."}, status=429
+                )
+                response["Retry-After"] = str(math.ceil(wait))
+                return response
+
+            return await view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
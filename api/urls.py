@@ -25,6 +25,7 @@ from .views import (
     get_subdomain_is_valid,
     get_unique_ingress_ip_count,
     update_app_status,
+    update_app_status_bulk,
     validate_password_request,
 )
 
@@ -59,6 +60,7 @@ urlpatterns = [
     path("settings/", get_studio_settings),
     # TODO: Consider renaming this endpoint to update-k8s-app-status
     path("app-status/", update_app_status),
+    path("app-status/bulk/", update_app_status_bulk),
     path("app-subdomain/validate/", get_subdomain_is_valid),
     path("app-subdomain/is-available/", get_subdomain_is_available),
     path("htmx/subdomain-input/", get_subdomain_input_html, name="get_subdomain_input_html"),
@@ -1,41 +1,111 @@
+import asyncio
+import functools
+import threading
+import time
+from collections import OrderedDict
 from typing import List
 
-import requests
+import aiohttp
 from django.conf import settings
 
+from studio.async_http import get_json
+from studio.utils import get_logger
 
-def fetch_docker_hub_images_and_tags(query: str) -> List[str]:
+logger = get_logger(__name__)
+
+# The number of images, with the highest pull count, to suggest tags of
+DOCKER_HUB_SEARCH_IMAGES = 5
+# The maximum number of cached search results
+DOCKER_HUB_SEARCH_CACHE_SIZE = 512
+
+_search_lock = threading.Lock()
+# The cached search results and their monotonic expiry times, by normalised query
+_search_cache: OrderedDict[str, tuple[List[str], float]] = OrderedDict()
+# The searches in progress, shared by identical concurrent queries
+_searches_in_progress: dict[str, asyncio.Task] = {}
+
+
+def normalise_docker_hub_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+async def fetch_docker_hub_images_and_tags(query: str) -> List[str]:
     """
     Fetch Docker images and latest tags matching a query.
     This function fetches images with the highest pull count.
+
+    The results are cached by the normalised query for DOCKER_HUB_SEARCH_CACHE_TTL seconds,
+    and identical queries made at the same time wait for the same search of Docker Hub.
+    """
+    query = normalise_docker_hub_query(query)
+
+    with _search_lock:
+        cached = _search_cache.get(query)
+        if cached is not None and cached[1] > time.monotonic():
+            _search_cache.move_to_end(query)
+            return cached[0]
+
+    loop = asyncio.get_running_loop()
+    search = _searches_in_progress.get(query)
+    if search is None or search.get_loop() is not loop:
+        search = _searches_in_progress[query] = loop.create_task(_search_docker_hub(query))
+        search.add_done_callback(functools.partial(_finish_search, query))
+
+    # A request that is cancelled, e.g. when the user types on, does not cancel the search shared with others
+    images = await asyncio.shield(search)
+    return images or []
+
+
+def clear_docker_hub_search_cache() -> None:
+    with _search_lock:
+        _search_cache.clear()
+
+
+def _finish_search(query: str, search: asyncio.Task) -> None:
+    if _searches_in_progress.get(query) is search:
+        del _searches_in_progress[query]
+
+    # Failed searches are not cached
+    if search.cancelled() or search.exception() is not None or search.result() is None:
+        return
+
+    with _search_lock:
+        _search_cache[query] = (search.result(), time.monotonic() + settings.DOCKER_HUB_SEARCH_CACHE_TTL)
+        _search_cache.move_to_end(query)
+        while len(_search_cache) > DOCKER_HUB_SEARCH_CACHE_SIZE:
+            _search_cache.popitem(last=False)
+
+
+async def _search_docker_hub(query: str) -> List[str] | None:
+    """
+    Searches Docker Hub for images and fetches the tags of the most pulled images concurrently.
+
+    :returns: The images with tags, or None if the search failed.
     """
-    image_search_url = f"{settings.DOCKER_HUB_REPO_SEARCH}?query={query}"
     try:
-        response = requests.get(image_search_url, timeout=3)
-        response.raise_for_status()
-        results = response.json().get("results", [])
-    except requests.RequestException:
-        return []
+        data = await get_json(settings.DOCKER_HUB_REPO_SEARCH, params={"query": query}, timeout=3)
+        results = data.get("results", [])
+    except (aiohttp.ClientError, ValueError) as e:
+        logger.warning(f"Unable to search Docker Hub for {query}: {e}")
+        return None
 
     # Sort images by pull count
     sorted_results = sorted(results, key=lambda x: x.get("pull_count", 0), reverse=True)
+    repo_names = [repo["repo_name"] for repo in sorted_results[:DOCKER_HUB_SEARCH_IMAGES]]
 
     images = []
-    # Use the top 5 images
-    for repo in sorted_results[:5]:
-        repo_name = repo["repo_name"]
-
-        # Fetch available tags
-        tags_search_url = f"{settings.DOCKER_HUB_TAG_SEARCH}/{repo_name}/tags/?page_size=3"
-        try:
-            tag_response = requests.get(tags_search_url, timeout=2)
-            tag_response.raise_for_status()
-            tags = [tag["name"] for tag in tag_response.json().get("results", [])]
-        except requests.RequestException:
-            # Default to latest if tags cannot be fetched
-            tags = ["latest"]
-
+    for repo_name, tags in zip(repo_names, await asyncio.gather(*map(_fetch_docker_hub_tags, repo_names))):
         for tag in tags:
             images.append(f"docker.io/{repo_name}:{tag}")
 
     return images
+
+
+async def _fetch_docker_hub_tags(repo_name: str) -> List[str]:
+    tags_search_url = f"{settings.DOCKER_HUB_TAG_SEARCH}/{repo_name}/tags/"
+    try:
+        data = await get_json(tags_search_url, params={"page_size": "3"}, timeout=2)
+        return [tag["name"] for tag in data.get("results", [])]
+    except (aiohttp.ClientError, ValueError):
+        # Default to latest if tags cannot be fetched
+        return ["latest"]
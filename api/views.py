@@ -13,9 +13,11 @@ from django.contrib.auth.password_validation import (
 )
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
 from django.db.models import Q
+from django.db.models.functions import Left
 from django.http import HttpRequest, HttpResponse, JsonResponse
 from django.template import loader
 from django.utils.safestring import mark_safe
+from django.views.decorators.http import require_GET
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import generics
 from rest_framework.authentication import SessionAuthentication
@@ -38,9 +40,20 @@ from rest_framework.viewsets import GenericViewSet
 
 from api.services.loki import query_unique_ip_count
 from apps.constants import HandleUpdateStatusResponseCode
-from apps.helpers import get_select_options, handle_update_status_request
-from apps.models import AppCategories, Apps, BaseAppInstance, Subdomain
+from apps.helpers import (
+    get_select_options,
+    handle_bulk_update_status_request,
+    handle_update_status_request,
+)
+from apps.models import (
+    AppCategories,
+    Apps,
+    BaseAppInstance,
+    ReleaseOperation,
+    Subdomain,
+)
 from apps.tasks import delete_resource
+from apps.types_.status_event import K8sStatusEvent
 from apps.types_.subdomain import SubdomainCandidateName
 from models.models import ObjectType
 from portal.models import PublishedModel
@@ -66,6 +79,7 @@ from .serializers import (
     ProjectTemplateSerializer,
     UserSerializer,
 )
+from .throttling import ContainerImageSearchThrottle, async_throttle
 from .utils import fetch_docker_hub_images_and_tags
 
 logger = get_logger(__name__)
@@ -384,7 +398,7 @@ class ProjectList(
         if (request.user == project.owner or request.user.is_superuser) and project.status.lower() != "deleted":
             logger.info("Delete project")
             logger.info("SCHEDULING DELETION OF ALL INSTALLED APPS")
-            delete_project_apps(project.slug)
+            delete_project_apps(project)
 
             logger.info("ARCHIVING PROJECT Object")
             objects = Model.objects.filter(project=project)
@@ -936,25 +950,9 @@ def update_app_status(request: HttpRequest) -> HttpResponse:
     if request.method == "POST":
         logger.debug("API method update_app_status called with POST verb.")
 
-        utc = pytz.UTC
-
         try:
             # Parse and validate the input
-
-            # Required input
-            release = request.data["release"]
-
-            new_status = request.data["new-status"]
-
-            if len(new_status) > 20:
-                logger.debug(f"Status code is longer than 20 chars so shortening: {new_status}")
-                new_status = new_status[:20]
-
-            event_ts = datetime.strptime(request.data["event-ts"], "%Y-%m-%dT%H:%M:%S.%fZ")
-            event_ts = utc.localize(event_ts)
-
-            # Optional
-            event_msg = request.data.get("event-msg", None)
+            release, new_status, event_ts, event_msg = _parse_status_event(request.data)
 
         except KeyError as err:
             logger.error(f"API method called with invalid input. Missing required input parameter: {err}")
@@ -1020,18 +1018,80 @@ def update_app_status(request: HttpRequest) -> HttpResponse:
     return Response({"message": "DEBUG: GET"})
 
 
-@api_view(["GET"])
+@api_view(["POST"])
 @permission_classes(
     (
-        # IsAuthenticated,
+        IsTokenAuthenticated,
+        IsAuthenticated,
+        AdminPermission,
     )
 )
-def container_image_search(request):
+def update_app_status_bulk(request: HttpRequest) -> HttpResponse:
+    """
+    Manages the app instance status of a batch of app instances.
+    Implemented as a DRF function based view.
+    Supports the POST verb.
+
+    The service contract for the POST verb is as follows:
+    :param list: A JSON array of status events, each with the same attributes as accepted by update_app_status:
+        release, new-status, event-ts and the optional event-msg.
+    :returns: An http status code and dict containing a list of per-event results in the submitted order.
+        Each result contains the release and the HandleUpdateStatusResponseCode as code and result,
+        or code None and an error message if the event could not be parsed.
+    """
+    logger.debug("API method update_app_status_bulk called with POST verb.")
+
+    if not isinstance(request.data, list):
+        logger.error(f"API method called with invalid input. Expected a list but got {type(request.data)}")
+        return Response("Invalid input. Expected a JSON array of status events.", 400)
+
+    results: list[dict[str, Any]] = [{} for _ in request.data]
+    events = []
+    event_indices = []
+
+    for index, item in enumerate(request.data):
+        try:
+            events.append(_parse_status_event(item))
+            event_indices.append(index)
+        except KeyError as err:
+            results[index] = {
+                "release": item.get("release"),
+                "code": None,
+                "error": f"Invalid input. Missing required input parameter: {err}",
+            }
+        except Exception as err:
+            results[index] = {
+                "release": item.get("release") if isinstance(item, dict) else None,
+                "code": None,
+                "error": f"Invalid input. {err}",
+            }
+
+    try:
+        codes = handle_bulk_update_status_request(events)
+    except Exception as err:
+        logger.error(f"Unable to update the status of a batch of {len(events)} app instances. {err}, {type(err)}")
+        return Response("Unable to update the status of the specified app instances.", 500)
+
+    for index, event, code in zip(event_indices, events, codes):
+        results[index] = {"release": event.release, "code": code.value, "result": code.name}
+
+    logger.info(f"Processed a batch of {len(request.data)} status events of which {len(events)} were valid.")
+
+    return Response({"data": results})
+
+
+@require_GET
+@async_throttle(ContainerImageSearchThrottle)
+async def container_image_search(request):
+    """
+    Suggests Docker Hub images and tags matching a query for the image picker.
+    This is an async view, so waiting for Docker Hub does not occupy a worker thread.
+    """
     query = request.GET.get("query", "").strip()
     if not query:
         return JsonResponse({"error": "Query parameter is required"}, status=400)
 
-    docker_images = fetch_docker_hub_images_and_tags(query)
+    docker_images = await fetch_docker_hub_images_and_tags(query)
 
     return JsonResponse({"images": docker_images})
 
@@ -1056,6 +1116,7 @@ def get_content_review(request: HttpRequest) -> HttpResponse:
     - stats_message
     - several elements for recent users, projects and apps
     - several elements for link-only apps, non-running apps, errors apps
+    - deploy_queue with the number of pending and running deploy and delete operations
 
     Example request: /api/content-review/?token=<token>&from_hours=168
     """
@@ -1124,68 +1185,76 @@ def get_content_review(request: HttpRequest) -> HttpResponse:
         success_msg = _append_status_msg(success_msg, "Error setting number of recent projects (n_recent_projects).")
         logger.warning(f"Unable to get the number of recent projects: {e}", exc_info=True)
 
+    apps_link: list[str] = []
+    apps_not_running: list[str] = []
+    apps_status_error: list[str] = []
+    apps_suspect_status: list[dict[str, Any]] = []
+
     # Apps
-    # We loop over the apps queryset to capture all app-related information.
+    # Each element is collected by a filtered query over the app status annotation.
     try:
+        # User apps in category Serve. We are only interested in category Serve
+        apps = BaseAppInstance.objects.get_app_instances_not_deleted().filter(app__category="serve").order_by("pk")
+
         # Recently created user apps
-        apps = BaseAppInstance.objects.get_app_instances_not_deleted()
-
-        n_recent_apps = 0
-        n_apps_link = 0
-        apps_link = []
-        n_apps_not_running = 0
-        apps_not_running = []
-        n_apps_status_error = 0
-        apps_status_error = []
-        n_apps_suspect_status = 0
-        apps_suspect_status = []
-
-        for app in apps:
-            if app.app.category.slug == "serve":
-                # We are only interested in category Serve
-                if app.created_on > time_threshold:
-                    n_recent_apps += 1
-
-                # User apps with link only access
-                if app.k8s_values is not None and "permission" in app.k8s_values:
-                    if app.k8s_values["permission"] == "link":
-                        n_apps_link += 1
-                        apps_link.append(app.name[:6])
-
-                # Non-running user apps
-                if app.atn_app_status != "Running":
-                    n_apps_not_running += 1
-                    apps_not_running.append(app.name[:12])
-
-                if app.atn_app_status.startswith("Error"):
-                    n_apps_status_error += 1
-                    apps_status_error.append(app.name[:12])
-
-                # Suspect user app status
-                # Defined by if latest user action is either Creating or Changing
-                # but the k8s status is missing or Running and the app is older than
-                # 5 minutes (to account for deployments in progress)
-                if (
-                    app.latest_user_action in ["Creating", "Changing"]
-                    and (app.k8s_user_app_status is None or app.k8s_user_app_status.status != "Running")
-                    and app.created_on < datetime.now(timezone.utc) - timedelta(minutes=5)
-                ):
-                    n_apps_suspect_status += 1
-                    k8s_status = None if app.k8s_user_app_status is None else app.k8s_user_app_status.status
-                    apps_suspect_status.append(
-                        {
-                            "name": app.name[:12],
-                            "action": app.latest_user_action,
-                            "k8s_status": k8s_status,
-                            "created": app.created_on,
-                        }
-                    )
+        n_recent_apps = apps.filter(created_on__gt=time_threshold).count()
+
+        # User apps with link only access
+        apps_link = list(apps.filter(k8s_values__permission="link").values_list(Left("name", 6), flat=True))
+        n_apps_link = len(apps_link)
+
+        # Non-running user apps, including the apps in error
+        for name, app_status in apps.exclude(atn_app_status="Running").values_list(Left("name", 12), "atn_app_status"):
+            apps_not_running.append(name)
+
+            if app_status.startswith("Error"):
+                apps_status_error.append(name)
+
+        n_apps_not_running = len(apps_not_running)
+        n_apps_status_error = len(apps_status_error)
+
+        # Suspect user app status
+        # Defined by if latest user action is either Creating or Changing
+        # but the k8s status is missing or Running and the app is older than
+        # 5 minutes (to account for deployments in progress)
+        apps_suspect_status = [
+            {
+                "name": name,
+                "action": latest_user_action,
+                "k8s_status": k8s_status,
+                "created": created_on,
+            }
+            for name, latest_user_action, k8s_status, created_on in apps.filter(
+                latest_user_action__in=["Creating", "Changing"],
+                created_on__lt=datetime.now(timezone.utc) - timedelta(minutes=5),
+            )
+            .exclude(k8s_user_app_status__status="Running")
+            .values_list(Left("name", 12), "latest_user_action", "k8s_user_app_status__status", "created_on")
+        ]
+        n_apps_suspect_status = len(apps_suspect_status)
 
     except Exception as e:
         success = False
         success_msg = _append_status_msg(success_msg, f"Error setting app information. {e}")
         logger.warning(f"Unable to get the app information: {e}", exc_info=True)
 
+    # The depth of the Helm deploy and delete queues
+    deploy_queue_depth: dict[str, int] = {
+        "pending": n_default,
+        "running": n_default,
+        "releases": n_default,
+        "pending_user": n_default,
+        "pending_system": n_default,
+        "max_wait_seconds": n_default,
+    }
+
+    try:
+        deploy_queue_depth = ReleaseOperation.objects.get_queue_depth()
+    except Exception as e:
+        success = False
+        success_msg = _append_status_msg(success_msg, "Error setting the deploy queue depth (deploy_queue).")
+        logger.warning(f"Unable to get the deploy queue depth: {e}", exc_info=True)
+
     # Add the generic top-level elements
     stats["stats_date_utz"] = datetime.now(timezone.utc)
     stats["stats_from_hours"] = from_hours
@@ -1206,12 +1275,36 @@ def get_content_review(request: HttpRequest) -> HttpResponse:
     stats["apps_status_error"] = apps_status_error
     stats["n_apps_suspect_status"] = n_apps_suspect_status
     stats["apps_suspect_status"] = apps_suspect_status
+    stats["deploy_queue"] = deploy_queue_depth
 
     data = {"data": stats}
 
     return JsonResponse(data)
 
 
+def _parse_status_event(data: dict[str, Any]) -> K8sStatusEvent:
+    """
+    Parses and validates the input of a single app status event.
+    Raises KeyError if a required input parameter is missing.
+    """
+    # Required input
+    release = data["release"]
+
+    new_status = data["new-status"]
+
+    if len(new_status) > 20:
+        logger.debug(f"Status code is longer than 20 chars so shortening: {new_status}")
+        new_status = new_status[:20]
+
+    event_ts = datetime.strptime(data["event-ts"], "%Y-%m-%dT%H:%M:%S.%fZ")
+    event_ts = pytz.UTC.localize(event_ts)
+
+    # Optional
+    event_msg = data.get("event-msg", None)
+
+    return K8sStatusEvent(release, new_status, event_ts, event_msg)
+
+
 def validate_static_token(token: str) -> bool:
     # TODO: This token will be made dynamic in the future
     return token == "T7?fK9!pL2$vN4!"
@@ -1225,26 +1318,29 @@ def _append_status_msg(status_msg: str | None, new_msg: str) -> str:
         return f"{status_msg} {new_msg}"
 
 
-@api_view(["GET"])
-@authentication_classes([SessionAuthentication])
-@permission_classes([IsAuthenticated])
-def get_unique_ingress_ip_count(request, app_subdomain: str) -> JsonResponse:
+@require_GET
+async def get_unique_ingress_ip_count(request, app_subdomain: str) -> JsonResponse:
     """
     Returns the count of unique IPs that accessed the app (by subdomain) in the last 29 days.
     Only the app owner can access this endpoint.
+    This is an async view, so waiting for Loki does not occupy a worker thread.
     """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({"detail": "Authentication credentials were not provided."}, status=403)
+
     if not app_subdomain:
         return JsonResponse({"error": "Missing required parameter: app_subdomain"}, status=400)
 
     try:
-        app_instance = BaseAppInstance.objects.get(subdomain__subdomain=app_subdomain)
+        app_instance = await BaseAppInstance.objects.aget(subdomain__subdomain=app_subdomain)
     except BaseAppInstance.DoesNotExist as e:
         logger.error("Subdomain not found. %s", e)
         return JsonResponse({"error": f"Subdomain not found. {e}"}, status=404)
 
-    if (request.user == app_instance.owner) or request.user.is_superuser:
+    if (user.pk == app_instance.owner_id) or user.is_superuser:
         try:
-            count = query_unique_ip_count(app_subdomain=app_subdomain)
+            count = await query_unique_ip_count(app_subdomain=app_subdomain)
             return JsonResponse({"app_subdomain": app_subdomain, "unique_ip_count": count})
         except Exception as e:
             logger.error(f"Error retrieving unique IP count: {str(e)}")
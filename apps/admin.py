@@ -1,18 +1,18 @@
-import time
-
 from django.contrib import admin, messages
 from django.db.models.query import QuerySet
+from django.http import HttpResponseRedirect
+from django.urls import reverse
 from django.utils import timezone
 
 from studio.utils import get_logger
 
-from .constants import AppActionOrigin
-from .helpers import get_URI
 from .models import (
     AppCategories,
     Apps,
     AppStatus,
     BaseAppInstance,
+    BulkOperation,
+    BulkOperationItem,
     CustomAppInstance,
     DashInstance,
     DepictioInstance,
@@ -22,15 +22,17 @@ from .models import (
     K8sUserAppStatus,
     MLFlowInstance,
     NetpolicyInstance,
+    ReleaseOperation,
     RStudioInstance,
     ShinyInstance,
+    StandbyRelease,
     StreamlitInstance,
     Subdomain,
     TissuumapsInstance,
     VolumeInstance,
     VSCodeInstance,
 )
-from .tasks import delete_resource, deploy_resource
+from .tasks import start_bulk_operation
 
 logger = get_logger(__name__)
 
@@ -86,7 +88,7 @@ class BaseAppAdmin(admin.ModelAdmin):
     )
     readonly_fields = ("id", "created_on")
     list_filter = ["owner", "project", "k8s_user_app_status__status", "chart"]
-    actions = ["redeploy_apps", "deploy_resources", "delete_resources"]
+    actions = ["redeploy_apps", "deploy_resources", "force_deploy_resources", "delete_resources"]
 
     def display_status(self, obj):
         try:
@@ -128,62 +130,35 @@ class BaseAppAdmin(admin.ModelAdmin):
 
     @admin.action(description="(Re)deploy resources")
     def deploy_resources(self, request, queryset):
-        success_count = 0
-        failure_count = 0
-
-        for instance in queryset:
-            instance.set_k8s_values()
-            instance.url = get_URI(instance)
-            instance.save(update_fields=["k8s_values", "url"])
-
-            deploy_resource.delay(instance.serialize())
-            time.sleep(2)
-            info_dict = instance.info
-            if info_dict:
-                success = info_dict["helm"].get("success", False)
-                if success:
-                    success_count += 1
-                else:
-                    failure_count += 1
-            else:
-                failure_count += 1
-
-        if success_count:
-            self.message_user(request, f"{success_count} apps successfully (re)deployed.", messages.SUCCESS)
-        if failure_count:
-            self.message_user(
-                request, f"Failed to redeploy {failure_count} apps. Check logs for details.", messages.ERROR
-            )
+        # Apps whose values and chart are unchanged since their last successful deploy are skipped
+        return self._deploy_resources(request, queryset)
+
+    @admin.action(description="Force (re)deploy resources, including unchanged apps")
+    def force_deploy_resources(self, request, queryset):
+        return self._deploy_resources(request, queryset, force=True)
+
+    def _deploy_resources(self, request, queryset, force=False):
+        bulk_operation = start_bulk_operation(BulkOperation.DEPLOY, queryset, request.user, force)
+        return self._redirect_to_bulk_operation(request, bulk_operation)
 
     @admin.action(description="Delete resources")
     def delete_resources(self, request, queryset):
-        success_count = 0
-        failure_count = 0
-
-        for instance in queryset:
-            instance.set_k8s_values()
-            # Set latest_user_action to Deleting
-            # This hides the app from the user UI
-            instance.latest_user_action = "Deleting"
-            instance.deleted_on = timezone.now()
-            instance.save(update_fields=["latest_user_action", "deleted_on"])
-            delete_resource.delay(instance.serialize(), AppActionOrigin.USER.value)
-            info_dict = instance.info
-            if info_dict:
-                success = info_dict["helm"].get("success", False)
-                if success:
-                    success_count += 1
-                else:
-                    failure_count += 1
-            else:
-                failure_count += 1
-
-        if success_count:
-            self.message_user(request, f"{success_count} apps successfully deleted.", messages.SUCCESS)
-        if failure_count:
-            self.message_user(
-                request, f"Failed to delete {failure_count} apps. Check logs for details.", messages.ERROR
-            )
+        # Set latest_user_action to Deleting
+        # This hides the apps from the user UI
+        queryset.update(latest_user_action="Deleting", deleted_on=timezone.now())
+        # Queued deploys of the apps are superseded by the deletes
+        ReleaseOperation.objects.drop_pending("Superseded by a delete of the app instance", app_instance__in=queryset)
+
+        bulk_operation = start_bulk_operation(BulkOperation.DELETE, queryset, request.user)
+        return self._redirect_to_bulk_operation(request, bulk_operation)
+
+    def _redirect_to_bulk_operation(self, request, bulk_operation):
+        self.message_user(
+            request,
+            f"Started the {bulk_operation.operation} of {bulk_operation.items.count()} apps in the background.",
+            messages.INFO,
+        )
+        return HttpResponseRedirect(reverse("admin:apps_bulkoperation_change", args=[bulk_operation.pk]))
 
 
 @admin.register(BaseAppInstance)
@@ -307,7 +282,99 @@ class DepictioInstanceAdmin(BaseAppAdmin):
     list_display = BaseAppAdmin.list_display
 
 
+class ReleaseOperationAdmin(admin.ModelAdmin):
+    list_display = (
+        "release",
+        "operation",
+        "queue",
+        "app_instance",
+        "n_requests",
+        "created_on",
+        "started_on",
+    )
+    search_fields = ("release",)
+    list_filter = ["operation", "queue"]
+
+    def changelist_view(self, request, extra_context=None):
+        depth = ReleaseOperation.objects.get_queue_depth()
+        self.message_user(
+            request,
+            f"{depth['pending']} pending and {depth['running']} running operations on {depth['releases']} releases. "
+            f"The oldest pending operation has waited {depth['max_wait_seconds']} seconds.",
+            messages.INFO,
+        )
+        return super().changelist_view(request, extra_context)
+
+
+class BulkOperationItemInline(admin.TabularInline):
+    model = BulkOperationItem
+    fields = ("app_instance", "stage", "status", "message", "finished_on")
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+class BulkOperationAdmin(admin.ModelAdmin):
+    list_display = (
+        "pk",
+        "operation",
+        "force",
+        "project",
+        "status",
+        "display_progress",
+        "created_by",
+        "created_on",
+        "finished_on",
+    )
+    list_filter = ["operation", "status"]
+    fields = (
+        "operation",
+        "force",
+        "concurrency",
+        "project",
+        "project_status",
+        "status",
+        "display_progress",
+        "created_by",
+        "created_on",
+        "finished_on",
+    )
+    readonly_fields = fields
+    inlines = [BulkOperationItemInline]
+
+    def has_add_permission(self, request):
+        return False
+
+    def display_progress(self, obj):
+        progress = obj.get_progress()
+        return (
+            f"{progress['total'] - progress['pending']} of {progress['total']} apps processed, "
+            f"{progress['succeeded']} succeeded, {progress['failed']} failed"
+        )
+
+    display_progress.short_description = "Progress"
+
+
+class StandbyReleaseAdmin(admin.ModelAdmin):
+    list_display = (
+        "subdomain",
+        "project",
+        "flavor",
+        "environment",
+        "status",
+        "created_on",
+    )
+    search_fields = ("subdomain__subdomain", "project__name")
+    list_filter = ["status"]
+
+
 admin.site.register(Subdomain, SubdomainAdmin)
 admin.site.register(AppCategories)
 admin.site.register(AppStatus, AppStatusAdmin)
 admin.site.register(K8sUserAppStatus, K8sUserAppStatusAdmin)
+admin.site.register(ReleaseOperation, ReleaseOperationAdmin)
+admin.site.register(BulkOperation, BulkOperationAdmin)
+admin.site.register(StandbyRelease, StandbyReleaseAdmin)
@@ -2,6 +2,7 @@ import json
 from datetime import datetime
 from typing import Any, Optional, Tuple
 
+import redis
 import regex as re
 import requests
 import waffle
@@ -9,22 +10,30 @@ from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
 from django.db import transaction
+from django.db.models import Case, F, JSONField, Q, Value, When
 from django.forms.models import model_to_dict
 from django.utils import timezone
 from prometheus_client.parser import text_string_to_metric_families
 
 from apps.constants import AppActionOrigin, HandleUpdateStatusResponseCode
+from apps.types_.status_event import K8sStatusEvent
+from apps.types_.status_write_buffer import (
+    BufferedStatus,
+    K8sStatusWriteBuffer,
+    get_status_write_buffer,
+)
 from apps.types_.subdomain import SubdomainCandidateName
 from apps.validators.container_images import (
     DockerHubAuthenticator,
     GHCRAuthenticator,
     get_image_architectures,
+    get_manifest_digest,
 )
 from common.models import UserProfile
 from projects.models import Project
 from studio.utils import get_logger
 
-from .models import Apps, BaseAppInstance, K8sUserAppStatus, Subdomain
+from .models import Apps, BaseAppInstance, K8sUserAppStatus, StandbyRelease, Subdomain
 
 logger = get_logger(__name__)
 
@@ -117,6 +126,8 @@ def handle_update_status_request(
     Helper function to handle update k8s user app status requests by determining if the request should be performed or
     ignored.
     Technically this function either updates or creates and persists a new K8sUserAppStatus object.
+    If the status write-behind buffer is enabled, events that only update the time of the status are
+    absorbed by the buffer and persisted later by the periodic task flush_k8s_status_write_buffer.
 
     :param release str: The release id of the app instance, stored in the AppInstance.k8s_values dict in the subdomain.
     :param new_status str: The new status code. Trimmed to max 20 chars if needed.
@@ -128,16 +139,27 @@ def handle_update_status_request(
     if len(new_status) > 20:
         new_status = new_status[:20]
 
+    status_buffer = get_status_write_buffer()
+
+    if status_buffer is not None:
+        result = _absorb_buffered_status(status_buffer, release, new_status, event_ts, event_msg)
+        if result is not None:
+            return result
+
     try:
         # Begin by verifying that the requested app instance exists
         # We wrap the select and update tasks in a select_for_update lock
         # to avoid race conditions.
-
-        # release takes on the value of the subdomain
-        subdomain = Subdomain.objects.get(subdomain=release)
+        # The subdomain and status are joined so that a single query resolves the app instance.
 
         with transaction.atomic():
-            instance = BaseAppInstance.objects.select_for_update().filter(subdomain=subdomain).last()
+            # release takes on the value of the subdomain
+            instance = (
+                BaseAppInstance.objects.select_for_update(of=("self",))
+                .select_related("k8s_user_app_status")
+                .filter(subdomain__subdomain=release)
+                .last()
+            )
             if instance is None:
                 logger.info(f"The specified app instance identified by release {release} was not found")
                 return HandleUpdateStatusResponseCode.OBJECT_NOT_FOUND
@@ -148,82 +170,265 @@ def handle_update_status_request(
             if instance.k8s_user_app_status is None:
                 # Missing k8s_user_app_status so create one now
                 logger.debug(f"AppInstance {release} does not have an associated K8sUserAppStatus. Creating one now.")
-                k8s_user_app_status = K8sUserAppStatus.objects.create()
-                update_k8s_user_app_status(instance, k8s_user_app_status, new_status, event_ts, event_msg)
-                return HandleUpdateStatusResponseCode.CREATED_FIRST_STATUS
+                k8s_user_app_status = update_k8s_user_app_status(instance, None, new_status, event_ts, event_msg)
+                result = HandleUpdateStatusResponseCode.CREATED_FIRST_STATUS
             else:
                 k8s_user_app_status = instance.k8s_user_app_status
 
-            logger.debug(
-                f"K8sUserAppStatus object was created or updated with status {k8s_user_app_status.status}, \
-                    ts={k8s_user_app_status.time}, {k8s_user_app_status.info}"
-            )
+                logger.debug(
+                    f"K8sUserAppStatus object was created or updated with status {k8s_user_app_status.status}, \
+                        ts={k8s_user_app_status.time}, {k8s_user_app_status.info}"
+                )
+
+                # Now determine whether to update the state and status
+
+                # Compare timestamps
+                time_ftm = "%Y-%m-%d %H:%M:%S"
+                if event_ts <= k8s_user_app_status.time:
+                    msg = "The incoming event-ts is older than the current status ts so nothing to do."
+                    msg += f"event_ts={event_ts.strftime(time_ftm)} vs \
+                        k8s_user_app_status.time={str(k8s_user_app_status.time.strftime(time_ftm))}"
+                    logger.debug(msg)
+                    result = HandleUpdateStatusResponseCode.NO_ACTION
+
+                # The event is newer than the existing persisted object
+
+                elif new_status == k8s_user_app_status.status:
+                    # The same status. Simply update the time.
+                    logger.debug(f"The same status {new_status}. Simply update the time.")
+                    update_status_time(k8s_user_app_status, event_ts, event_msg)
+                    result = HandleUpdateStatusResponseCode.UPDATED_TIME_OF_STATUS
+
+                else:
+                    # Different status and newer time
+                    logger.debug(
+                        f"Different status and newer time. New status={new_status} vs Old={k8s_user_app_status.status}"
+                    )
+                    update_k8s_user_app_status(instance, k8s_user_app_status, new_status, event_ts, event_msg)
+                    result = HandleUpdateStatusResponseCode.UPDATED_STATUS
+
+    except Exception as err:
+        logger.error(f"Unable to fetch or update the specified app instance with release={release}. {err}, {type(err)}")
+        raise
+
+    if status_buffer is not None:
+        _seed_buffered_status(status_buffer, release, k8s_user_app_status)
+
+    return result
+
+
+def _absorb_buffered_status(
+    status_buffer: K8sStatusWriteBuffer,
+    release: str,
+    new_status: str,
+    event_ts: datetime,
+    event_msg: Optional[dict] = None,
+) -> Optional[HandleUpdateStatusResponseCode]:
+    """
+    Attempts to handle a status event in the write-behind buffer without touching the database.
+
+    :returns: The response code if the event was handled by the buffer, otherwise None meaning that the event
+        must be written through to the database.
+    """
+    try:
+        outcome = status_buffer.absorb(release, new_status, event_ts, event_msg)
+    except redis.RedisError as err:
+        logger.warning(f"Unable to use the status write buffer for release={release}. Writing through. {err}")
+        return None
+
+    if outcome == K8sStatusWriteBuffer.ABSORBED:
+        logger.debug(f"The same status {new_status}. Buffered the time of release {release}.")
+        return HandleUpdateStatusResponseCode.UPDATED_TIME_OF_STATUS
+    elif outcome == K8sStatusWriteBuffer.STALE:
+        logger.debug(f"The incoming event-ts is older than the buffered status ts of release {release}.")
+        return HandleUpdateStatusResponseCode.NO_ACTION
+
+    return None
+
+
+def _seed_buffered_status(status_buffer: K8sStatusWriteBuffer, release: str, status_object: K8sUserAppStatus):
+    """Stores the persisted state of a status object in the write-behind buffer."""
+    try:
+        status_buffer.seed(release, status_object.pk, status_object.status, status_object.time)
+    except redis.RedisError as err:
+        logger.warning(f"Unable to seed the status write buffer for release={release}. {err}")
 
-            # Now determine whether to update the state and status
 
-            # Compare timestamps
-            time_ftm = "%Y-%m-%d %H:%M:%S"
-            if event_ts <= k8s_user_app_status.time:
-                msg = "The incoming event-ts is older than the current status ts so nothing to do."
-                msg += f"event_ts={event_ts.strftime(time_ftm)} vs \
-                    k8s_user_app_status.time={str(k8s_user_app_status.time.strftime(time_ftm))}"
-                logger.debug(msg)
-                return HandleUpdateStatusResponseCode.NO_ACTION
+def flush_buffered_status_times(entries: list[BufferedStatus]) -> int:
+    """
+    Helper function to persist buffered k8s user app statuses in a single statement.
+    A buffered state is only applied if it is newer than the persisted state, so that the newest event wins
+    also when status transitions have been written through in the meantime.
+
+    :param entries list[BufferedStatus]: The buffered states to persist.
+    :returns: The number of updated status objects.
+    """
 
-            # The event is newer than the existing persisted object
+    if not entries:
+        return 0
+
+    newer = Q()
+    status_whens = []
+    time_whens = []
+    info_whens = []
+
+    for entry in entries:
+        condition = Q(pk=entry.status_id, time__lt=entry.time)
+        newer |= condition
+        status_whens.append(When(condition, then=Value(entry.status)))
+        time_whens.append(When(condition, then=Value(entry.time)))
+        if entry.info is not None:
+            info_whens.append(When(condition, then=Value(entry.info, output_field=JSONField())))
+
+    n_updated = K8sUserAppStatus.objects.filter(newer).update(
+        status=Case(*status_whens, default=F("status")),
+        time=Case(*time_whens, default=F("time")),
+        info=Case(*info_whens, default=F("info")),
+    )
 
-            if new_status == instance.k8s_user_app_status.status:
-                # The same status. Simply update the time.
-                logger.debug(f"The same status {new_status}. Simply update the time.")
-                update_status_time(k8s_user_app_status, event_ts, event_msg)
-                return HandleUpdateStatusResponseCode.UPDATED_TIME_OF_STATUS
+    logger.debug(f"Flushed {len(entries)} buffered statuses. Updated {n_updated} status objects.")
 
-            # Different status and newer time
-            logger.debug(
-                f"Different status and newer time. New status={new_status} vs Old={instance.k8s_user_app_status.status}"
+    return n_updated
+
+
+def handle_bulk_update_status_request(events: list[K8sStatusEvent]) -> list[HandleUpdateStatusResponseCode]:
+    """
+    Helper function to handle a batch of update k8s user app status requests.
+    The events are evaluated in the submitted order using the same rules as handle_update_status_request,
+    but all affected app instances are resolved and locked with a single query, the newest-event-wins
+    rule is applied in memory and the resulting statuses are persisted using bulk writes.
+
+    :param events list[K8sStatusEvent]: The status events to process.
+    :returns: A list of HandleUpdateStatusResponseCode values, one per event and in the same order as the events.
+    """
+
+    if not events:
+        return []
+
+    releases = {event.release for event in events}
+
+    try:
+        with transaction.atomic():
+            # Resolve the subdomains and lock the app instances in one statement.
+            # The rows are locked in primary key order to avoid deadlocks between concurrent batches.
+            instances = (
+                BaseAppInstance.objects.select_for_update(of=("self",))
+                .select_related("subdomain", "k8s_user_app_status")
+                .filter(subdomain__subdomain__in=releases)
+                .order_by("pk")
             )
-            status_object = instance.k8s_user_app_status
-            update_k8s_user_app_status(instance, status_object, new_status, event_ts, event_msg)
-            return HandleUpdateStatusResponseCode.UPDATED_STATUS
 
-    except ObjectDoesNotExist:
-        logger.info(f"No such subdomain exists identified by release={release}")
-        return HandleUpdateStatusResponseCode.OBJECT_NOT_FOUND
+            # Same as .last() in handle_update_status_request
+            instance_by_release = {instance.subdomain.subdomain: instance for instance in instances}
+
+            results = []
+            created_status_instances = {}
+            changed_status_objects = {}
+
+            for event in events:
+                instance = instance_by_release.get(event.release)
+
+                if instance is None:
+                    logger.info(f"The specified app instance identified by release {event.release} was not found")
+                    results.append(HandleUpdateStatusResponseCode.OBJECT_NOT_FOUND)
+                    continue
+
+                new_status = event.new_status[:20]
+                status_object = instance.k8s_user_app_status
+
+                if status_object is None:
+                    # Missing k8s_user_app_status so create one now
+                    instance.k8s_user_app_status = K8sUserAppStatus(
+                        status=new_status, time=event.event_ts, info=event.event_msg
+                    )
+                    created_status_instances[instance.pk] = instance
+                    results.append(HandleUpdateStatusResponseCode.CREATED_FIRST_STATUS)
+                    continue
+
+                if event.event_ts <= status_object.time:
+                    results.append(HandleUpdateStatusResponseCode.NO_ACTION)
+                    continue
+
+                if new_status == status_object.status:
+                    # The same status. Simply update the time.
+                    status_object.time = event.event_ts
+                    if event.event_msg is not None:
+                        status_object.info = event.event_msg
+                    results.append(HandleUpdateStatusResponseCode.UPDATED_TIME_OF_STATUS)
+                else:
+                    # Different status and newer time
+                    status_object.status = new_status
+                    status_object.time = event.event_ts
+                    status_object.info = event.event_msg
+                    results.append(HandleUpdateStatusResponseCode.UPDATED_STATUS)
+
+                if status_object.pk is not None:
+                    changed_status_objects[status_object.pk] = status_object
+
+            if created_status_instances:
+                new_status_objects = [instance.k8s_user_app_status for instance in created_status_instances.values()]
+
+                # bulk_create overwrites the auto_now_add field time, so it is restored by the bulk update below
+                event_times = [status_object.time for status_object in new_status_objects]
+                K8sUserAppStatus.objects.bulk_create(new_status_objects)
+
+                for status_object, event_time in zip(new_status_objects, event_times):
+                    status_object.time = event_time
+                    changed_status_objects[status_object.pk] = status_object
+
+                for instance in created_status_instances.values():
+                    instance.k8s_user_app_status_id = instance.k8s_user_app_status.pk
+
+                BaseAppInstance.objects.bulk_update(created_status_instances.values(), ["k8s_user_app_status"])
+
+            if changed_status_objects:
+                K8sUserAppStatus.objects.bulk_update(changed_status_objects.values(), ["status", "time", "info"])
 
     except Exception as err:
-        logger.error(f"Unable to fetch or update the specified app instance with release={release}. {err}, {type(err)}")
+        logger.error(
+            f"Unable to update the app instances of a batch of {len(events)} status events. {err}, {type(err)}"
+        )
         raise
 
+    status_buffer = get_status_write_buffer()
+
+    if status_buffer is not None:
+        for release, instance in instance_by_release.items():
+            if instance.k8s_user_app_status is not None:
+                _seed_buffered_status(status_buffer, release, instance.k8s_user_app_status)
+
+    logger.debug(
+        f"Processed a batch of {len(events)} status events for {len(releases)} releases. "
+        f"Persisted {len(changed_status_objects)} status objects of which {len(created_status_instances)} were new."
+    )
+
+    return results
+
 
-@transaction.atomic
 def update_k8s_user_app_status(
     appinstance: BaseAppInstance,
-    status_object: K8sUserAppStatus,
+    status_object: Optional[K8sUserAppStatus],
     status: str,
     status_ts: datetime = None,
     event_msg: str = None,
-):
+) -> K8sUserAppStatus:
     """
     Helper function to update the k8s user app status of an appinstance and a status object.
+    The supplied event time is stored as is and each case is performed in a single statement.
+    If the appinstance does not yet have a status object, then a new one is created and linked to the appinstance.
+
+    :returns: The updated or created status object.
     """
-    # Persist a new app statuss object
+    if status_object is None:
+        return K8sUserAppStatus.objects.create_for_app_instance(appinstance, status, status_ts, event_msg)
+
+    K8sUserAppStatus.objects.filter(pk=status_object.pk).update(status=status, time=status_ts, info=event_msg)
+
     status_object.status = status
     status_object.time = status_ts
     status_object.info = event_msg
-    status_object.save()
 
-    # Must re-save the app statuss object with the new event ts
-    status_object.time = status_ts
-
-    if event_msg is None:
-        status_object.save(update_fields=["time"])
-    else:
-        status_object.info = event_msg
-        status_object.save(update_fields=["time", "info"])
-
-    # Update the app instance object
-    appinstance.k8s_user_app_status = status_object
-    appinstance.save(update_fields=["k8s_user_app_status"])
+    return status_object
 
 
 @transaction.atomic
@@ -254,7 +459,6 @@ def update_status(appinstance, status_object, status, status_ts=None, event_msg=
     appinstance.save(update_fields=["app_status"])
 
 
-@transaction.atomic
 def update_status_time(status_object: Any, status_ts: datetime, event_msg: str | None = None):
     """
     Helper function to update the time of an app status event.
@@ -281,7 +485,7 @@ def get_URI(instance):
 
 
 @transaction.atomic
-def create_instance_from_form(form, project, app_slug, app_id=None) -> int:
+def create_instance_from_form(form, project, app_slug, app_id=None, queue_deploy=True) -> int:
     """
     Create or update an instance from a form. This function handles both the creation of new instances
     and the updating of existing ones based on the presence of an app_id.
@@ -291,6 +495,7 @@ def create_instance_from_form(form, project, app_slug, app_id=None) -> int:
     - project: The project to which this instance belongs.
     - app_slug: Slug of the app associated with this instance.
     - app_id: Optional ID of an existing instance to update. If None, a new instance is created.
+    - queue_deploy: Whether to queue the deploy of the resource. If False, the caller deploys the resource.
 
     Returns:
     - The newly created or updated instance.
@@ -298,7 +503,7 @@ def create_instance_from_form(form, project, app_slug, app_id=None) -> int:
     Raises:
     - ValueError: If the form does not have a 'subdomain' or if the specified app cannot be found.
     """
-    from .tasks import deploy_resource
+    from .tasks import STANDBY_APP_SLUG, queue_deploy_resource
 
     assert form is not None, "This function requires a form object"
     assert project is not None, "This function requires a project object"
@@ -344,6 +549,13 @@ def create_instance_from_form(form, project, app_slug, app_id=None) -> int:
 
     instance = form.save(commit=False)
 
+    if new_app and app_slug == STANDBY_APP_SLUG and not is_created_by_user:
+        # Take over a pre-installed release of the warm pool of the project, if any,
+        # so that the deploy upgrades a running release instead of installing a new one
+        standby_release = StandbyRelease.objects.claim(project, instance.flavor, instance.environment)
+        if standby_release is not None:
+            subdomain_name = standby_release.subdomain.subdomain
+
     # Retrieve or create the subdomain
     subdomain, created = Subdomain.objects.get_or_create(
         subdomain=subdomain_name, project=project, is_created_by_user=is_created_by_user
@@ -365,9 +577,11 @@ def create_instance_from_form(form, project, app_slug, app_id=None) -> int:
     setup_instance(instance, subdomain, app, project, user_action)
     instance_id = save_instance_and_related_data(instance, form)
 
-    if do_deploy:
+    if do_deploy and not queue_deploy:
+        logger.debug(f"Leaving the deploy of resource app with app_id = {app_id} to the caller")
+    elif do_deploy:
         logger.debug(f"Now deploying resource app with app_id = {app_id}")
-        deploy_resource.delay(instance.serialize())
+        queue_deploy_resource(instance)
     else:
         logger.debug(f"Not re-deploying this app with app_id = {app_id}")
 
@@ -390,8 +604,9 @@ def handle_subdomain_change(instance: Any, subdomain: str, subdomain_name: str)
     """
     Detects if there has been a user-initiated subdomain change and if so,
     then re-creates the app instance, also re-deploying the k8s resource.
+    The old release is deleted through its release operation queue, after any running operation of the release.
     """
-    from .tasks import delete_resource
+    from .tasks import queue_delete_resource
 
     assert instance is not None, "instance is required"
 
@@ -402,8 +617,8 @@ def handle_subdomain_change(instance: Any, subdomain: str, subdomain_name: str)
 
     if instance.subdomain.subdomain != subdomain_name:
         # The user modified the subdomain name
-        # In this special case, we avoid async task.
-        delete_resource(instance.serialize(), AppActionOrigin.USER.value)
+        # The app instance still has the values of the old release, so the delete is queued on the old release
+        queue_delete_resource(instance, AppActionOrigin.USER.value)
         old_subdomain = instance.subdomain
         instance.subdomain = subdomain
         instance.save(update_fields=["subdomain"])
@@ -476,29 +691,13 @@ def validate_path_k8s_label_compatible(candidate: str) -> None:
         raise ValidationError(error_message)
 
 
-def check_ghcr_owner_type(owner: str):
-    """Determines whether a GHCR owner is a User or an Organization."""
-
-    gh_owner_url = f"{settings.GITHUB_API}/users/{owner}"
-    headers = {"Accept": "application/vnd.github+json"}
-
-    try:
-        response = requests.get(gh_owner_url, headers=headers)
-        response.raise_for_status()
-        data = response.json()
-
-        owner_type = data.get("type")
-        if owner_type in {"User", "Organization"}:
-            return owner_type
-
-        raise ValidationError("Invalid response structure from GitHub API for Owner type.")
-
-    except requests.RequestException as e:
-        raise ValidationError(f"Failed to fetch GHCR owner type: {e}")
-
-
 def validate_ghcr_image(image: str):
-    """Validates whether a given GHCR image exists."""
+    """
+    Validates whether a given GHCR image exists.
+
+    The tag is resolved with a single HEAD request for its manifest to the registry, and the digest it resolves to
+    is cached together with the manifest and architectures used by the architecture check.
+    """
 
     # regex match:
     # ghcr\.io/ - ghcr.io
@@ -511,47 +710,18 @@ def validate_ghcr_image(image: str):
 
     owner, image_name, tag = match.group("owner"), match.group("image"), match.group("tag")
 
-    owner_type = check_ghcr_owner_type(owner)
-    if owner_type == "Organization":
-        image_url = f"https://api.github.com/orgs/{owner}/packages/container/{image_name}/versions"
-    elif owner_type == "User":
-        image_url = f"https://api.github.com/users/{owner}/packages/container/{image_name}/versions"
-    else:
-        raise ValidationError("Could not recognise the GHCR owner. Please try again.")
-
-    # Return the image if the GitHub API token is missing
-    if settings.GITHUB_API_TOKEN in ["", None]:
-        return image
-
-    headers = {"Authorization": f"Bearer {settings.GITHUB_API_TOKEN}", "Accept": "application/vnd.github+json"}
-
-    try:
-        response = requests.get(image_url, headers=headers)
-        response.raise_for_status()
-    except requests.RequestException as e:
-        raise ValidationError(f"The specified GHCR image was not found.: {e}")
-
-    try:
-        versions = response.json()
-        for version in versions:
-            container_metadata = version["metadata"]["container"]
-            tags = container_metadata.get("tags", [])
-            if tag in tags:
-                break
-        else:
-            raise ValidationError(f"Tag '{tag}' not found in GHCR image. Please try again.")
+    auth = GHCRAuthenticator(username=settings.GITHUB_API_USERNAME, token=settings.GITHUB_API_TOKEN)
+    repo = f"{owner}/{image_name}"
 
-    except KeyError:
-        raise ValidationError("Unable to find GHCR image tag. Please try again.")
+    digest = get_manifest_digest(registry_auth=auth, repository=repo, reference=tag, registry="ghcr.io")
+    if digest is None:
+        raise ValidationError(f"Tag '{tag}' not found in GHCR image, or the image is not public. Please try again.")
 
     if waffle.switch_is_active("docker_image_architecture_validator"):
         architectures = get_image_architectures(
-            auth=GHCRAuthenticator(
-                username=settings.GITHUB_API_USERNAME,
-                token=settings.GITHUB_API_TOKEN,
-            ),
-            repo=f"{owner}/{image_name}",
-            reference=tag,
+            auth=auth,
+            repo=repo,
+            reference=digest,
             registry="ghcr.io",
         )
         if any(arch.arch != "amd64" for arch in architectures):
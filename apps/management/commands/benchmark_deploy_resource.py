@@ -0,0 +1,134 @@
+import os
+import stat
+import tempfile
+import time
+from contextlib import contextmanager
+from statistics import mean
+from unittest.mock import patch
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from apps.app_registry import APP_REGISTRY
+from apps.models import BaseAppInstance
+from apps.tasks import deploy_resource
+
+STUB_HELM = """#!/bin/sh
+sleep {seconds}
+echo "stub helm $@"
+"""
+
+
+class ConnectionHoldTimer:
+    """Measures the time that the default database connection is held open by the current thread."""
+
+    def __init__(self):
+        self.connection = connections["default"]
+        self.held_seconds = 0.0
+        self._held_since = None
+
+    def _start(self):
+        if self._held_since is None and self.connection.connection is not None:
+            self._held_since = time.perf_counter()
+
+    def _stop(self):
+        if self._held_since is not None:
+            self.held_seconds += time.perf_counter() - self._held_since
+            self._held_since = None
+
+    @contextmanager
+    def measure(self):
+        connect, close = self.connection.connect, self.connection.close
+
+        def timed_connect():
+            connect()
+            self._start()
+
+        def timed_close():
+            close()
+            if self.connection.connection is None:
+                self._stop()
+
+        with patch.object(self.connection, "connect", timed_connect), patch.object(
+            self.connection, "close", timed_close
+        ):
+            self._start()
+            try:
+                yield self
+            finally:
+                self._stop()
+
+
+class Command(BaseCommand):
+    help = """Benchmarks the database connection hold time per deploy of the deploy_resource task.
+    Deploys existing app instances with a stub helm binary that sleeps instead of deploying.
+    The helm info and deployed digest of the app instances are restored afterwards."""
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=5, help="The number of app instances to deploy")
+        parser.add_argument("--helm-seconds", type=float, default=2.0, help="The duration of each helm command")
+        parser.add_argument(
+            "--hold-transaction",
+            action="store_true",
+            help="Run each deploy in a transaction, as deploy_resource used to, for comparison",
+        )
+
+    def handle(self, *args, **options):
+        queryset = (
+            BaseAppInstance.objects.get_app_instances_not_deleted()
+            .exclude(k8s_values=None)
+            .order_by("-created_on")[: options["count"]]
+        )
+        app_instances = APP_REGISTRY.fetch_app_instances(queryset)
+
+        if not app_instances:
+            raise CommandError("There are no app instances to deploy")
+
+        original_state = {
+            app_instance.pk: dict(
+                info=app_instance.info,
+                deployed_values_digest=app_instance.deployed_values_digest,
+                deployed_chart=app_instance.deployed_chart,
+            )
+            for app_instance in app_instances
+        }
+
+        with tempfile.TemporaryDirectory() as stub_dir:
+            helm_path = os.path.join(stub_dir, "helm")
+            with open(helm_path, "w") as f:
+                f.write(STUB_HELM.format(seconds=options["helm_seconds"]))
+            os.chmod(helm_path, os.stat(helm_path).st_mode | stat.S_IEXEC)
+
+            results = []
+
+            try:
+                with patch.dict(os.environ, {"PATH": stub_dir + os.pathsep + os.environ["PATH"]}):
+                    for app_instance in app_instances:
+                        results.append(self.benchmark_deploy(app_instance, options["hold_transaction"]))
+            finally:
+                for pk, state in original_state.items():
+                    BaseAppInstance.objects.filter(pk=pk).update(**state)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Deployed {len(results)} app instances. "
+                f"Mean duration {mean(duration for duration, _ in results):.3f}s, "
+                f"mean connection hold time {mean(held for _, held in results):.3f}s"
+            )
+        )
+
+    def benchmark_deploy(self, app_instance, hold_transaction):
+        timer = ConnectionHoldTimer()
+        started = time.perf_counter()
+
+        with timer.measure():
+            if hold_transaction:
+                with transaction.atomic():
+                    deploy_resource(app_instance.serialize(), force=True)
+            else:
+                deploy_resource(app_instance.serialize(), force=True)
+
+        duration = time.perf_counter() - started
+        self.stdout.write(f"{app_instance.name}: duration {duration:.3f}s, connection held {timer.held_seconds:.3f}s")
+
+        return duration, timer.held_seconds
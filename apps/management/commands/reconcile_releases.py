@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from apps.tasks import reconcile_releases
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconciles the Helm releases of the namespace with the app instances in the database, "
+        "uninstalling orphan releases and redeploying app instances without a release."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Only report the drift without fixing it")
+
+    def handle(self, *args, **options):
+        report = reconcile_releases(dry_run=options["dry_run"])
+
+        self.stdout.write(f"Releases in the namespace: {report['releases']}")
+        self.stdout.write(f"Orphan releases: {', '.join(report['orphan_releases']) or '-'}")
+        self.stdout.write(f"App instances without a release: {', '.join(report['missing_releases']) or '-'}")
+
+        if options["dry_run"]:
+            self.stdout.write(self.style.WARNING("Dry run, nothing was changed"))
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Uninstalled {len(report['deleted_orphan_releases'])} orphan releases "
+                    f"and queued the redeploy of {len(report['missing_releases'])} app instances"
+                )
+            )
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.4 on 2026-10-18 07:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("apps", "0033_alter_customappinstance_description_and_more"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="baseappinstance",
+            name="created_on",
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.4 on 2026-10-18 08:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("apps", "0034_baseappinstance_created_on_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReleaseOperation",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("release", models.CharField(db_index=True, max_length=53)),
+                ("operation", models.CharField(choices=[("deploy", "Deploy"), ("delete", "Delete")], max_length=10)),
+                ("serialized_instance", models.JSONField()),
+                ("initiated_by", models.CharField(blank=True, max_length=10, null=True)),
+                ("n_requests", models.PositiveIntegerField(default=1)),
+                ("created_on", models.DateTimeField(auto_now_add=True)),
+                ("started_on", models.DateTimeField(blank=True, null=True)),
+                (
+                    "app_instance",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="release_operations",
+                        to="apps.baseappinstance",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Release Operation",
+                "verbose_name_plural": "Release Operations",
+            },
+        ),
+    ]
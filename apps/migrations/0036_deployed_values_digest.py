@@ -0,0 +1,27 @@
+# Generated by Django 5.1.4 on 2026-10-18 08:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("apps", "0035_releaseoperation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="baseappinstance",
+            name="deployed_chart",
+            field=models.CharField(blank=True, editable=False, max_length=512, null=True),
+        ),
+        migrations.AddField(
+            model_name="baseappinstance",
+            name="deployed_values_digest",
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name="releaseoperation",
+            name="force",
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.1.4 on 2026-10-18 08:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("apps", "0036_deployed_values_digest"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BulkOperation",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("operation", models.CharField(choices=[("deploy", "Deploy"), ("delete", "Delete")], max_length=10)),
+                ("force", models.BooleanField(default=False, help_text="Deploy also app instances that are unchanged")),
+                (
+                    "concurrency",
+                    models.PositiveIntegerField(help_text="The maximum number of app instances processed in parallel"),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("running", "Running"), ("finished", "Finished")], default="running", max_length=10
+                    ),
+                ),
+                ("created_on", models.DateTimeField(auto_now_add=True)),
+                ("finished_on", models.DateTimeField(blank=True, null=True)),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Bulk Operation",
+                "verbose_name_plural": "Bulk Operations",
+            },
+        ),
+        migrations.CreateModel(
+            name="BulkOperationItem",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("pending", "Pending"), ("succeeded", "Succeeded"), ("failed", "Failed")],
+                        default="pending",
+                        max_length=10,
+                    ),
+                ),
+                ("message", models.TextField(blank=True, default="")),
+                ("finished_on", models.DateTimeField(blank=True, null=True)),
+                (
+                    "app_instance",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="+", to="apps.baseappinstance"
+                    ),
+                ),
+                (
+                    "bulk_operation",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="items", to="apps.bulkoperation"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Bulk Operation Item",
+                "verbose_name_plural": "Bulk Operation Items",
+            },
+        ),
+    ]
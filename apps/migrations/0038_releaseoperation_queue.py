@@ -0,0 +1,17 @@
+# Generated by Django 5.1.4 on 2026-10-18 09:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("apps", "0037_bulkoperation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="releaseoperation",
+            name="queue",
+            field=models.CharField(choices=[("user", "User"), ("system", "System")], default="user", max_length=10),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.1.4 on 2026-10-18 09:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("apps", "0038_releaseoperation_queue"),
+        ("projects", "0009_projecttemplate_standby_pool_size"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StandbyRelease",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("deploying", "Deploying"), ("ready", "Ready"), ("failed", "Failed")],
+                        default="deploying",
+                        max_length=10,
+                    ),
+                ),
+                ("info", models.JSONField(blank=True, null=True)),
+                ("created_on", models.DateTimeField(auto_now_add=True)),
+                (
+                    "environment",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="projects.environment",
+                    ),
+                ),
+                (
+                    "flavor",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="+", to="projects.flavor"
+                    ),
+                ),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="standby_releases",
+                        to="projects.project",
+                    ),
+                ),
+                (
+                    "subdomain",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="standby_release", to="apps.subdomain"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Standby Release",
+                "verbose_name_plural": "Standby Releases",
+            },
+        ),
+    ]
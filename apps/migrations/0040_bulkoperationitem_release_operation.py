@@ -0,0 +1,29 @@
+# Generated by Django 5.1.4 on 2026-10-18 10:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("apps", "0039_standbyrelease"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="bulkoperationitem",
+            name="release_operation",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="bulk_operation_items",
+                to="apps.releaseoperation",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="bulkoperation",
+            name="concurrency",
+            field=models.PositiveIntegerField(help_text="The maximum number of app instances queued at a time"),
+        ),
+    ]
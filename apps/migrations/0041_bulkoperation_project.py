@@ -0,0 +1,38 @@
+# Generated by Django 5.1.4 on 2026-10-18 10:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("apps", "0040_bulkoperationitem_release_operation"),
+        ("projects", "0009_projecttemplate_standby_pool_size"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="bulkoperation",
+            name="project",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="The project whose app instances are deployed or deleted, for the creation or deletion of a project",
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="projects.project",
+            ),
+        ),
+        migrations.AddField(
+            model_name="bulkoperation",
+            name="project_status",
+            field=models.CharField(
+                blank=True, help_text="The status set on the project when the job is finished", max_length=20, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="bulkoperationitem",
+            name="stage",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+    ]
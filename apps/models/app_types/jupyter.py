@@ -29,7 +29,8 @@ class JupyterInstance(BaseAppInstance):
         #           {release: r1582t9h9
 
         volumeK8s_dict = {"volumeK8s": {}}
-        for object in self.volume.all():
+        # An unsaved instance, e.g. the prototype of a standby release, has no volumes
+        for object in self.volume.all() if self.pk else []:
             volumeK8s_dict["volumeK8s"][object.name] = dict(release=object.subdomain.subdomain)
         k8s_values["apps"] = volumeK8s_dict
         if self.environment:
@@ -2,7 +2,10 @@ from .app_categories import AppCategories
 from .app_status import AppStatus
 from .app_template import Apps
 from .base import AppInstanceManager, BaseAppInstance
+from .bulk_operation import BulkOperation, BulkOperationItem
 from .k8s_user_app_status import K8sUserAppStatus
 from .logs_enabled_mixin import LogsEnabledMixin
+from .release_operation import ReleaseOperation
 from .social_mixin import SocialMixin
+from .standby_release import StandbyRelease
 from .subdomain import Subdomain
@@ -90,18 +90,22 @@ class AppInstanceManager(models.Manager):
                 time_threshold = datetime.now() - timedelta(minutes=deleted_time_delta)
                 q &= ~Q(atn_app_status="Deleted") | Q(deleted_on__gte=time_threshold)
 
+        q &= self.get_app_instances_of_user_filter(user)
+
+        q &= Q(project=project)
+
+        return q
+
+    def get_app_instances_of_user_filter(self, user):
+        """A filter on the app instances that the user may see based on ownership and access."""
         if hasattr(self.model, "access"):
-            q &= Q(owner=user) | Q(
+            return Q(owner=user) | Q(
                 access__in=(
                     ["project", "public", "private", "link"] if user.is_superuser else ["project", "public", "link"]
                 )
             )
-        else:
-            q &= Q(owner=user)
-
-        q &= Q(project=project)
 
-        return q
+        return Q(owner=user)
 
     def get_app_instances_of_project(
         self,
@@ -132,24 +136,31 @@ class AppInstanceManager(models.Manager):
             .order_by(order_by)[:limit]
         )
 
-    def user_can_create(self, user, project, app_slug):
+    def user_can_create(self, user, project, app_slug, app=None, num_of_app_instances=None):
+        """
+        Determines if the user can create another app instance of the app type in the project.
+        The app type and the current number of app instances can be passed in when already known,
+        e.g. when checking several app types at once.
+        """
         apps_per_project = {} if project.apps_per_project is None else project.apps_per_project
 
         limit = apps_per_project[app_slug] if app_slug in apps_per_project else None
-        app = Apps.objects.get(slug=app_slug)
+        if app is None:
+            app = Apps.objects.get(slug=app_slug)
 
         if not app.user_can_create:
             return False
 
-        num_of_app_instances = (
-            self.annotate_with_app_status()
-            .filter(
-                ~Q(atn_app_status="Deleted"),
-                app__slug=app_slug,
-                project=project,
+        if num_of_app_instances is None:
+            num_of_app_instances = (
+                self.annotate_with_app_status()
+                .filter(
+                    ~Q(atn_app_status="Deleted"),
+                    app__slug=app_slug,
+                    project=project,
+                )
+                .count()
             )
-            .count()
-        )
 
         has_perm = user.has_perm(f"apps.add_{self.model_type}")
         return limit is None or limit > num_of_app_instances or has_perm
@@ -166,9 +177,13 @@ class BaseAppInstance(models.Model):
     chart = models.CharField(
         max_length=512,
     )
-    created_on = models.DateTimeField(auto_now_add=True)
+    created_on = models.DateTimeField(auto_now_add=True, db_index=True)
     deleted_on = models.DateTimeField(null=True, blank=True)
     info = models.JSONField(blank=True, null=True)
+    # The digest of the values and the chart reference of the last successful Helm deploy.
+    # Used to skip redeploys that would not change anything.
+    deployed_values_digest = models.CharField(max_length=64, null=True, blank=True, editable=False)
+    deployed_chart = models.CharField(max_length=512, null=True, blank=True, editable=False)
     # model_dependencies = models.ManyToManyField("models.Model", blank=True)
     name = models.CharField(max_length=512, default="app_name")
     owner = models.ForeignKey(
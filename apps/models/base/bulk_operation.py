@@ -0,0 +1,104 @@
+from django.conf import settings
+from django.db import models
+from django.db.models import Count, Q
+
+
+class BulkOperation(models.Model):
+    """
+    A background job deploying or deleting the resources of a selection of app instances, started in the admin,
+    or when a project is created from a template or deleted.
+    The items of the job are run as operations on the release queues, at most concurrency of them queued at a time,
+    and the progress is recorded per app instance in the items of the job.
+    """
+
+    DEPLOY = "deploy"
+    DELETE = "delete"
+
+    OPERATION_CHOICES = [
+        (DEPLOY, "Deploy"),
+        (DELETE, "Delete"),
+    ]
+
+    RUNNING = "running"
+    FINISHED = "finished"
+
+    STATUS_CHOICES = [
+        (RUNNING, "Running"),
+        (FINISHED, "Finished"),
+    ]
+
+    operation = models.CharField(max_length=10, choices=OPERATION_CHOICES)
+    force = models.BooleanField(default=False, help_text="Deploy also app instances that are unchanged")
+    concurrency = models.PositiveIntegerField(help_text="The maximum number of app instances queued at a time")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=RUNNING)
+    project = models.ForeignKey(
+        "projects.Project",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="+",
+        help_text="The project whose app instances are deployed or deleted, for the creation or deletion of a project",
+    )
+    project_status = models.CharField(
+        max_length=20, null=True, blank=True, help_text="The status set on the project when the job is finished"
+    )
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    created_on = models.DateTimeField(auto_now_add=True)
+    finished_on = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Bulk Operation"
+        verbose_name_plural = "Bulk Operations"
+
+    def __str__(self):
+        return f"{self.operation} of {self.items.count()} apps ({self.created_on})"
+
+    def get_progress(self) -> dict[str, int]:
+        """
+        Gets the progress of the job.
+
+        :returns dict: The number of items in total, pending, succeeded and failed.
+        """
+        return self.items.aggregate(
+            total=Count("pk"),
+            pending=Count("pk", filter=Q(status=BulkOperationItem.PENDING)),
+            succeeded=Count("pk", filter=Q(status=BulkOperationItem.SUCCEEDED)),
+            failed=Count("pk", filter=Q(status=BulkOperationItem.FAILED)),
+        )
+
+
+class BulkOperationItem(models.Model):
+    """The deploy or delete of the resource of an app instance in a bulk operation, and its outcome."""
+
+    PENDING = "pending"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (SUCCEEDED, "Succeeded"),
+        (FAILED, "Failed"),
+    ]
+
+    bulk_operation = models.ForeignKey(BulkOperation, on_delete=models.CASCADE, related_name="items")
+    app_instance = models.ForeignKey("apps.BaseAppInstance", on_delete=models.CASCADE, related_name="+")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    # The items of a stage are queued once all items of the earlier stages are processed
+    stage = models.PositiveSmallIntegerField(default=0)
+    # The queued release operation running the item, if the item is queued
+    release_operation = models.ForeignKey(
+        "apps.ReleaseOperation",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="bulk_operation_items",
+    )
+    message = models.TextField(blank=True, default="")
+    finished_on = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Bulk Operation Item"
+        verbose_name_plural = "Bulk Operation Items"
+
+    def __str__(self):
+        return f"{self.app_instance_id} ({self.status})"
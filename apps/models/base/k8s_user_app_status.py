@@ -1,4 +1,7 @@
-from django.db import models
+from datetime import datetime
+from typing import Optional
+
+from django.db import connections, models
 
 K8S_USER_APP_STATUS_CHOICES = [
     ("CrashLoopBackOff", "CrashLoopBackOff"),
@@ -13,11 +16,61 @@ K8S_USER_APP_STATUS_CHOICES = [
 ]
 
 
+class K8sUserAppStatusManager(models.Manager):
+    def create_for_app_instance(
+        self, app_instance: models.Model, status: str, time: datetime, info: Optional[dict] = None
+    ) -> "K8sUserAppStatus":
+        """
+        Creates a status object with an externally supplied event time and links it to the app instance,
+        both in a single statement.
+        The ORM cannot be used to insert the time because the field time is auto_now_add.
+
+        :param app_instance BaseAppInstance: The app instance to link the new status object to.
+        :param status str: The k8s status code.
+        :param time datetime: The timestamp of the status event.
+        :param info json dict: An optional json dict containing pod-msg and/or container-msg.
+        :returns: The new status object, also assigned to app_instance.k8s_user_app_status.
+        """
+        connection = connections[self.db]
+        status_object = self.model(status=status, time=time, info=info)
+
+        fk_field = app_instance._meta.get_field("k8s_user_app_status")
+        instance_meta = fk_field.model._meta
+
+        columns = [self.model._meta.get_field(name) for name in ("status", "time", "info")]
+        values = [field.get_db_prep_save(getattr(status_object, field.attname), connection) for field in columns]
+
+        sql = (
+            f"WITH new_status AS ("
+            f"INSERT INTO {self.model._meta.db_table} ({', '.join(field.column for field in columns)}) "
+            f"VALUES (%s, %s, %s) RETURNING {self.model._meta.pk.column}) "
+            f"UPDATE {instance_meta.db_table} SET {fk_field.column} = new_status.{self.model._meta.pk.column} "
+            f"FROM new_status WHERE {instance_meta.db_table}.{instance_meta.pk.column} = %s "
+            f"RETURNING new_status.{self.model._meta.pk.column}"
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [*values, app_instance.pk])
+            row = cursor.fetchone()
+
+        if row is None:
+            raise fk_field.model.DoesNotExist(f"No app instance exists with pk={app_instance.pk}")
+
+        status_object.pk = row[0]
+        status_object._state.adding = False
+        status_object._state.db = self.db
+        app_instance.k8s_user_app_status = status_object
+
+        return status_object
+
+
 class K8sUserAppStatus(models.Model):
     info = models.JSONField(blank=True, null=True)
     status = models.CharField(max_length=20, null=True, choices=K8S_USER_APP_STATUS_CHOICES)
     time = models.DateTimeField(auto_now_add=True)
 
+    objects = K8sUserAppStatusManager()
+
     class Meta:
         get_latest_by = "time"
         verbose_name = "k8s User App Status"
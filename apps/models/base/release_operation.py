@@ -0,0 +1,268 @@
+from datetime import timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.db import connections, models, transaction
+from django.db.models import (
+    Case,
+    Count,
+    IntegerField,
+    Min,
+    OuterRef,
+    Q,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.constants import AppActionOrigin
+from studio.utils import get_logger
+
+from .bulk_operation import BulkOperationItem
+
+logger = get_logger(__name__)
+
+
+# Operations of queues with a lower value are started first
+QUEUE_PRIORITY = {"user": 0, "system": 1}
+# The key of the transaction-level advisory lock serialising the claims of release operations
+CLAIM_LOCK_KEY = 7_240_301
+
+
+class ReleaseOperationManager(models.Manager):
+    def enqueue(
+        self,
+        release: str,
+        operation: str,
+        app_instance: models.Model,
+        initiated_by: Optional[str] = None,
+        force: bool = False,
+    ) -> tuple["ReleaseOperation", bool]:
+        """
+        Adds a Helm operation to the queue of a release, coalescing it with the pending operations of the release.
+
+        A deploy is merged into a pending deploy of the same app instance, since the deploy task
+        reads the latest state of the app instance when it runs.
+        A delete is merged into a pending delete of the same app instance and supersedes any pending
+        deploys of the app instance, since deploying an app instance that is about to be deleted is wasted work.
+        Operations that have already started are never merged into. A merged deploy is forced if any of
+        the coalesced deploys is forced.
+
+        Deletes initiated by the system, e.g. of expired apps, are added to the system queue
+        and all other operations to the user queue.
+
+        :param release str: The Helm release name, i.e. the subdomain.
+        :param operation str: The operation, deploy or delete.
+        :param app_instance BaseAppInstance: The app instance to deploy or delete.
+        :param initiated_by str: The AppActionOrigin of a delete.
+        :param force bool: Whether a deploy should run even if nothing changed since the last successful deploy.
+        :returns: A tuple of the queued operation and whether a new operation was added to the queue.
+        """
+        with transaction.atomic(using=self.db):
+            # Lock the queue of the release so that concurrent callers coalesce into the same operation
+            pending = list(
+                self.select_for_update()
+                .filter(release=release, started_on__isnull=True, app_instance_id=app_instance.pk)
+                .order_by("pk")
+            )
+
+            queue = (
+                ReleaseOperation.SYSTEM_QUEUE
+                if initiated_by == AppActionOrigin.SYSTEM.value
+                else ReleaseOperation.USER_QUEUE
+            )
+            n_superseded = 0
+
+            if operation == ReleaseOperation.DELETE:
+                superseded = [op for op in pending if op.operation == ReleaseOperation.DEPLOY]
+                if superseded:
+                    n_superseded = sum(op.n_requests for op in superseded)
+                    self.drop_pending("Superseded by a delete of the app instance", pk__in=[op.pk for op in superseded])
+
+            existing = next((op for op in pending if op.operation == operation), None)
+
+            if existing is not None:
+                existing.n_requests += 1 + n_superseded
+                existing.serialized_instance = app_instance.serialize()
+                existing.force = existing.force or force
+                if queue == ReleaseOperation.USER_QUEUE:
+                    existing.queue = queue
+                existing.save(update_fields=["n_requests", "serialized_instance", "force", "queue"])
+                return existing, False
+
+            release_operation = self.create(
+                release=release,
+                operation=operation,
+                app_instance=app_instance,
+                serialized_instance=app_instance.serialize(),
+                initiated_by=initiated_by,
+                force=force,
+                queue=queue,
+                n_requests=1 + n_superseded,
+            )
+            return release_operation, True
+
+    def drop_pending(self, reason: str, **filters) -> int:
+        """
+        Removes the pending operations matching the filters from their queues, e.g. the deploys of app instances
+        that are about to be deleted. The bulk operation items run by the dropped operations are marked as failed.
+
+        :param reason str: Why the operations are dropped, recorded as the message of the failed items.
+        :returns int: The number of dropped operations.
+        """
+        with transaction.atomic(using=self.db):
+            pks = list(self.select_for_update().filter(started_on__isnull=True, **filters).values_list("pk", flat=True))
+
+            BulkOperationItem.objects.filter(release_operation__in=pks, status=BulkOperationItem.PENDING).update(
+                status=BulkOperationItem.FAILED, message=reason, finished_on=timezone.now()
+            )
+            self.filter(pk__in=pks).delete()
+
+        return len(pks)
+
+    def claim_next(self) -> Optional["ReleaseOperation"]:
+        """
+        Marks the next pending operation as started, choosing among the oldest pending operations
+        of the releases that have no running operation. This serialises the operations of each release.
+
+        The next operation is chosen by fair share: operations of the user queue go before operations
+        of the system queue, then the operations of the project with the fewest running operations,
+        so that one project creating many apps cannot starve the other projects, then the oldest operation.
+        No operation is started while HELM_CONCURRENCY_LIMIT operations are running.
+        The candidates are ranked in the database and only the chosen operation is locked.
+
+        A started operation older than RELEASE_OPERATION_STALE_AFTER seconds is considered abandoned,
+        e.g. by a worker that was killed, and is removed from the queue. The Helm commands of the operations
+        are killed after HELM_TIMEOUT, well before, so that a slow operation is never removed while it runs.
+
+        :returns: The started operation, or None if no operation can be started.
+        """
+        stale_threshold = timezone.now() - timedelta(seconds=settings.RELEASE_OPERATION_STALE_AFTER)
+
+        with transaction.atomic(using=self.db):
+            # Claims wait for each other on an advisory lock, so that the running operations are counted
+            # consistently, while enqueue and drop_pending, which lock pending rows, are not blocked
+            with connections[self.db].cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_xact_lock(%s)", [CLAIM_LOCK_KEY])
+
+            stale = self.filter(started_on__lte=stale_threshold)
+            for operation_type, release in stale.values_list("operation", "release"):
+                logger.warning(f"Removing the abandoned {operation_type} operation of release {release}")
+            stale.delete()
+
+            running = self.filter(started_on__isnull=False)
+            if running.count() >= settings.HELM_CONCURRENCY_LIMIT:
+                return None
+
+            n_running_in_project = (
+                running.filter(app_instance__project_id=OuterRef("app_instance__project_id"))
+                .order_by()
+                .values("app_instance__project_id")
+                .annotate(n=Count("pk"))
+                .values("n")
+            )
+            # The oldest pending operation of each release without a running operation
+            release_heads = (
+                self.filter(started_on__isnull=True)
+                .exclude(release__in=running.values("release"))
+                .order_by("release", "pk")
+                .distinct("release")
+                .values("pk")
+            )
+
+            operation = (
+                self.select_for_update(skip_locked=True, of=("self",))
+                .filter(pk__in=release_heads)
+                .annotate(
+                    queue_priority=Case(
+                        *[When(queue=queue, then=Value(priority)) for queue, priority in QUEUE_PRIORITY.items()],
+                        output_field=IntegerField(),
+                    ),
+                    n_running_in_project=Coalesce(Subquery(n_running_in_project), 0),
+                )
+                .order_by("queue_priority", "n_running_in_project", "pk")
+                .first()
+            )
+
+            if operation is None:
+                return None
+
+            operation.started_on = timezone.now()
+            operation.save(update_fields=["started_on"])
+
+        wait = (operation.started_on - operation.created_on).total_seconds()
+        logger.info(
+            f"Starting the {operation.operation} operation of release {operation.release} "
+            f"from the {operation.queue} queue after waiting {wait:.1f} seconds"
+        )
+
+        return operation
+
+    def get_queue_depth(self) -> dict[str, int]:
+        """
+        Gets the depth of the release operation queues.
+
+        :returns dict: The number of pending and running operations, the number of releases with operations,
+            the number of pending operations of the user and system queues, and the seconds the oldest
+            pending operation has waited.
+        """
+        depth = self.aggregate(
+            pending=Count("pk", filter=Q(started_on__isnull=True)),
+            running=Count("pk", filter=Q(started_on__isnull=False)),
+            releases=Count("release", distinct=True),
+            pending_user=Count("pk", filter=Q(started_on__isnull=True, queue=ReleaseOperation.USER_QUEUE)),
+            pending_system=Count("pk", filter=Q(started_on__isnull=True, queue=ReleaseOperation.SYSTEM_QUEUE)),
+            oldest_pending=Min("created_on", filter=Q(started_on__isnull=True)),
+        )
+
+        oldest_pending = depth.pop("oldest_pending")
+        depth["max_wait_seconds"] = int((timezone.now() - oldest_pending).total_seconds()) if oldest_pending else 0
+
+        return depth
+
+
+class ReleaseOperation(models.Model):
+    """
+    A queued Helm operation on a release. The operations of each release are run one at a time in queue order.
+    """
+
+    USER_QUEUE = "user"
+    SYSTEM_QUEUE = "system"
+
+    QUEUE_CHOICES = [
+        (USER_QUEUE, "User"),
+        (SYSTEM_QUEUE, "System"),
+    ]
+
+    DEPLOY = "deploy"
+    DELETE = "delete"
+
+    OPERATION_CHOICES = [
+        (DEPLOY, "Deploy"),
+        (DELETE, "Delete"),
+    ]
+
+    release = models.CharField(max_length=53, db_index=True)
+    operation = models.CharField(max_length=10, choices=OPERATION_CHOICES)
+    app_instance = models.ForeignKey(
+        "apps.BaseAppInstance", on_delete=models.CASCADE, related_name="release_operations"
+    )
+    serialized_instance = models.JSONField()
+    initiated_by = models.CharField(max_length=10, null=True, blank=True)
+    force = models.BooleanField(default=False)
+    queue = models.CharField(max_length=10, choices=QUEUE_CHOICES, default=USER_QUEUE)
+    # The number of requested operations that were coalesced into this operation
+    n_requests = models.PositiveIntegerField(default=1)
+    created_on = models.DateTimeField(auto_now_add=True)
+    started_on = models.DateTimeField(null=True, blank=True)
+
+    objects = ReleaseOperationManager()
+
+    class Meta:
+        verbose_name = "Release Operation"
+        verbose_name_plural = "Release Operations"
+
+    def __str__(self):
+        return f"{self.operation} {self.release} ({self.created_on})"
@@ -0,0 +1,76 @@
+from typing import Optional
+
+from django.db import models, transaction
+
+from studio.utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class StandbyReleaseManager(models.Manager):
+    def claim(
+        self, project: models.Model, flavor: models.Model, environment: models.Model
+    ) -> Optional["StandbyRelease"]:
+        """
+        Claims a ready standby release of a project for a new JupyterLab instance.
+        The standby release is removed from the pool and its subdomain, i.e. the Helm release,
+        is left for the new app instance to take over.
+
+        :param project Project: The project of the new app instance.
+        :param flavor Flavor: The flavor of the new app instance.
+        :param environment Environment: The environment of the new app instance.
+        :returns: The claimed standby release, or None if the pool has no ready standby release.
+        """
+        with transaction.atomic(using=self.db):
+            # Skip standby releases being claimed by concurrent requests
+            standby_release = (
+                self.select_for_update(skip_locked=True)
+                .select_related("subdomain")
+                .filter(project=project, flavor=flavor, environment=environment, status=StandbyRelease.READY)
+                .order_by("pk")
+                .first()
+            )
+
+            if standby_release is None:
+                return None
+
+            standby_release.delete()
+
+        logger.info(f"Claimed the standby release {standby_release.subdomain.subdomain} of project {project.slug}")
+        return standby_release
+
+
+class StandbyRelease(models.Model):
+    """
+    A pre-installed JupyterLab release in the warm pool of a project, waiting to be claimed by a new app instance.
+    The pool size of the projects created from a project template is set by ProjectTemplate.standby_pool_size.
+    """
+
+    DEPLOYING = "deploying"
+    READY = "ready"
+    FAILED = "failed"
+
+    STATUS_CHOICES = [
+        (DEPLOYING, "Deploying"),
+        (READY, "Ready"),
+        (FAILED, "Failed"),
+    ]
+
+    project = models.ForeignKey("projects.Project", on_delete=models.CASCADE, related_name="standby_releases")
+    flavor = models.ForeignKey("projects.Flavor", on_delete=models.CASCADE, related_name="+")
+    environment = models.ForeignKey(
+        "projects.Environment", on_delete=models.CASCADE, related_name="+", null=True, blank=True
+    )
+    subdomain = models.OneToOneField("apps.Subdomain", on_delete=models.CASCADE, related_name="standby_release")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=DEPLOYING)
+    info = models.JSONField(blank=True, null=True)
+    created_on = models.DateTimeField(auto_now_add=True)
+
+    objects = StandbyReleaseManager()
+
+    class Meta:
+        verbose_name = "Standby Release"
+        verbose_name_plural = "Standby Releases"
+
+    def __str__(self):
+        return f"{self.subdomain.subdomain} ({self.status})"
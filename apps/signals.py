@@ -1,9 +1,11 @@
+import redis
 from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
 from guardian.shortcuts import assign_perm, remove_perm
 
 from apps.app_registry import APP_REGISTRY
 from apps.models import AppStatus, BaseAppInstance, MLFlowInstance
+from apps.types_.status_write_buffer import get_status_write_buffer
 from studio.utils import get_logger
 
 from .tasks import helm_delete
@@ -12,6 +14,7 @@ logger = get_logger(__name__)
 
 
 UID = "app_instance_update_permission"
+STATUS_BUFFER_UID = "app_instance_discard_buffered_status"
 
 
 @receiver(pre_delete, sender=BaseAppInstance)
@@ -74,8 +77,28 @@ def update_permission(sender, instance, created, **kwargs):
             remove_perm("can_access_app", owner, instance)
 
 
+def discard_buffered_status(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Discards the buffered k8s status of the release of an app instance that was created or fully saved,
+    e.g. when a subdomain is re-used, so that the next status event of the release is written through.
+    """
+    if not created and update_fields is not None:
+        return
+
+    status_buffer = get_status_write_buffer()
+
+    if status_buffer is None or instance.subdomain is None:
+        return
+
+    try:
+        status_buffer.discard(instance.subdomain.subdomain)
+    except redis.RedisError as err:
+        logger.warning(f"Unable to discard the buffered status of {instance}. {err}")
+
+
 for model in APP_REGISTRY.iter_orm_models():
     receiver(post_save, sender=model, dispatch_uid=UID)(update_permission)
+    receiver(post_save, sender=model, dispatch_uid=STATUS_BUFFER_UID)(discard_buffered_status)
 
     """
     What is going on here?
@@ -1,25 +1,45 @@
+import copy
+import hashlib
+import json
 import re
 import subprocess
+import threading
+import uuid
+from datetime import datetime, timedelta
+from pathlib import PurePosixPath
 
 import yaml
 from celery import shared_task
+from celery.signals import worker_ready
 from django.apps import apps
 from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
-from django.db import transaction
+from django.db import connection, transaction
+from django.db.models import Min, Q
 from django.utils import timezone
 
 from apps.app_registry import APP_REGISTRY
 from apps.constants import AppActionOrigin
+from apps.helpers import flush_buffered_status_times, get_URI
+from apps.types_.chart_cache import get_chart_cache, parse_chart_reference
+from apps.types_.status_write_buffer import get_status_write_buffer
+from projects.models import Flavor, Project, ProjectLog
 from studio.celery import app
 from studio.utils import get_logger
 
-from .models import BaseAppInstance, FilemanagerInstance
+from .models import (
+    Apps,
+    BaseAppInstance,
+    BulkOperation,
+    BulkOperationItem,
+    FilemanagerInstance,
+    ReleaseOperation,
+    StandbyRelease,
+    Subdomain,
+)
 
 logger = get_logger(__name__)
 
-CHART_REGEX = re.compile(r"^(?P<chart>.+):(?P<version>.+)$")
-
 
 @app.task
 def delete_old_objects():
@@ -47,7 +67,7 @@ def delete_old_objects():
         # old: .exclude(app_status__status="Deleted")
 
         for app_ in old_develop_apps:
-            delete_resource.delay(app_.serialize(), AppActionOrigin.SYSTEM.value)
+            queue_delete_resource(app_, AppActionOrigin.SYSTEM.value)
 
     # Handle deletion of non persistent file managers
     old_file_managers = FilemanagerInstance.objects.filter(
@@ -56,7 +76,7 @@ def delete_old_objects():
     # old: .exclude(app_status__status="Deleted")
 
     for app_ in old_file_managers:
-        delete_resource.delay(app_.serialize(), AppActionOrigin.SYSTEM.value)
+        queue_delete_resource(app_, AppActionOrigin.SYSTEM.value)
 
 
 @app.task
@@ -87,7 +107,40 @@ def clean_up_apps_in_database():
                 app_.delete()
 
 
-def helm_install(release_name, chart, namespace="default", values_file=None, version=None):
+@app.task
+def flush_k8s_status_write_buffer():
+    """
+    Persists the k8s user app statuses held in the status write-behind buffer to the database.
+    Does nothing unless the buffer is enabled by the setting K8S_STATUS_WRITE_BEHIND_ENABLED.
+    """
+
+    status_buffer = get_status_write_buffer()
+
+    if status_buffer is None:
+        return
+
+    # Flush in a bounded number of batches so that a steady stream of events cannot keep the task running
+    for _ in range(10):
+        entries = status_buffer.pop_dirty()
+        if not entries:
+            break
+        flush_buffered_status_times(entries)
+
+
+# Seconds a Helm process is given beyond its own --timeout before it is killed
+HELM_PROCESS_TIMEOUT_MARGIN = 60
+
+
+def get_helm_timeout() -> int:
+    """
+    Gets the seconds after which a Helm process of a release operation is killed.
+    This is below RELEASE_OPERATION_STALE_AFTER, so that the queue row of a running operation
+    is never removed as abandoned while its Helm command is still running.
+    """
+    return settings.HELM_TIMEOUT + HELM_PROCESS_TIMEOUT_MARGIN
+
+
+def helm_install(release_name, chart, namespace="default", values_file=None, version=None, values=None):
     """
     Run a Helm install command.
 
@@ -95,15 +148,20 @@ def helm_install(release_name, chart, namespace="default", values_file=None, ver
     release_name (str): Name of the Helm release.
     chart (str): Helm chart to install.
     namespace (str): Kubernetes namespace to deploy to.
-    options (list, optional): Additional options for Helm command in list format.
+    values_file (str, optional): A values file.
+    version (str, optional): The chart version of an OCI chart.
+    values (str, optional): The values yaml, passed to Helm over stdin instead of a values file.
 
     Returns:
     tuple: Output message and any errors from the Helm command.
     """
     # Base command
     command = f"helm upgrade --force --install {release_name} {chart} --namespace {namespace}"
+    command += f" --timeout {settings.HELM_TIMEOUT}s"
 
-    if values_file:
+    if values is not None:
+        command += " -f -"
+    elif values_file:
         command += f" -f {values_file}"
 
     # Append version if deploying via ghcr
@@ -113,10 +171,14 @@ def helm_install(release_name, chart, namespace="default", values_file=None, ver
     logger.debug(f"Running Helm command: {command}")
     # Execute the command
     try:
-        result = subprocess.run(command.split(" "), check=True, text=True, capture_output=True)
+        result = subprocess.run(
+            command.split(" "), input=values, check=True, text=True, capture_output=True, timeout=get_helm_timeout()
+        )
         return result.stdout, None
     except subprocess.CalledProcessError as e:
         return e.stdout, e.stderr
+    except subprocess.TimeoutExpired as e:
+        return None, f"The Helm command timed out after {e.timeout} seconds"
 
 
 @shared_task
@@ -124,23 +186,41 @@ def helm_delete(release_name: str, namespace: str = "default") -> tuple[str | No
     """
     Executes a Helm delete command.
     """
-    command = f"helm uninstall {release_name} --namespace {namespace} --wait"
+    command = f"helm uninstall {release_name} --namespace {namespace} --wait --timeout {settings.HELM_TIMEOUT}s"
     # Execute the command
     try:
-        result = subprocess.run(command.split(" "), check=True, text=True, capture_output=True)
+        result = subprocess.run(
+            command.split(" "), check=True, text=True, capture_output=True, timeout=get_helm_timeout()
+        )
         return result.stdout, None
     except subprocess.CalledProcessError as e:
         return e.stdout, e.stderr
+    except subprocess.TimeoutExpired as e:
+        return None, f"The Helm command timed out after {e.timeout} seconds"
+
+
+def helm_list(namespace: str = "default") -> list[dict]:
+    """
+    Lists all Helm releases of a namespace, in any state, with a single Helm command.
+
+    :param namespace str: The Kubernetes namespace.
+    :returns list: The releases as output by helm list -o json, e.g. with the name, status, chart and updated time.
+    """
+    command = f"helm list --namespace {namespace} --all --max 0 -o json"
+    result = subprocess.run(command.split(" "), check=True, text=True, capture_output=True)
+    return json.loads(result.stdout or "[]")
 
 
 @shared_task
 def helm_template(
-    chart: str, values_file: str, namespace: str = "default", version: str = None
+    chart: str, values_file: str | None, namespace: str = "default", version: str = None, values: str | None = None
 ) -> tuple[str | None, str | None]:
     """
     Executes a Helm template command.
+    The values are read from the values file, or from the values yaml over stdin if given.
     """
-    command = f"helm template tmp-release-name {chart} -f {values_file} --namespace {namespace}"
+    command = f"helm template tmp-release-name {chart} -f {'-' if values is not None else values_file}"
+    command += f" --namespace {namespace}"
 
     # Append version if deploying via ghcr
     if version:
@@ -148,10 +228,14 @@ def helm_template(
 
     # Execute the command
     try:
-        result = subprocess.run(command.split(" "), check=True, text=True, capture_output=True)
+        result = subprocess.run(
+            command.split(" "), input=values, check=True, text=True, capture_output=True, timeout=get_helm_timeout()
+        )
         return result.stdout, None
     except subprocess.CalledProcessError as e:
         return e.stdout, e.stderr
+    except subprocess.TimeoutExpired as e:
+        return None, f"The Helm command timed out after {e.timeout} seconds"
 
 
 @shared_task
@@ -162,10 +246,14 @@ def helm_lint(chart: str, values_file: str, namespace: str) -> tuple[str | None,
     command = f"helm lint {chart} -f {values_file} --namespace {namespace}"
     # Execute the command
     try:
-        result = subprocess.run(command.split(" "), check=True, text=True, capture_output=True)
+        result = subprocess.run(
+            command.split(" "), check=True, text=True, capture_output=True, timeout=get_helm_timeout()
+        )
         return result.stdout, None
     except subprocess.CalledProcessError as e:
         return e.stdout, e.stderr
+    except subprocess.TimeoutExpired as e:
+        return None, f"The Helm command timed out after {e.timeout} seconds"
 
 
 @shared_task
@@ -195,51 +283,239 @@ def get_manifest_yaml(release_name: str, namespace: str = "default") -> tuple[st
         return e.stdout, e.stderr
 
 
+def warm_chart_cache() -> None:
+    """
+    Caches the OCI charts of all apps that are not yet cached.
+    """
+    try:
+        charts = list(Apps.objects.exclude(chart="").values_list("chart", flat=True).distinct())
+        n_cached = get_chart_cache().warm(charts)
+        logger.info(f"Warmed the chart cache with {n_cached} OCI charts")
+    except Exception as e:
+        logger.warning(f"Unable to warm the chart cache. {e}", exc_info=True)
+    finally:
+        connection.close()
+
+
+@worker_ready.connect
+def warm_chart_cache_on_worker_start(**kwargs) -> None:
+    """
+    Warms the chart cache when the worker starts. The charts are pulled in the background,
+    so that the worker starts consuming tasks at once. Deploys of charts that are not yet cached pull them.
+    """
+    threading.Thread(target=warm_chart_cache, name="warm-chart-cache", daemon=True).start()
+
+
+def get_release_name(instance: BaseAppInstance) -> str | None:
+    """
+    Gets the Helm release name of an app instance, i.e. the subdomain.
+    """
+    if instance.k8s_values and instance.k8s_values.get("subdomain"):
+        return instance.k8s_values["subdomain"]
+    if instance.subdomain is not None:
+        return instance.subdomain.subdomain
+    return None
+
+
+def queue_deploy_resource(instance: BaseAppInstance, force: bool = False) -> None:
+    """
+    Queues a deploy of the resource of an app instance on the queue of its release.
+    Repeated deploys of an app instance that are still pending are coalesced into a single deploy
+    of the latest state of the app instance.
+
+    :param instance BaseAppInstance: The app instance to deploy.
+    :param force bool: Whether to deploy even if nothing changed since the last successful deploy.
+    """
+    _queue_release_operation(instance, ReleaseOperation.DEPLOY, force=force)
+
+
+def queue_delete_resource(instance: BaseAppInstance, initiated_by_str: str) -> None:
+    """
+    Queues a delete of the resource of an app instance on the queue of its release.
+    The delete supersedes any deploys of the app instance that are still pending.
+    """
+    _queue_release_operation(instance, ReleaseOperation.DELETE, initiated_by_str)
+
+
+def _queue_release_operation(
+    instance: BaseAppInstance, operation: str, initiated_by_str: str | None = None, force: bool = False
+) -> None:
+    release = get_release_name(instance)
+
+    if release is None:
+        # Without a release there is nothing to serialise on, so run the task directly
+        logger.warning(f"The app instance {instance.pk} has no release. Running the {operation} without queueing.")
+        if operation == ReleaseOperation.DEPLOY:
+            deploy_resource.delay(instance.serialize(), force)
+        else:
+            delete_resource.delay(instance.serialize(), initiated_by_str)
+        return
+
+    _, is_new = ReleaseOperation.objects.enqueue(release, operation, instance, initiated_by_str, force)
+
+    if is_new:
+        logger.info(f"Queued a {operation} of release {release}")
+        # Start processing once the queued operation is visible to the worker
+        transaction.on_commit(lambda: run_release_operations.delay())
+    else:
+        logger.info(f"Coalesced a {operation} of release {release} into a pending operation")
+
+
 @shared_task
-@transaction.atomic
-def deploy_resource(serialized_instance):
+def run_release_operations() -> None:
+    """
+    Runs queued release operations, in the order chosen by ReleaseOperation.objects.claim_next,
+    until no operation can be started. Returns at once if HELM_CONCURRENCY_LIMIT operations are already running,
+    in which case the tasks running them also run the operations queued after them.
+    """
+    while True:
+        operation = ReleaseOperation.objects.claim_next()
+
+        if operation is None:
+            return
+
+        success = False
+        message = ""
+
+        try:
+            if operation.operation == ReleaseOperation.DEPLOY:
+                success = deploy_resource(operation.serialized_instance, operation.force)
+            else:
+                success = delete_resource(operation.serialized_instance, operation.initiated_by, operation.release)
+        except Exception as e:
+            logger.error(
+                f"The {operation.operation} operation of release {operation.release} failed. {e}", exc_info=True
+            )
+            message = str(e)
+        finally:
+            finish_release_operation(operation, success, message)
+
+
+def finish_release_operation(operation: ReleaseOperation, success: bool, message: str = "") -> None:
+    """
+    Removes a finished operation from the queue of its release. The outcome is recorded in the bulk operation items
+    run by the operation, and the next items of their bulk operations are queued.
+
+    :param operation ReleaseOperation: The finished operation.
+    :param success bool: Whether the deploy or delete succeeded.
+    :param message str: The error of a failed operation. Defaults to the Helm error in the info of the app instance.
+    """
+    items = BulkOperationItem.objects.filter(release_operation=operation, status=BulkOperationItem.PENDING)
+    bulk_operation_pks = set(items.values_list("bulk_operation_id", flat=True))
+
+    if bulk_operation_pks:
+        if not success and not message:
+            info = BaseAppInstance.objects.filter(pk=operation.app_instance_id).values_list("info", flat=True).first()
+            message = str((info or {}).get("helm", {}).get("info", {}).get("stderr") or "")
+
+        items.update(
+            status=BulkOperationItem.SUCCEEDED if success else BulkOperationItem.FAILED,
+            message="" if success else message,
+            finished_on=timezone.now(),
+        )
+
+    operation.delete()
+
+    for bulk_operation_pk in bulk_operation_pks:
+        run_bulk_operation(bulk_operation_pk)
+
+
+@app.task
+def process_release_queues() -> None:
+    """
+    Starts running the queued release operations, up to HELM_CONCURRENCY_LIMIT tasks.
+    Recovers operations whose running task was lost, e.g. when a worker was restarted,
+    and resumes the bulk operations whose queued operations were dropped.
+    """
+    for bulk_operation_pk in BulkOperation.objects.filter(status=BulkOperation.RUNNING).values_list("pk", flat=True):
+        run_bulk_operation(bulk_operation_pk)
+
+    depth = ReleaseOperation.objects.get_queue_depth()
+    logger.info(f"Release operation queues: {depth}")
+
+    for _ in range(min(depth["pending"], settings.HELM_CONCURRENCY_LIMIT)):
+        run_release_operations.delay()
+
+
+def release_db_connection():
+    """
+    Releases the database connection of the worker before a long external call, such as a Helm command,
+    so that the connection is returned to the pool instead of being held idle during the call.
+    Django opens a new connection on the next query. Connections inside an atomic block are kept.
+    """
+    if not connection.in_atomic_block:
+        connection.close()
+
+
+def get_values_digest(values: dict, chart: str) -> str:
+    """
+    Computes a digest of the inputs of a Helm deploy, i.e. the values and the chart reference.
+
+    :param values dict: The Helm values, including any overrides.
+    :param chart str: The chart reference of the app instance, including the version.
+    :returns str: The hex digest.
+    """
+    content = json.dumps({"chart": chart, "values": values}, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+@shared_task
+def deploy_resource(serialized_instance, force: bool = False) -> bool:
+    """
+    Deploys the resource of an app instance with Helm in three phases, so that no database connection
+    or transaction is held during the Helm command:
+    a short read of the app instance, the Helm command and a short conditional write of the helm info.
+
+    The deploy is skipped if the values and chart version are the same as in the last successful deploy,
+    since helm upgrade --force would only restart the pods. Use force to deploy anyway.
+
+    :param serialized_instance dict: A serialized version of the app to be deployed.
+    :param force bool: Whether to deploy even if nothing changed since the last successful deploy.
+    :returns bool: Whether the resource is deployed, i.e. the deploy succeeded or was skipped.
+    """
     instance: BaseAppInstance = deserialize(serialized_instance)
     logger.info("Deploying resource for instance %s", instance)
+    # The values as deployed, used to detect concurrent edits of the app instance
+    deployed_k8s_values = copy.deepcopy(instance.k8s_values)
     values = instance.k8s_values
     if instance.k8s_values_override:
         values.update(instance.k8s_values_override)
     release = values["subdomain"]
-    chart: str = instance.chart
-    if "ghcr" in instance.chart:
-        version = instance.chart.split(":")[-1]
-        chart = "oci://" + instance.chart.split(":")[0]
-    elif chart.startswith("oci://"):
-        match = CHART_REGEX.match(chart)
-        if match:
-            chart = match.group("chart")
-            version = match.group("version")
-    else:
-        version = None
-        chart = instance.chart
+
+    values_digest = get_values_digest(values, instance.chart)
+
+    # The content of a local chart without a version may change without a change of the reference,
+    # so such deploys are never skipped
+    is_versioned_chart = parse_chart_reference(instance.chart).version is not None
+    if not force and is_versioned_chart and values_digest == instance.deployed_values_digest:
+        logger.info(f"Skipping the deploy of release {release} because its values and chart are unchanged")
+        return True
+
+    release_db_connection()
+
+    # Deploy OCI charts from the local chart cache. A cache miss pulls the chart, which is done
+    # after releasing the database connection.
+    chart, version = get_chart_cache().resolve(instance.chart)
 
     # Use a KubernetesDeploymentManifest to manage the manifest validation and files
     from apps.types_.kubernetes_deployment_manifest import KubernetesDeploymentManifest
 
     kdm = KubernetesDeploymentManifest()
 
-    # Save helm values file for internal reference
-
-    values_file, _ = kdm.get_filepaths()
-    with open(values_file, "w") as f:
-        f.write(yaml.dump(values))
+    # The values are passed to Helm over stdin, so no values file is written
+    values_yaml = yaml.dump(values)
 
     valid_deployment = True
-    deployment_file = None
+    manifest = None
 
     # In development, also generate and validate the k8s deployment manifest
     if settings.DEBUG:
         logger.debug(f"Generating and validating k8s deployment yaml for release {release} before deployment.")
 
         output, error = kdm.generate_manifest_yaml_from_template(
-            chart, values_file, values["namespace"], version, save_to_file=True
+            chart, None, values["namespace"], version, values=values_yaml
         )
-
-        _, deployment_file = kdm.get_filepaths()
+        manifest = output
 
         # Validate the manifest yaml documents
         is_valid, validation_output, _ = kdm.validate_manifest(output)
@@ -263,33 +539,34 @@ def deploy_resource(serialized_instance):
             logger.warning(f"The deployment manifest file is INVALID for release {release}. {validation_output}")
 
     # Install the app using Helm install
-    output, error = helm_install(release, chart, values["namespace"], values_file, version)
+    output, error = helm_install(release, chart, values["namespace"], version=version, values=values_yaml)
     success = not error
 
     helm_info = {"success": success, "info": {"stdout": output, "stderr": error}}
 
-    instance.info = dict(helm=helm_info)
-    # instance.app_status.status = "Created" if success else "Failed"
+    if settings.HELM_KEEP_FAILED_DEPLOY_FILES and not (success and valid_deployment):
+        # Keep the values, and the manifest if generated, of a failed deploy for troubleshooting
+        kdm.save_as_values_file(values_yaml, manifest)
+        logger.info(f"Saved the values of the failed deploy of release {release} as {kdm.get_filepaths().values_file}")
+
+    # Only update the info field to avoid overriding other modified fields elsewhere,
+    # and only if the app instance has not been changed, and thereby redeployed, during the Helm command.
+    # The info of the redeployment is then written by its own task.
+    # The digest is only recorded for a successful deploy, so that a failed deploy is retried.
+    n_updated = BaseAppInstance.objects.filter(pk=instance.pk, k8s_values=deployed_k8s_values).update(
+        info=dict(helm=helm_info),
+        deployed_values_digest=values_digest if success else None,
+        deployed_chart=instance.chart if success else None,
+    )
 
-    # Only update the info field to avoid overriding other modified fields elsewhere
-    instance.save(update_fields=["info"])
+    if n_updated == 0:
+        logger.info(f"Not saving the helm info of release {release} because the app instance changed during deploy")
 
-    # In development, also generate and validate the k8s deployment manifest
-    if settings.DEBUG:
-        # Previously, we generated and validated the deployment after creation
-        # output, error = get_manifest_yaml(release)
-        pass
-
-    if valid_deployment:
-        # If valid, then delete both the values and deployment files (if exists)
-        subprocess.run(["rm", "-f", values_file])
-        if deployment_file:
-            subprocess.run(["rm", "-f", deployment_file])
+    return success
 
 
 @shared_task
-@transaction.atomic
-def delete_resource(serialized_instance, initiated_by_str: str):
+def delete_resource(serialized_instance, initiated_by_str: str, release: str | None = None) -> bool:
     """
     Deletes a cluster resource object.
     For deletes that are initiated by the system itself (such as recurring tasks),
@@ -297,10 +574,17 @@ def delete_resource(serialized_instance, initiated_by_str: str):
     are instead handled by views.
     Note that initiated by is needed because this information cannot be determined
     from the latest_user_action as this is sometimes set after the deletion of the resource.
+    Like deploy_resource, no database connection or transaction is held during the Helm command.
 
     Parameters:
     - serialized_instance: A serialized version of the app to be deleted.
     - initiated_by_str: A string of enum AppActionOrigin indicating the source of the deletion (user|system).
+    - release: The Helm release to delete. Defaults to the current release of the app instance.
+      The outcome of deleting another release, e.g. the old release after a change of the subdomain,
+      is not recorded on the app instance.
+
+    Returns:
+    - Whether the resource was deleted.
     """
     logger.debug(f"Type of serialized_instance is {type(serialized_instance)}")
 
@@ -310,10 +594,14 @@ def delete_resource(serialized_instance, initiated_by_str: str):
     instance = deserialize(serialized_instance)
 
     values = instance.k8s_values
+    app_slug = instance.app.slug
+    release = release or values.get("subdomain")
+
+    release_db_connection()
 
     success = False
-    if values.get("subdomain") is not None:
-        output, error = helm_delete(values["subdomain"], values["namespace"])
+    if release is not None:
+        output, error = helm_delete(release, values["namespace"])
         success = not error
     else:
         error_text = f"Subdomain name does not exist. App: {values['name']}, Project: {values['project']['slug']}"
@@ -323,17 +611,25 @@ def delete_resource(serialized_instance, initiated_by_str: str):
     if success:
         # User actions (Deleting) are now saved by views and helpers.
         # So we do not save any statuses here.
-        logger.info(f"Successfully deleted resource type {instance.app.slug}, {values['subdomain']}")
+        logger.info(f"Successfully deleted resource type {app_slug}, {release}")
     else:
         # There is no need to save a FailedToDelete status
         # We let the k8s event listener handle this event and together with
         # the instance info we have sufficient troubleshooting information.
         # Note: This can occur if for example the deployment has already been deleted.
-        logger.info(f"Failed to delete resource type {instance.app.slug}, {values['subdomain']}, error={error}")
+        # A release left behind by a failed delete is uninstalled by reconcile_releases.
+        logger.info(f"Failed to delete resource type {app_slug}, {release}, error={error}")
+
+    if release != values.get("subdomain"):
+        # The app instance has moved to another release, whose deploy state must not be overwritten
+        return success
 
     helm_info = {"success": success, "info": {"stdout": output, "stderr": error}}
 
     instance.info = dict(helm=helm_info)
+    # The next deploy of the app instance must not be skipped
+    instance.deployed_values_digest = None
+    instance.deployed_chart = None
 
     # Note: when we save the app instance object here, we should not overwrite properties
     # with old values, therefore we carefully restrict the updated fields.
@@ -343,9 +639,13 @@ def delete_resource(serialized_instance, initiated_by_str: str):
         # This is a common scenario for "apps" such as volumeK8s, netpolicy, notebooks and file managers.
         instance.latest_user_action = "SystemDeleting"
         instance.deleted_on = timezone.now()
-        instance.save(update_fields=["latest_user_action", "deleted_on", "info"])
+        instance.save(
+            update_fields=["latest_user_action", "deleted_on", "info", "deployed_values_digest", "deployed_chart"]
+        )
     else:
-        instance.save(update_fields=["info"])
+        instance.save(update_fields=["info", "deployed_values_digest", "deployed_chart"])
+
+    return success
 
 
 def deserialize(serialized_instance):
@@ -366,3 +666,443 @@ def deserialize(serialized_instance):
         raise ValueError(f"Invalid serialized data format: {e}")
     except ObjectDoesNotExist:
         raise ValueError(f"No instance found for model {model} with pk {pk}")
+
+
+def start_bulk_operation(operation: str, queryset, created_by=None, force: bool = False) -> BulkOperation:
+    """
+    Creates a bulk operation deploying or deleting the resources of app instances and starts it
+    in the background once the current transaction is committed.
+
+    :param operation str: The operation, BulkOperation.DEPLOY or BulkOperation.DELETE.
+    :param queryset QuerySet: The app instances.
+    :param created_by User: The user starting the bulk operation.
+    :param force bool: Whether to deploy also app instances that are unchanged.
+    :returns BulkOperation: The bulk operation.
+    """
+    bulk_operation = BulkOperation.objects.create(
+        operation=operation,
+        force=force,
+        concurrency=max(1, settings.ADMIN_BULK_OPERATION_CONCURRENCY),
+        created_by=created_by,
+    )
+    BulkOperationItem.objects.bulk_create(
+        BulkOperationItem(bulk_operation=bulk_operation, app_instance_id=pk)
+        for pk in queryset.values_list("pk", flat=True)
+    )
+
+    transaction.on_commit(lambda: run_bulk_operation.delay(bulk_operation.pk))
+
+    return bulk_operation
+
+
+@shared_task
+def run_bulk_operation(bulk_operation_pk: int) -> None:
+    """
+    Queues the next items of a bulk operation on the release queues, so that at most the concurrency
+    of the bulk operation are queued at a time, and finishes the bulk operation once all items are processed.
+    This is called again whenever a release operation of the bulk operation finishes.
+
+    :param bulk_operation_pk int: The primary key of the bulk operation.
+    """
+    with transaction.atomic():
+        # Locking the bulk operation makes concurrent calls queue each item once
+        bulk_operation = (
+            BulkOperation.objects.select_for_update().filter(pk=bulk_operation_pk, status=BulkOperation.RUNNING).first()
+        )
+
+        if bulk_operation is None:
+            return
+
+        pending = bulk_operation.items.filter(status=BulkOperationItem.PENDING)
+
+        while True:
+            # The items of a stage are queued once all items of the earlier stages are processed
+            stage = pending.aggregate(stage=Min("stage"))["stage"]
+
+            if stage is None:
+                finish_bulk_operation(bulk_operation_pk)
+                return
+
+            n_queued = pending.filter(release_operation__isnull=False).count()
+            n_free = max(0, bulk_operation.concurrency - n_queued)
+            items = list(pending.filter(stage=stage, release_operation__isnull=True).order_by("pk")[:n_free])
+
+            if not items:
+                return
+
+            for item in items:
+                try:
+                    with transaction.atomic():
+                        queue_bulk_operation_item(bulk_operation, item)
+                except Exception as e:
+                    logger.error(
+                        f"Bulk operation {bulk_operation.pk} failed for the app instance {item.app_instance_id}: {e}"
+                    )
+                    BulkOperationItem.objects.filter(pk=item.pk).update(
+                        status=BulkOperationItem.FAILED, message=str(e), finished_on=timezone.now()
+                    )
+
+
+def queue_bulk_operation_item(bulk_operation: BulkOperation, item: BulkOperationItem) -> None:
+    """
+    Queues the deploy or delete of the resource of the app instance of a bulk operation item on the queue
+    of its release, like any other deploy or delete of the app instance.
+
+    :param bulk_operation BulkOperation: The bulk operation.
+    :param item BulkOperationItem: The item to queue.
+    """
+    instance = APP_REGISTRY.fetch_app_instances(BaseAppInstance.objects.filter(pk=item.app_instance_id))[0]
+
+    if bulk_operation.operation == BulkOperation.DEPLOY:
+        # The admin redeploys with the values of the current settings,
+        # while the app instances of a project were just created with theirs
+        if bulk_operation.project_id is None:
+            instance.set_k8s_values()
+            instance.url = get_URI(instance)
+            instance.save(update_fields=["k8s_values", "url"])
+        operation, initiated_by = ReleaseOperation.DEPLOY, None
+    else:
+        operation, initiated_by = ReleaseOperation.DELETE, AppActionOrigin.USER.value
+
+    release = get_release_name(instance)
+    if release is None:
+        raise ValueError("The app instance has no release")
+
+    release_operation, is_new = ReleaseOperation.objects.enqueue(
+        release, operation, instance, initiated_by, bulk_operation.force
+    )
+
+    item.release_operation = release_operation
+    item.save(update_fields=["release_operation"])
+
+    if is_new:
+        transaction.on_commit(lambda: run_release_operations.delay())
+
+
+def finish_bulk_operation(bulk_operation_pk: int) -> dict[str, int]:
+    """
+    Marks a bulk operation as finished. The outcome of a bulk operation of a project is logged in the project,
+    which then gets the project status of the bulk operation, if any.
+
+    :param bulk_operation_pk int: The primary key of the bulk operation.
+    :returns dict: The progress of the bulk operation.
+    """
+    BulkOperation.objects.filter(pk=bulk_operation_pk).update(status=BulkOperation.FINISHED, finished_on=timezone.now())
+    bulk_operation = BulkOperation.objects.select_related("project").get(pk=bulk_operation_pk)
+    progress = bulk_operation.get_progress()
+
+    logger.info(
+        f"Bulk operation {bulk_operation_pk} finished. {progress['succeeded']} of {progress['total']} apps succeeded."
+    )
+
+    if bulk_operation.project is not None:
+        finish_project_bulk_operation(bulk_operation, progress)
+
+    return progress
+
+
+def finish_project_bulk_operation(bulk_operation: BulkOperation, progress: dict[str, int]) -> None:
+    """Logs the outcome of a bulk operation of a project in the project and sets the project status, if any."""
+    project = bulk_operation.project
+
+    verb = "Deployed" if bulk_operation.operation == BulkOperation.DEPLOY else "Deleted"
+    description = f"{verb} the resources of {progress['succeeded']} of {progress['total']} apps."
+
+    if progress["failed"]:
+        failed_names = BaseAppInstance.objects.filter(
+            pk__in=bulk_operation.items.filter(status=BulkOperationItem.FAILED).values("app_instance_id")
+        ).values_list("name", flat=True)
+        description += f" Failed: {', '.join(failed_names)}"
+        logger.warning(f"Project {project.slug}: {description}")
+    else:
+        logger.info(f"Project {project.slug}: {description}")
+
+    ProjectLog.objects.create(
+        project=project,
+        module="DE",
+        headline=f"{verb} project apps",
+        description=description[:512],
+    )
+
+    if bulk_operation.project_status is not None:
+        project.status = bulk_operation.project_status
+        if bulk_operation.project_status == "deleted":
+            project.deleted_on = timezone.now()
+        project.save()
+
+
+STANDBY_APP_SLUG = "jupyter-lab"
+
+
+@app.task
+def refill_standby_pools() -> None:
+    """
+    Keeps the warm pools of standby JupyterLab releases at their size, ProjectTemplate.standby_pool_size
+    per flavor and JupyterLab environment of each active project created from the template.
+    Deploys the missing standby releases and removes failed and surplus standby releases,
+    e.g. of projects that are no longer active.
+
+    At most STANDBY_POOL_DEPLOY_LIMIT standby releases are deployed at a time, and only in the room that
+    the queued release operations leave under HELM_CONCURRENCY_LIMIT, so that refilling the pools never delays
+    the deploys of users. The standby releases that are still missing are deployed by the next runs.
+    """
+    projects = (
+        Project.objects.filter(
+            Q(status="active", project_template__standby_pool_size__gt=0) | Q(standby_releases__isnull=False)
+        )
+        .select_related("project_template")
+        .distinct()
+    )
+
+    stale_threshold = timezone.now() - timedelta(seconds=settings.RELEASE_OPERATION_STALE_AFTER)
+
+    # The number of standby releases that may be deployed by this run
+    depth = ReleaseOperation.objects.get_queue_depth()
+    n_helm_free = settings.HELM_CONCURRENCY_LIMIT - depth["running"] - depth["pending"]
+    n_deploying = StandbyRelease.objects.filter(
+        status=StandbyRelease.DEPLOYING, created_on__gte=stale_threshold
+    ).count()
+    n_deploys = max(0, min(settings.STANDBY_POOL_DEPLOY_LIMIT, n_helm_free) - n_deploying)
+
+    for project in projects:
+        pool_size = 0
+        if project.status == "active" and project.project_template is not None:
+            pool_size = project.project_template.standby_pool_size
+
+        standby_releases = list(StandbyRelease.objects.filter(project=project).order_by("pk"))
+
+        # Standby releases whose deploy failed, or whose deploy task was lost, are replaced
+        failed = {
+            standby_release.pk
+            for standby_release in standby_releases
+            if standby_release.status == StandbyRelease.FAILED
+            or (standby_release.status == StandbyRelease.DEPLOYING and standby_release.created_on < stale_threshold)
+        }
+        for standby_release_pk in failed:
+            delete_standby_release.delay(standby_release_pk)
+
+        pools = {}
+        if pool_size > 0:
+            environments = project.environment_set.filter(app__slug=STANDBY_APP_SLUG)
+            for flavor in Flavor.objects.filter(project=project):
+                for environment in environments:
+                    pools[(flavor.pk, environment.pk)] = []
+
+        for standby_release in standby_releases:
+            if standby_release.pk in failed:
+                continue
+            pool = pools.get((standby_release.flavor_id, standby_release.environment_id))
+            if pool is not None and len(pool) < pool_size:
+                pool.append(standby_release)
+            elif standby_release.status == StandbyRelease.READY:
+                # Surplus standby releases are removed once deployed
+                delete_standby_release.delay(standby_release.pk)
+
+        for (flavor_pk, environment_pk), pool in pools.items():
+            for _ in range(min(pool_size - len(pool), n_deploys)):
+                n_deploys -= 1
+                standby_release = StandbyRelease.objects.create(
+                    project=project,
+                    flavor_id=flavor_pk,
+                    environment_id=environment_pk,
+                    subdomain=Subdomain.objects.create(subdomain="r" + uuid.uuid4().hex[0:8], project=project),
+                )
+                logger.info(f"Adding the standby release {standby_release.subdomain.subdomain} to project {project}")
+                transaction.on_commit(lambda pk=standby_release.pk: deploy_standby_release.delay(pk))
+
+
+def get_standby_release_values(standby_release: StandbyRelease) -> tuple[dict, str]:
+    """
+    Gets the Helm values of a standby release, which are those of a new JupyterLab instance
+    of the project with the flavor and environment of the standby release.
+
+    :returns tuple: The values and the chart.
+    """
+    app_ = Apps.objects.get(slug=STANDBY_APP_SLUG)
+    prototype = APP_REGISTRY.get_orm_model(STANDBY_APP_SLUG)(
+        name="standby",
+        app=app_,
+        chart=app_.chart,
+        project=standby_release.project,
+        owner=standby_release.project.owner,
+        flavor=standby_release.flavor,
+        environment=standby_release.environment,
+        subdomain=standby_release.subdomain,
+    )
+    return prototype.get_k8s_values(), app_.chart
+
+
+@shared_task
+def deploy_standby_release(standby_release_pk: int) -> bool:
+    """
+    Installs a standby release of a warm pool with Helm and marks it ready, or failed.
+
+    :param standby_release_pk int: The primary key of the standby release.
+    :returns bool: Whether the standby release was installed.
+    """
+    standby_release = StandbyRelease.objects.select_related("project__owner", "flavor", "environment", "subdomain").get(
+        pk=standby_release_pk
+    )
+    release = standby_release.subdomain.subdomain
+    values, chart = get_standby_release_values(standby_release)
+
+    release_db_connection()
+
+    chart, version = get_chart_cache().resolve(chart)
+
+    output, error = helm_install(release, chart, values["namespace"], version=version, values=yaml.dump(values))
+    success = not error
+
+    # The standby release may have been claimed during the Helm command, then the app instance owns the release
+    StandbyRelease.objects.filter(pk=standby_release_pk).update(
+        status=StandbyRelease.READY if success else StandbyRelease.FAILED,
+        info=dict(helm={"success": success, "info": {"stdout": output, "stderr": error}}),
+    )
+
+    if success:
+        logger.info(f"The standby release {release} is ready")
+    else:
+        logger.warning(f"Failed to install the standby release {release}. {error}")
+
+    return success
+
+
+@shared_task
+def delete_standby_release(standby_release_pk: int) -> None:
+    """
+    Removes a standby release from its warm pool and deletes it with Helm, unless it was claimed meanwhile.
+
+    :param standby_release_pk int: The primary key of the standby release.
+    """
+    with transaction.atomic():
+        standby_release = (
+            StandbyRelease.objects.select_for_update(skip_locked=True)
+            .select_related("subdomain")
+            .filter(pk=standby_release_pk)
+            .first()
+        )
+
+        if standby_release is None:
+            return
+
+        subdomain = standby_release.subdomain
+        namespace = settings.NAMESPACE
+        # Deleting the subdomain also deletes the standby release
+        subdomain.delete()
+
+    helm_delete(subdomain.subdomain, namespace)
+    logger.info(f"Deleted the standby release {subdomain.subdomain}")
+
+
+def delete_standby_releases(project: Project) -> None:
+    """
+    Deletes the standby releases of the warm pools of a project in the background, e.g. when the project is deleted.
+    """
+    for standby_release_pk in StandbyRelease.objects.filter(project=project).values_list("pk", flat=True):
+        delete_standby_release.delay(standby_release_pk)
+
+
+HELM_LIST_CHART_VERSION_REGEX = re.compile(r"-v?\d+\.\d+\.\d+\S*$")
+
+
+@app.task
+def reconcile_releases(dry_run: bool = False) -> dict:
+    """
+    Reconciles the Helm releases of the namespace with the app instances in the database, in bulk.
+    The releases are listed with a single helm list and diffed against the releases of all app instances,
+    read in a single query, and the drift is fixed in both directions:
+
+    - Orphan releases, i.e. releases of app charts without an app instance that is not deleted,
+      e.g. because the uninstall of a deleted app instance failed, are uninstalled.
+    - App instances that are not deleted but have no release are redeployed, with force since
+      the values digest of their last successful deploy no longer matches a release.
+
+    Releases of charts that are not app charts, e.g. of Serve itself, are never touched.
+    Releases and app instances changed within the last RELEASE_RECONCILER_GRACE_PERIOD seconds,
+    and releases with queued operations, are skipped since they may still be in progress.
+
+    :param dry_run bool: Whether to only report the drift without fixing it.
+    :returns dict: The report, i.e. the number of releases and the orphan and missing releases.
+    """
+    grace_threshold = timezone.now() - timedelta(seconds=settings.RELEASE_RECONCILER_GRACE_PERIOD)
+
+    releases = helm_list(settings.NAMESPACE)
+
+    app_chart_names = {
+        PurePosixPath(parse_chart_reference(chart).chart).name
+        for chart in Apps.objects.exclude(chart="").values_list("chart", flat=True).distinct()
+    }
+
+    # The releases of all app instances, in a single query
+    active_releases = {}
+    for pk, subdomain, values_subdomain, latest_user_action, updated_on in BaseAppInstance.objects.values_list(
+        "pk", "subdomain__subdomain", "k8s_values__subdomain", "latest_user_action", "updated_on"
+    ):
+        release = values_subdomain or subdomain
+        if release and latest_user_action not in ("Deleting", "SystemDeleting"):
+            active_releases[release] = (pk, updated_on)
+
+    busy_releases = set(ReleaseOperation.objects.values_list("release", flat=True))
+    standby_releases = set(StandbyRelease.objects.values_list("subdomain__subdomain", flat=True))
+
+    orphan_releases = []
+    for release in releases:
+        name = release.get("name")
+        # The chart of a release is its name and version, e.g. custom-app-1.1.3
+        chart_name = HELM_LIST_CHART_VERSION_REGEX.sub("", str(release.get("chart", "")))
+        updated = _parse_helm_time(release.get("updated", ""))
+
+        if name in active_releases or name in busy_releases or name in standby_releases:
+            continue
+        if chart_name not in app_chart_names:
+            continue
+        if updated is None or updated > grace_threshold:
+            continue
+
+        orphan_releases.append(name)
+
+    release_names = {release.get("name") for release in releases}
+    missing_pks = [
+        pk
+        for release, (pk, updated_on) in active_releases.items()
+        if release not in release_names and release not in busy_releases and updated_on < grace_threshold
+    ]
+    missing_instances = list(APP_REGISTRY.fetch_app_instances(BaseAppInstance.objects.filter(pk__in=missing_pks)))
+
+    report = {
+        "releases": len(releases),
+        "orphan_releases": sorted(orphan_releases),
+        "deleted_orphan_releases": [],
+        "missing_releases": sorted(get_release_name(instance) for instance in missing_instances),
+        "dry_run": dry_run,
+    }
+
+    if not dry_run:
+        for name in orphan_releases:
+            _, error = helm_delete(name, settings.NAMESPACE)
+            if error:
+                logger.warning(f"Unable to uninstall the orphan release {name}. {error}")
+            else:
+                report["deleted_orphan_releases"].append(name)
+
+        for instance in missing_instances:
+            queue_deploy_resource(instance, force=True)
+
+    logger.info(
+        f"Reconciled {report['releases']} releases with the app instances. "
+        f"Orphan releases: {len(orphan_releases)} ({len(report['deleted_orphan_releases'])} uninstalled), "
+        f"app instances without a release: {len(missing_instances)}{' (dry run)' if dry_run else ' (redeployed)'}"
+    )
+
+    return report
+
+
+def _parse_helm_time(value: str) -> datetime | None:
+    """Parses a time of helm list, e.g. 2025-01-31 10:15:00.123456789 +0000 UTC."""
+    parts = value.split(" ")
+    if len(parts) < 3:
+        return None
+    try:
+        return datetime.strptime(f"{parts[0]} {parts[1][:8]} {parts[2]}", "%Y-%m-%d %H:%M:%S %z")
+    except ValueError:
+        return None
@@ -61,7 +61,7 @@ class CreateAppInstanceTestCase(TestCase):
 
         self.assertTrue(form.is_valid(), f"The form should be valid but has errors: {form.errors}")
 
-        with patch("apps.tasks.deploy_resource.delay") as mock_task:
+        with patch("apps.tasks.queue_deploy_resource") as mock_task:
             id = create_instance_from_form(form, self.project, self.app_slug, app_id=None)
 
             self.assertIsNotNone(id)
@@ -94,9 +94,8 @@ class CreateAppInstanceTestCase(TestCase):
 
 # Mock the tasks that manipulate k8s resources.
 # Note that these are passed to the test functions in reverse order.
-# The delete_resource task is used sync (without delay) in helpers.
-@patch("apps.tasks.deploy_resource.delay")
-@patch("apps.tasks.delete_resource")
+@patch("apps.tasks.queue_deploy_resource")
+@patch("apps.tasks.queue_delete_resource")
 class UpdateExistingAppInstanceTestCase(TestCase):
     """
     Test case for helper function create_instance_from_form
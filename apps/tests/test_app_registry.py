@@ -0,0 +1,89 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from projects.models import Project
+
+from ..app_registry import APP_REGISTRY
+from ..models import (
+    AppCategories,
+    Apps,
+    BaseAppInstance,
+    CustomAppInstance,
+    JupyterInstance,
+    ShinyInstance,
+    Subdomain,
+    VolumeInstance,
+)
+
+User = get_user_model()
+
+
+class FetchAppInstancesTestCase(TestCase):
+    """Test case for fetching app instances of several app types through the app registry."""
+
+    def setUp(self):
+        self.user = User.objects.create_user("foo1", "foo@test.com", "bar")
+        self.project = Project.objects.create_project(name="test-perm-app-registry", owner=self.user, description="")
+        category = AppCategories.objects.create(name="Serve", priority=100, slug="serve")
+
+        self.instances = []
+        for i, (model_class, slug, access) in enumerate(
+            [
+                (JupyterInstance, "jupyter-lab", "project"),
+                (CustomAppInstance, "customapp", "public"),
+                (ShinyInstance, "shinyapp", "public"),
+                (ShinyInstance, "shinyproxyapp", "private"),
+                (VolumeInstance, "volumeK8s", None),
+                (CustomAppInstance, "customapp", "link"),
+            ]
+        ):
+            app, _ = Apps.objects.get_or_create(name=slug, slug=slug, category=category)
+            kwargs = {} if access is None else {"access": access}
+            self.instances.append(
+                model_class.objects.create(
+                    owner=self.user,
+                    name=f"test_app_instance_{i}",
+                    app=app,
+                    project=self.project,
+                    subdomain=Subdomain.objects.create(subdomain=f"test-app-registry-{i}"),
+                    **kwargs,
+                )
+            )
+
+    def test_fetch_app_instances_should_return_concrete_instances_in_order(self):
+        queryset = BaseAppInstance.objects.annotate_with_app_status().order_by("-pk")
+
+        # One query on the parent model, one per concrete ORM model (Jupyter, CustomApp, Shiny, Volume)
+        # and one tags prefetch per concrete ORM model having tags (CustomApp, Shiny)
+        with self.assertNumQueries(7):
+            actual = APP_REGISTRY.fetch_app_instances(queryset, select_related=["app"], prefetch_related=["tags"])
+
+        assert [instance.pk for instance in actual] == [instance.pk for instance in reversed(self.instances)]
+        assert [type(instance) for instance in actual] == [type(instance) for instance in reversed(self.instances)]
+        expected_app_status = dict(queryset.values_list("pk", "atn_app_status"))
+        assert all(instance.atn_app_status == expected_app_status[instance.pk] for instance in actual)
+
+    def test_fetch_app_instances_with_model_filter(self):
+        other_user = User.objects.create_user("foo2", "foo2@test.com", "bar")
+
+        actual = APP_REGISTRY.fetch_app_instances(
+            BaseAppInstance.objects.order_by("pk"),
+            model_filter=lambda orm_model: orm_model.objects.get_app_instances_of_user_filter(other_user),
+        )
+
+        assert [instance.name for instance in actual] == [
+            "test_app_instance_0",
+            "test_app_instance_1",
+            "test_app_instance_2",
+            "test_app_instance_5",
+        ]
+
+    def test_get_orm_model_field_filter(self):
+        queryset = BaseAppInstance.objects.filter(APP_REGISTRY.get_orm_model_field_filter("access", "public"))
+
+        assert sorted(queryset.values_list("name", flat=True)) == ["test_app_instance_1", "test_app_instance_2"]
+
+    def test_get_orm_model_field_filter_without_models_should_match_nothing(self):
+        queryset = BaseAppInstance.objects.filter(APP_REGISTRY.get_orm_model_field_filter("access", "public", []))
+
+        assert not queryset.exists()
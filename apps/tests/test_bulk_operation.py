@@ -0,0 +1,181 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from projects.models import Project
+from studio.celery import app
+
+from ..models import (
+    Apps,
+    BulkOperation,
+    BulkOperationItem,
+    CustomAppInstance,
+    ReleaseOperation,
+    Subdomain,
+)
+from ..tasks import (
+    finish_release_operation,
+    run_bulk_operation,
+    run_release_operations,
+    start_bulk_operation,
+)
+
+User = get_user_model()
+
+
+class BulkOperationTestCase(TestCase):
+    """Test case for the background bulk operations deploying and deleting app resources."""
+
+    def setUp(self):
+        self.user = User.objects.create_superuser("admin", "admin@test.com", "bar")
+        self.project = Project.objects.create_project(name="test-bulk", owner=self.user, description="")
+        self.app = Apps.objects.create(name="Custom App", slug="customapp")
+        self.app_instances = [
+            CustomAppInstance.objects.create(
+                owner=self.user,
+                name=f"test-bulk-{i}",
+                app=self.app,
+                project=self.project,
+                subdomain=Subdomain.objects.create(subdomain=f"test-bulk-{i}"),
+                k8s_values={"subdomain": f"test-bulk-{i}", "namespace": "default"},
+            )
+            for i in range(3)
+        ]
+        self.queryset = CustomAppInstance.objects.filter(pk__in=[a.pk for a in self.app_instances])
+
+        app.conf.task_always_eager = True
+        app.conf.task_eager_propagates = True
+        self.addCleanup(setattr, app.conf, "task_always_eager", False)
+        self.addCleanup(setattr, app.conf, "task_eager_propagates", False)
+
+    def fake_delete_resource(self, serialized_instance, initiated_by_str, release=None):
+        # The last app fails to be deleted
+        if serialized_instance["pk"] == self.app_instances[-1].pk:
+            CustomAppInstance.objects.filter(pk=serialized_instance["pk"]).update(
+                info={"helm": {"success": False, "info": {"stdout": None, "stderr": "Error: release not found"}}}
+            )
+            return False
+        return True
+
+    def test_delete_records_the_outcome_of_each_app(self):
+        with patch("apps.tasks.delete_resource", side_effect=self.fake_delete_resource) as mock_delete:
+            with self.captureOnCommitCallbacks(execute=True):
+                bulk_operation = start_bulk_operation(BulkOperation.DELETE, self.queryset, self.user)
+
+        self.assertEqual(mock_delete.call_count, 3)
+
+        bulk_operation.refresh_from_db()
+        self.assertEqual(bulk_operation.status, BulkOperation.FINISHED)
+        self.assertIsNotNone(bulk_operation.finished_on)
+        self.assertEqual(bulk_operation.get_progress(), {"total": 3, "pending": 0, "succeeded": 2, "failed": 1})
+
+        failed = bulk_operation.items.get(status=BulkOperationItem.FAILED)
+        self.assertEqual(failed.app_instance_id, self.app_instances[-1].pk)
+        self.assertEqual(failed.message, "Error: release not found")
+
+    def test_deploy_exception_is_recorded_as_failure(self):
+        with patch("apps.tasks.deploy_resource", side_effect=RuntimeError("helm is unavailable")), patch(
+            "apps.models.CustomAppInstance.set_k8s_values"
+        ), patch("apps.tasks.get_URI", return_value="https://test-bulk.example.com"):
+            with self.captureOnCommitCallbacks(execute=True):
+                bulk_operation = start_bulk_operation(BulkOperation.DEPLOY, self.queryset, self.user, force=True)
+
+        self.assertEqual(bulk_operation.get_progress()["failed"], 3)
+        self.assertEqual(set(bulk_operation.items.values_list("message", flat=True)), {"helm is unavailable"})
+
+    @override_settings(ADMIN_BULK_OPERATION_CONCURRENCY=2)
+    def test_concurrency_is_bounded(self):
+        with patch("apps.tasks.run_bulk_operation.delay"):
+            bulk_operation = start_bulk_operation(BulkOperation.DELETE, self.queryset, self.user)
+
+        with patch("apps.tasks.run_release_operations.delay"):
+            run_bulk_operation(bulk_operation.pk)
+
+            # At most two items are queued at a time
+            operations = list(ReleaseOperation.objects.order_by("pk"))
+            self.assertEqual([op.release for op in operations], ["test-bulk-0", "test-bulk-1"])
+            self.assertEqual(bulk_operation.items.filter(release_operation__isnull=False).count(), 2)
+
+            # The next item is queued when a queued item finishes
+            finish_release_operation(operations[0], True)
+
+        self.assertEqual(
+            list(ReleaseOperation.objects.order_by("pk").values_list("release", flat=True)),
+            ["test-bulk-1", "test-bulk-2"],
+        )
+        self.assertEqual(bulk_operation.get_progress(), {"total": 3, "pending": 2, "succeeded": 1, "failed": 0})
+
+    def test_items_wait_for_the_running_operation_of_their_release(self):
+        ReleaseOperation.objects.enqueue("test-bulk-0", ReleaseOperation.DEPLOY, self.app_instances[0])
+        running = ReleaseOperation.objects.claim_next()
+
+        with patch("apps.tasks.delete_resource", side_effect=self.fake_delete_resource) as mock_delete:
+            with self.captureOnCommitCallbacks(execute=True):
+                bulk_operation = start_bulk_operation(BulkOperation.DELETE, self.queryset, self.user)
+
+            # The delete of the release with a running deploy is not started
+            self.assertEqual(mock_delete.call_count, 2)
+            self.assertEqual(bulk_operation.items.get(app_instance=self.app_instances[0]).status, "pending")
+
+            # The task running the deploy then runs the queued delete
+            finish_release_operation(running, True)
+            run_release_operations()
+
+        self.assertEqual(mock_delete.call_count, 3)
+        bulk_operation.refresh_from_db()
+        self.assertEqual(bulk_operation.status, BulkOperation.FINISHED)
+
+    def test_dropped_items_are_failed(self):
+        with patch("apps.tasks.run_release_operations.delay"):
+            with self.captureOnCommitCallbacks(execute=True):
+                bulk_operation = start_bulk_operation(BulkOperation.DELETE, self.queryset[:1], self.user)
+
+        ReleaseOperation.objects.drop_pending("Dropped by the test", release="test-bulk-0")
+        run_bulk_operation(bulk_operation.pk)
+
+        bulk_operation.refresh_from_db()
+        self.assertEqual(bulk_operation.status, BulkOperation.FINISHED)
+        self.assertEqual(bulk_operation.items.get().message, "Dropped by the test")
+
+    def test_admin_deploy_actions_redirect_to_the_bulk_operation(self):
+        self.client.force_login(self.user)
+
+        for action, force in (("deploy_resources", False), ("force_deploy_resources", True)):
+            with self.subTest(action=action):
+                with patch("apps.tasks.run_bulk_operation.delay") as mock_run:
+                    with self.captureOnCommitCallbacks(execute=True):
+                        response = self.client.post(
+                            reverse("admin:apps_customappinstance_changelist"),
+                            {"action": action, "_selected_action": [a.pk for a in self.app_instances]},
+                        )
+
+                bulk_operation = BulkOperation.objects.latest("pk")
+                self.assertRedirects(response, reverse("admin:apps_bulkoperation_change", args=[bulk_operation.pk]))
+                mock_run.assert_called_once_with(bulk_operation.pk)
+                self.assertEqual(bulk_operation.operation, BulkOperation.DEPLOY)
+                self.assertEqual(bulk_operation.force, force)
+                self.assertEqual(bulk_operation.items.count(), 3)
+
+    def test_admin_delete_action_starts_a_bulk_operation(self):
+        self.client.force_login(self.user)
+        ReleaseOperation.objects.enqueue("test-bulk-0", ReleaseOperation.DEPLOY, self.app_instances[0])
+
+        with patch("apps.tasks.run_bulk_operation.delay") as mock_run:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(
+                    reverse("admin:apps_customappinstance_changelist"),
+                    {"action": "delete_resources", "_selected_action": [a.pk for a in self.app_instances]},
+                )
+
+        bulk_operation = BulkOperation.objects.get()
+        self.assertRedirects(response, reverse("admin:apps_bulkoperation_change", args=[bulk_operation.pk]))
+        mock_run.assert_called_once_with(bulk_operation.pk)
+        self.assertEqual(bulk_operation.items.count(), 3)
+        self.assertFalse(ReleaseOperation.objects.exists())
+        self.assertEqual(set(self.queryset.values_list("latest_user_action", flat=True)), {"Deleting"})
+
+        response = self.client.get(reverse("admin:apps_bulkoperation_change", args=[bulk_operation.pk]))
+        self.assertContains(response, "0 of 3 apps processed")
+        self.assertContains(response, 'http-equiv="refresh"')
@@ -0,0 +1,118 @@
+import io
+import subprocess
+import tarfile
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from ..models import Apps
+from ..tasks import warm_chart_cache
+from ..types_.chart_cache import ChartCache, ChartReference, parse_chart_reference
+
+CHART = "ghcr.io/scilifelabdatacentre/serve-charts/custom-app:1.1.3"
+
+
+def write_chart_package(destination: str, name: str, version: str) -> None:
+    """Writes a minimal chart package like helm pull does."""
+    content = f"apiVersion: v2\nname: {name}\nversion: {version}\n".encode()
+    with tarfile.open(Path(destination, f"{name}-{version}.tgz"), "w:gz") as package:
+        info = tarfile.TarInfo(f"{name}/Chart.yaml")
+        info.size = len(content)
+        package.addfile(info, io.BytesIO(content))
+
+
+def fake_helm_pull(command, **kwargs):
+    chart, version, destination = command[2], command[4], command[6]
+    write_chart_package(destination, chart.split("/")[-1], version)
+    return subprocess.CompletedProcess(command, 0, "", "")
+
+
+def test_parse_chart_reference():
+    assert parse_chart_reference(CHART) == ChartReference(
+        "oci://ghcr.io/scilifelabdatacentre/serve-charts/custom-app", "1.1.3"
+    )
+    assert parse_chart_reference("oci://registry.example.com/charts/app:2.0.0") == ChartReference(
+        "oci://registry.example.com/charts/app", "2.0.0"
+    )
+    assert parse_chart_reference("apps/pytorch-serve/chart") == ChartReference("apps/pytorch-serve/chart")
+
+
+class ChartCacheTestCase(TestCase):
+    """Test case for the local cache of packaged OCI charts."""
+
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+        self.chart_cache = ChartCache(self.cache_dir.name)
+
+    def resolve(self, chart=CHART, chart_cache=None):
+        with patch("apps.types_.chart_cache.subprocess.run", side_effect=fake_helm_pull) as mock_run:
+            reference = (chart_cache or self.chart_cache).resolve(chart)
+        return reference, mock_run.call_count
+
+    def test_oci_chart_is_resolved_to_a_local_package(self):
+        reference, n_pulls = self.resolve()
+
+        self.assertEqual(n_pulls, 1)
+        self.assertIsNone(reference.version)
+        self.assertTrue(reference.chart.startswith(self.cache_dir.name))
+        self.assertTrue(Path(reference.chart).is_file())
+
+    def test_cached_chart_is_not_pulled_again(self):
+        self.resolve()
+
+        self.assertEqual(self.resolve()[1], 0)
+        # Another process reuses the package on disk
+        self.assertEqual(self.resolve(chart_cache=ChartCache(self.cache_dir.name))[1], 0)
+
+    def test_corrupt_package_is_pulled_again(self):
+        reference, _ = self.resolve()
+        Path(reference.chart).write_bytes(b"corrupt")
+
+        reference, n_pulls = self.resolve(chart_cache=ChartCache(self.cache_dir.name))
+
+        self.assertEqual(n_pulls, 1)
+        with tarfile.open(reference.chart, "r:gz") as package:
+            self.assertIn("custom-app/Chart.yaml", package.getnames())
+
+    def test_package_with_the_wrong_version_is_rejected(self):
+        def fake_helm_pull_wrong_version(command, **kwargs):
+            write_chart_package(command[6], "custom-app", "9.9.9")
+
+        with patch("apps.types_.chart_cache.subprocess.run", side_effect=fake_helm_pull_wrong_version):
+            reference = self.chart_cache.resolve(CHART)
+
+        self.assertEqual(reference, parse_chart_reference(CHART))
+
+    def test_failed_pull_falls_back_to_the_registry(self):
+        error = subprocess.CalledProcessError(1, "helm", stderr="Error: registry unavailable")
+
+        with patch("apps.types_.chart_cache.subprocess.run", side_effect=error) as mock_run:
+            self.assertEqual(self.chart_cache.resolve(CHART), parse_chart_reference(CHART))
+            # The pull is not retried at once
+            self.assertEqual(self.chart_cache.resolve(CHART), parse_chart_reference(CHART))
+
+        self.assertEqual(mock_run.call_count, 1)
+
+    def test_local_chart_is_not_cached(self):
+        reference, n_pulls = self.resolve("apps/pytorch-serve/chart")
+
+        self.assertEqual(n_pulls, 0)
+        self.assertEqual(reference, ChartReference("apps/pytorch-serve/chart"))
+
+    def test_warm_chart_cache_pulls_the_charts_of_all_apps(self):
+        Apps.objects.create(name="Custom App", slug="customapp", chart=CHART)
+        Apps.objects.create(name="Custom App 2", slug="customapp2", chart=CHART)
+        Apps.objects.create(
+            name="Dash App", slug="dashapp", chart="ghcr.io/scilifelabdatacentre/serve-charts/dash:1.0.5"
+        )
+        Apps.objects.create(name="Local App", slug="localapp", chart="apps/pytorch-serve/chart")
+
+        with patch("apps.tasks.get_chart_cache", return_value=self.chart_cache), patch(
+            "apps.tasks.connection.close"
+        ), patch("apps.types_.chart_cache.subprocess.run", side_effect=fake_helm_pull) as mock_run:
+            warm_chart_cache()
+
+        self.assertEqual(mock_run.call_count, 2)
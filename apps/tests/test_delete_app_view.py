@@ -70,7 +70,7 @@ class DeleteAppViewTestCase(TestCase):
         self.app.user_can_delete = True
         self.app.save()
 
-        with patch("apps.tasks.delete_resource.delay") as mock_task:
+        with patch("apps.views.queue_delete_resource") as mock_task:
             url = f"/projects/{self.project.slug}/apps/delete/" + f"{self.app_instance.app.slug}/{self.app_instance.id}"
 
             response = c.get(url)
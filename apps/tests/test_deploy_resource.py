@@ -0,0 +1,232 @@
+import subprocess
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import yaml
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from projects.models import Project
+
+from ..constants import AppActionOrigin
+from ..models import Apps, CustomAppInstance, Subdomain
+from ..tasks import delete_resource, deploy_resource
+from ..types_.chart_cache import parse_chart_reference
+from ..types_.kubernetes_deployment_manifest import KubernetesDeploymentManifest
+
+User = get_user_model()
+
+
+class DeployResourceTestCase(TransactionTestCase):
+    """
+    Test case for the deploy_resource and delete_resource tasks holding no database connection during Helm commands.
+    A TransactionTestCase is used because connections are never released inside the transaction of a TestCase.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user("foo1", "foo@test.com", "bar")
+        self.project = Project.objects.create_project(name="test-deploy-resource", owner=self.user, description="")
+        self.app = Apps.objects.create(name="Custom App", slug="customapp")
+        self.app_instance = CustomAppInstance.objects.create(
+            owner=self.user,
+            name="test-deploy-resource",
+            app=self.app,
+            project=self.project,
+            chart="charts/customapp",
+            subdomain=Subdomain.objects.create(subdomain="test-deploy-resource"),
+            k8s_values={"subdomain": "test-deploy-resource", "namespace": "default"},
+        )
+        self.connection_held_during_helm = None
+
+    def fake_helm(self, *args, **kwargs):
+        self.connection_held_during_helm = connection.connection is not None
+        return "deployed", None
+
+    def test_deploy_resource_should_not_hold_a_connection_during_helm(self):
+        with patch("apps.tasks.helm_install", side_effect=self.fake_helm):
+            deploy_resource(self.app_instance.serialize())
+
+        self.assertFalse(self.connection_held_during_helm)
+
+        self.app_instance.refresh_from_db()
+        self.assertEqual(self.app_instance.info["helm"]["success"], True)
+        self.assertEqual(self.app_instance.info["helm"]["info"]["stdout"], "deployed")
+
+    def test_deploy_resource_should_not_overwrite_info_of_a_changed_app_instance(self):
+        def fake_helm_with_concurrent_edit(*args, **kwargs):
+            # The app instance is changed and redeployed while the helm command is running
+            CustomAppInstance.objects.filter(pk=self.app_instance.pk).update(
+                k8s_values={"subdomain": "test-deploy-resource", "namespace": "default", "changed": True},
+                info={"helm": {"success": True, "info": {"stdout": "redeployed", "stderr": None}}},
+            )
+            return "deployed", None
+
+        with patch("apps.tasks.helm_install", side_effect=fake_helm_with_concurrent_edit):
+            deploy_resource(self.app_instance.serialize())
+
+        self.app_instance.refresh_from_db()
+        self.assertEqual(self.app_instance.info["helm"]["info"]["stdout"], "redeployed")
+
+    def test_delete_resource_should_not_hold_a_connection_during_helm(self):
+        with patch("apps.tasks.helm_delete", side_effect=self.fake_helm):
+            delete_resource(self.app_instance.serialize(), AppActionOrigin.SYSTEM.value)
+
+        self.assertFalse(self.connection_held_during_helm)
+
+        self.app_instance.refresh_from_db()
+        self.assertEqual(self.app_instance.latest_user_action, "SystemDeleting")
+        self.assertEqual(self.app_instance.info["helm"]["info"]["stdout"], "deployed")
+
+    def test_delete_resource_of_an_old_release_should_not_overwrite_the_app_instance(self):
+        # The subdomain of the app instance was changed and its new release deployed
+        deployed_info = {"helm": {"success": True, "info": {"stdout": "deployed", "stderr": None}}}
+        CustomAppInstance.objects.filter(pk=self.app_instance.pk).update(info=deployed_info)
+
+        with patch("apps.tasks.helm_delete", return_value=("uninstalled", None)) as mock_helm_delete:
+            self.assertTrue(
+                delete_resource(self.app_instance.serialize(), AppActionOrigin.SYSTEM.value, "test-old-release")
+            )
+
+        mock_helm_delete.assert_called_once_with("test-old-release", "default")
+        self.app_instance.refresh_from_db()
+        self.assertEqual(self.app_instance.info, deployed_info)
+        self.assertIsNone(self.app_instance.deleted_on)
+
+
+class DeployResourceValuesDigestTestCase(TestCase):
+    """Test case for deploy_resource skipping deploys whose values and chart are unchanged."""
+
+    def setUp(self):
+        self.user = User.objects.create_user("foo1", "foo@test.com", "bar")
+        self.project = Project.objects.create_project(name="test-values-digest", owner=self.user, description="")
+        self.app = Apps.objects.create(name="Custom App", slug="customapp")
+        self.app_instance = CustomAppInstance.objects.create(
+            owner=self.user,
+            name="test-values-digest",
+            app=self.app,
+            project=self.project,
+            chart="ghcr.io/scilifelabdatacentre/serve-charts/custom-app:1.1.3",
+            subdomain=Subdomain.objects.create(subdomain="test-values-digest"),
+            k8s_values={"subdomain": "test-values-digest", "namespace": "default"},
+        )
+
+    def deploy(self, force=False, helm_result=("deployed", None)):
+        with patch("apps.tasks.helm_install", return_value=helm_result) as mock_helm, patch(
+            "apps.tasks.get_chart_cache"
+        ) as mock_chart_cache:
+            mock_chart_cache.return_value.resolve.side_effect = parse_chart_reference
+            deploy_resource(self.app_instance.serialize(), force)
+        self.app_instance.refresh_from_db()
+        return mock_helm.called
+
+    def test_unchanged_deploy_is_skipped(self):
+        self.assertTrue(self.deploy())
+        self.assertIsNotNone(self.app_instance.deployed_values_digest)
+        self.assertEqual(self.app_instance.deployed_chart, self.app_instance.chart)
+
+        self.assertFalse(self.deploy())
+
+    def test_forced_deploy_is_not_skipped(self):
+        self.deploy()
+
+        self.assertTrue(self.deploy(force=True))
+
+    def test_changed_deploy_is_not_skipped(self):
+        self.deploy()
+
+        self.app_instance.k8s_values_override = {"appconfig": {"port": 8080}}
+        self.app_instance.save(update_fields=["k8s_values_override"])
+        self.assertTrue(self.deploy())
+
+        self.app_instance.chart = "ghcr.io/scilifelabdatacentre/serve-charts/custom-app:1.1.4"
+        self.app_instance.save(update_fields=["chart"])
+        self.assertTrue(self.deploy())
+
+    def test_failed_deploy_is_retried(self):
+        self.deploy(helm_result=("", "Error: timed out"))
+        self.assertIsNone(self.app_instance.deployed_values_digest)
+
+        self.assertTrue(self.deploy())
+
+    def test_deploy_after_delete_is_not_skipped(self):
+        self.deploy()
+
+        with patch("apps.tasks.helm_delete", return_value=("uninstalled", None)):
+            delete_resource(self.app_instance.serialize(), AppActionOrigin.USER.value)
+
+        self.app_instance.refresh_from_db()
+        self.assertIsNone(self.app_instance.deployed_values_digest)
+        self.assertTrue(self.deploy())
+
+    def test_deploy_of_unversioned_chart_is_not_skipped(self):
+        self.app_instance.chart = "charts/customapp"
+        self.app_instance.save(update_fields=["chart"])
+
+        self.deploy()
+        self.assertTrue(self.deploy())
+
+
+class DeployResourceValuesStdinTestCase(TestCase):
+    """Test case for deploy_resource passing the values to Helm over stdin instead of a values file."""
+
+    def setUp(self):
+        self.user = User.objects.create_user("foo1", "foo@test.com", "bar")
+        self.project = Project.objects.create_project(name="test-values-stdin", owner=self.user, description="")
+        self.app = Apps.objects.create(name="Custom App", slug="customapp")
+        self.app_instance = CustomAppInstance.objects.create(
+            owner=self.user,
+            name="test-values-stdin",
+            app=self.app,
+            project=self.project,
+            chart="charts/customapp",
+            subdomain=Subdomain.objects.create(subdomain="test-values-stdin"),
+            k8s_values={"subdomain": "test-values-stdin", "namespace": "default"},
+        )
+
+        values_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(values_dir.cleanup)
+        self.values_dir = Path(values_dir.name)
+        charts_dir_patcher = patch.object(KubernetesDeploymentManifest, "_charts_dir", self.values_dir)
+        charts_dir_patcher.start()
+        self.addCleanup(charts_dir_patcher.stop)
+
+    def deploy(self, returncode=0):
+        def fake_run(command, **kwargs):
+            if returncode:
+                raise subprocess.CalledProcessError(returncode, command, "", "Error: failed")
+            return subprocess.CompletedProcess(command, 0, "deployed", "")
+
+        with patch("apps.tasks.subprocess.run", side_effect=fake_run) as mock_run, patch(
+            "apps.tasks.get_chart_cache"
+        ) as mock_chart_cache:
+            mock_chart_cache.return_value.resolve.side_effect = parse_chart_reference
+            deploy_resource(self.app_instance.serialize())
+        return mock_run
+
+    def test_values_are_passed_over_stdin(self):
+        mock_run = self.deploy()
+
+        # Only helm is run, there is no values file to remove
+        mock_run.assert_called_once()
+        command = mock_run.call_args.args[0]
+        self.assertEqual(command[command.index("-f") + 1], "-")
+        self.assertEqual(yaml.safe_load(mock_run.call_args.kwargs["input"]), self.app_instance.k8s_values)
+        self.assertEqual(list(self.values_dir.iterdir()), [])
+
+    def test_failed_deploy_leaves_no_values_file(self):
+        self.deploy(returncode=1)
+
+        self.assertEqual(list(self.values_dir.iterdir()), [])
+
+    @override_settings(HELM_KEEP_FAILED_DEPLOY_FILES=True)
+    def test_values_of_failed_deploy_are_kept_when_asked_for(self):
+        self.deploy()
+        self.assertEqual(list(self.values_dir.iterdir()), [])
+
+        self.deploy(returncode=1)
+
+        values_files = list(self.values_dir.iterdir())
+        self.assertEqual(len(values_files), 1)
+        self.assertEqual(yaml.safe_load(values_files[0].read_text()), self.app_instance.k8s_values)
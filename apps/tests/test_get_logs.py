@@ -0,0 +1,206 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest.mock import AsyncMock, patch
+from urllib.parse import parse_qs, urlparse
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from projects.models import Project
+
+from ..models import Apps, CustomAppInstance, Subdomain
+from ..types_.log_cursor import LogCursor, log_line_digest
+from ..views import GetLogs, GetLogsStream
+
+User = get_user_model()
+
+# Recorded result of a Loki query_range of the logs of an app, newest first
+LOKI_STREAM = {"release": "rlogs", "container": "rlogs"}
+LOKI_RESULT = {
+    "status": "success",
+    "data": {
+        "resultType": "streams",
+        "result": [
+            {
+                "stream": LOKI_STREAM,
+                "values": [
+                    ["1738318500000000000", "GET /health 200"],
+                    ["1738318440000000000", "Listening on port 8000"],
+                ],
+            }
+        ],
+    },
+}
+
+
+class StubLokiHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        self.server.queries.append(parse_qs(url.query))
+
+        content = json.dumps(LOKI_RESULT).encode()
+        self.send_response(200 if url.path == "/loki/api/v1/query_range" else 404)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class GetLogsTestCase(TestCase):
+    """Test case for the async view of the logs of an app instance."""
+
+    def setUp(self):
+        self.user = User.objects.create_user("foo1", "foo@test.com", "bar")
+        self.project = Project.objects.create_project(name="test-logs", owner=self.user, description="")
+        self.app = Apps.objects.create(name="Custom App", slug="customapp")
+        self.app_instance = CustomAppInstance.objects.create(
+            owner=self.user,
+            name="test-logs",
+            app=self.app,
+            project=self.project,
+            subdomain=Subdomain.objects.create(subdomain="rlogs", project=self.project),
+        )
+        self.url = reverse(
+            "apps:logs", kwargs={"project": self.project.slug, "app_slug": "customapp", "app_id": self.app_instance.pk}
+        )
+
+        self.server = HTTPServer(("127.0.0.1", 0), StubLokiHandler)
+        self.server.queries = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        self.client.force_login(self.user)
+
+    def test_logs_are_fetched_from_loki(self):
+        with override_settings(LOKI_SVC=f"http://127.0.0.1:{self.server.server_port}"):
+            response = self.client.post(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        logs = response.json()["data"]
+        self.assertEqual([message for _, message in logs], ["Listening on port 8000", "GET /health 200"])
+        cursor = LogCursor.parse(response.json()["cursor"])
+        self.assertEqual(cursor.timestamp, 1738318500000000000)
+        self.assertEqual(cursor.digests, {log_line_digest(1738318500000000000, LOKI_STREAM, "GET /health 200")})
+        self.assertEqual(self.server.queries[0]["query"], ['{release="rlogs",container="rlogs"}'])
+        self.assertEqual(self.server.queries[0]["since"], ["24h"])
+
+    def test_new_logs_are_fetched_from_the_cursor(self):
+        cursor = time.time_ns() - 60 * 10**9
+
+        with override_settings(LOKI_SVC=f"http://127.0.0.1:{self.server.server_port}"):
+            response = self.client.post(self.url, {"cursor": str(cursor)})
+
+        self.assertEqual(response.status_code, 200)
+        query = self.server.queries[0]
+        self.assertEqual(query["start"], [str(cursor)])
+        self.assertEqual(query["direction"], ["forward"])
+        self.assertNotIn("since", query)
+
+    def test_cursor_is_limited_to_the_retention_of_the_logs(self):
+        with override_settings(LOKI_SVC=f"http://127.0.0.1:{self.server.server_port}"):
+            self.client.post(self.url, {"cursor": "1"})
+
+        self.assertGreater(int(self.server.queries[0]["start"][0]), time.time_ns() - 25 * 60 * 60 * 10**9)
+
+    def test_invalid_cursor_is_rejected(self):
+        with override_settings(LOKI_SVC=f"http://127.0.0.1:{self.server.server_port}"):
+            response = self.client.post(self.url, {"cursor": "yesterday"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.server.queries, [])
+
+    @patch.object(GetLogsStream, "max_duration", 0)
+    async def test_new_logs_are_streamed_as_events(self):
+        url = reverse(
+            "apps:logs_stream",
+            kwargs={"project": self.project.slug, "app_slug": "customapp", "app_id": self.app_instance.pk},
+        )
+        # The cursor is before the recorded log lines
+        cursor = 1738318400000000000
+        await self.async_client.aforce_login(self.user)
+
+        with override_settings(LOKI_SVC=f"http://127.0.0.1:{self.server.server_port}"):
+            response = await self.async_client.get(url, headers={"Last-Event-ID": str(cursor)})
+            content = b"".join([chunk async for chunk in response.streaming_content]).decode()
+
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertEqual(self.server.queries[0]["direction"], ["forward"])
+
+        events = content.split("\n\n")
+        self.assertEqual(events[0], "retry: 5000")
+        self.assertEqual(LogCursor.parse(events[1].split("\n")[0].removeprefix("id: ")).timestamp, 1738318500000000000)
+        lines = json.loads(events[1].split("\n")[1].removeprefix("data: "))
+        self.assertEqual([message for _, message in lines], ["GET /health 200", "Listening on port 8000"])
+
+    def test_new_logs_are_sent_as_a_single_batch_under_wsgi(self):
+        url = reverse(
+            "apps:logs_stream",
+            kwargs={"project": self.project.slug, "app_slug": "customapp", "app_id": self.app_instance.pk},
+        )
+
+        with override_settings(LOKI_SVC=f"http://127.0.0.1:{self.server.server_port}"):
+            response = self.client.get(url, {"cursor": "1738318400000000000"})
+            content = b"".join(response.streaming_content).decode()
+
+        # The browser reconnects after the retry interval to poll for the next batch
+        events = content.split("\n\n")
+        self.assertEqual(events[0], "retry: 5000")
+        self.assertTrue(events[1].startswith("id: 1738318500000000000:"))
+        self.assertEqual(len(self.server.queries), 1)
+
+    async def test_lines_of_other_streams_with_the_timestamp_of_the_cursor_are_not_lost(self):
+        other_stream = {"release": "rlogs", "container": "copy-to-pvc"}
+        timestamp = 1738318500000000000
+        result = {
+            "data": {
+                "result": [
+                    {"stream": LOKI_STREAM, "values": [[str(timestamp), "GET /health 200"]]},
+                    {
+                        "stream": other_stream,
+                        "values": [[str(timestamp), "Copied the data"], [str(timestamp + 1), "Copy done"]],
+                    },
+                ]
+            }
+        }
+        # The line of the first stream was fetched before the line of the other stream was ingested
+        cursor = LogCursor(timestamp, frozenset([log_line_digest(timestamp, LOKI_STREAM, "GET /health 200")]))
+
+        with override_settings(LOKI_SVC="http://loki"), patch("apps.views.get_json", AsyncMock(return_value=result)):
+            logs, cursor = await GetLogs().query_logs('{release="rlogs"}', cursor)
+
+        self.assertEqual([message for _, message in logs], ["Copied the data", "Copy done"])
+        self.assertEqual(
+            cursor, LogCursor(timestamp + 1, frozenset([log_line_digest(timestamp + 1, other_stream, "Copy done")]))
+        )
+
+    def test_invalid_cursor_digests_are_rejected(self):
+        for cursor in (
+            "1738318500000000000:not-a-digest",
+            "1738318500000000000:" + ".".join(f"{i:016x}" for i in range(101)),
+        ):
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(ValueError):
+                    LogCursor.parse(cursor)
+
+    def test_unreachable_loki_is_an_error(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+        with override_settings(LOKI_SVC=f"http://127.0.0.1:{self.server.server_port}"):
+            response = self.client.post(self.url)
+
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.json(), {"error": "Failed to retrieve logs from Loki"})
+
+    def test_logs_page_is_rendered(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "apps/logs.html")
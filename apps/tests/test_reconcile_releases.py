@@ -0,0 +1,129 @@
+import json
+import subprocess
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from projects.models import Project
+
+from ..models import Apps, BaseAppInstance, CustomAppInstance, Subdomain
+from ..tasks import reconcile_releases
+
+User = get_user_model()
+
+# Recorded output of helm list --namespace default --all --max 0 -o json
+HELM_LIST_OUTPUT = [
+    {
+        "name": "rrunning",
+        "namespace": "default",
+        "revision": "3",
+        "updated": "2025-01-31 10:15:00.123456789 +0000 UTC",
+        "status": "deployed",
+        "chart": "custom-app-1.1.3",
+        "app_version": "",
+    },
+    {
+        "name": "rdeleted",
+        "namespace": "default",
+        "revision": "1",
+        "updated": "2025-01-31 10:15:00.123456789 +0000 UTC",
+        "status": "deployed",
+        "chart": "custom-app-1.1.3",
+        "app_version": "",
+    },
+    {
+        "name": "rorphan",
+        "namespace": "default",
+        "revision": "1",
+        "updated": "2025-01-30 08:00:00.5 +0100 CET",
+        "status": "failed",
+        "chart": "custom-app-1.1.0",
+        "app_version": "",
+    },
+    {
+        "name": "serve",
+        "namespace": "default",
+        "revision": "42",
+        "updated": "2025-01-31 10:15:00.123456789 +0000 UTC",
+        "status": "deployed",
+        "chart": "serve-1.0.0",
+        "app_version": "1.0.0",
+    },
+]
+
+
+def stub_helm(helm_list_output):
+    def run(command, **kwargs):
+        assert command[:2] == ["helm", "list"]
+        return subprocess.CompletedProcess(command, 0, json.dumps(helm_list_output), "")
+
+    return run
+
+
+class ReconcileReleasesTestCase(TestCase):
+    """Test case for the bulk reconciliation of the Helm releases with the app instances."""
+
+    def setUp(self):
+        self.user = User.objects.create_user("foo1", "foo@test.com", "bar")
+        self.project = Project.objects.create_project(name="test-reconcile", owner=self.user, description="")
+        self.app = Apps.objects.create(
+            name="Custom App", slug="customapp", chart="ghcr.io/scilifelabdatacentre/serve-charts/custom-app:1.1.3"
+        )
+
+        self.running = self.create_app_instance("rrunning")
+        self.missing = self.create_app_instance("rmissing")
+        self.deleted = self.create_app_instance("rdeleted", latest_user_action="Deleting")
+        BaseAppInstance.objects.update(updated_on=timezone.now() - timedelta(days=1))
+
+    def create_app_instance(self, release, latest_user_action="Created"):
+        return CustomAppInstance.objects.create(
+            owner=self.user,
+            name=release,
+            app=self.app,
+            project=self.project,
+            chart=self.app.chart,
+            subdomain=Subdomain.objects.create(subdomain=release),
+            k8s_values={"subdomain": release, "namespace": "default"},
+            latest_user_action=latest_user_action,
+        )
+
+    def reconcile(self, dry_run=False, helm_list_output=HELM_LIST_OUTPUT):
+        with patch("apps.tasks.subprocess.run", side_effect=stub_helm(helm_list_output)), patch(
+            "apps.tasks.helm_delete", return_value=("uninstalled", None)
+        ) as mock_delete, patch("apps.tasks.queue_deploy_resource") as mock_deploy:
+            report = reconcile_releases(dry_run=dry_run)
+        return report, mock_delete, mock_deploy
+
+    def test_drift_is_fixed_in_both_directions(self):
+        report, mock_delete, mock_deploy = self.reconcile()
+
+        self.assertEqual(report["releases"], 4)
+        self.assertEqual(report["orphan_releases"], ["rdeleted", "rorphan"])
+        self.assertEqual(report["deleted_orphan_releases"], ["rdeleted", "rorphan"])
+        self.assertEqual(report["missing_releases"], ["rmissing"])
+
+        # The release of Serve itself is not an app release
+        self.assertCountEqual([c.args[0] for c in mock_delete.call_args_list], ["rdeleted", "rorphan"])
+        mock_deploy.assert_called_once()
+        self.assertEqual(mock_deploy.call_args.args[0].pk, self.missing.pk)
+        self.assertTrue(mock_deploy.call_args.kwargs["force"])
+
+    def test_dry_run_changes_nothing(self):
+        report, mock_delete, mock_deploy = self.reconcile(dry_run=True)
+
+        self.assertEqual(report["orphan_releases"], ["rdeleted", "rorphan"])
+        self.assertEqual(report["missing_releases"], ["rmissing"])
+        mock_delete.assert_not_called()
+        mock_deploy.assert_not_called()
+
+    def test_recent_changes_are_not_reconciled(self):
+        CustomAppInstance.objects.filter(pk=self.missing.pk).update(updated_on=timezone.now())
+        recent = dict(HELM_LIST_OUTPUT[2], updated=timezone.now().strftime("%Y-%m-%d %H:%M:%S.000 +0000 UTC"))
+
+        report, _, _ = self.reconcile(helm_list_output=HELM_LIST_OUTPUT[:2] + [recent])
+
+        self.assertEqual(report["orphan_releases"], ["rdeleted"])
+        self.assertEqual(report["missing_releases"], [])
@@ -0,0 +1,192 @@
+import json
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest.mock import patch
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.test import override_settings
+
+from apps.helpers import validate_ghcr_image
+from apps.validators.container_images import (
+    DockerHubAuthenticator,
+    ImageArchitectureTuple,
+    get_image_architectures,
+    get_manifest_digest,
+    get_registry_client,
+)
+
+MANIFEST_DIGEST = "sha256:" + "a" * 64
+CONFIG_DIGEST = "sha256:" + "b" * 64
+
+SINGLE_PLATFORM_MANIFEST = {
+    "schemaVersion": 2,
+    "mediaType": "application/vnd.docker.distribution.manifest.v2+json",
+    "config": {"mediaType": "application/vnd.docker.container.image.v1+json", "digest": CONFIG_DIGEST},
+    "layers": [],
+}
+
+
+class StubRegistryHandler(BaseHTTPRequestHandler):
+    """A local registry serving a single-platform image and its bearer tokens."""
+
+    def do_GET(self):
+        self.server.requests[self.path.split("?")[0]] += 1
+
+        if self.path.startswith("/token"):
+            return self.send_json({"token": "stub-token", "expires_in": 300})
+
+        if self.headers.get("Authorization") != "Bearer stub-token":
+            return self.send_json({"errors": [{"code": "UNAUTHORIZED"}]}, status=401)
+
+        if self.path in ("/v2/test/image/manifests/latest", f"/v2/test/image/manifests/{MANIFEST_DIGEST}"):
+            return self.send_json(SINGLE_PLATFORM_MANIFEST, headers={"Docker-Content-Digest": MANIFEST_DIGEST})
+
+        if self.path == f"/v2/test/image/blobs/{CONFIG_DIGEST}":
+            return self.send_json({"architecture": "amd64", "os": "linux"})
+
+        return self.send_json({"errors": [{"code": "MANIFEST_UNKNOWN"}]}, status=404)
+
+    def do_HEAD(self):
+        self.server.requests[f"HEAD {self.path}"] += 1
+
+        if self.headers.get("Authorization") != "Bearer stub-token":
+            return self.send_json({}, status=401, body=False)
+
+        if self.path == "/v2/test/image/manifests/latest":
+            return self.send_json({}, headers={"Docker-Content-Digest": MANIFEST_DIGEST}, body=False)
+
+        return self.send_json({}, status=404, body=False)
+
+    def send_json(self, data, status=200, headers=None, body=True):
+        content = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if body:
+            self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubRegistryAuthenticator(DockerHubAuthenticator):
+    def __init__(self, registry: str) -> None:
+        super().__init__(None, None)
+        self._registry = registry
+
+    def get_token_service_url(self, repo: str) -> str:
+        return f"{self._registry}/token?service=stub&scope=repository:{repo}:pull"
+
+
+@pytest.fixture
+def stub_registry():
+    server = HTTPServer(("127.0.0.1", 0), StubRegistryHandler)
+    server.requests = Counter()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    get_registry_client().clear()
+
+    yield server, f"http://127.0.0.1:{server.server_port}"
+
+    server.shutdown()
+    server.server_close()
+    get_registry_client().clear()
+
+
+def test_bearer_token_is_reused(stub_registry):
+    server, registry = stub_registry
+    auth = StubRegistryAuthenticator(registry)
+
+    architectures = get_image_architectures(auth=auth, repo="test/image", reference="latest", registry=registry)
+
+    assert architectures == [ImageArchitectureTuple(os="linux", arch="amd64")]
+    assert server.requests["/token"] == 1
+    assert server.requests["/v2/test/image/manifests/latest"] == 1
+    assert server.requests[f"/v2/test/image/blobs/{CONFIG_DIGEST}"] == 1
+
+
+def test_architectures_are_cached_by_digest(stub_registry):
+    server, registry = stub_registry
+    auth = StubRegistryAuthenticator(registry)
+
+    for _ in range(3):
+        get_image_architectures(auth=auth, repo="test/image", reference="latest", registry=registry)
+
+    # The tag resolves to the cached digest until the tag digest expires
+    assert server.requests["/v2/test/image/manifests/latest"] == 1
+    assert server.requests[f"/v2/test/image/blobs/{CONFIG_DIGEST}"] == 1
+
+    client = get_registry_client()
+    client._tag_digests.clear()
+    get_image_architectures(auth=auth, repo="test/image", reference="latest", registry=registry)
+
+    # The tag is mutable so its manifest is fetched again, but the config blob of the digest is not
+    assert server.requests["/v2/test/image/manifests/latest"] == 2
+    assert server.requests[f"/v2/test/image/blobs/{CONFIG_DIGEST}"] == 1
+    assert server.requests["/token"] == 1
+
+
+def test_digest_reference_is_fetched_once(stub_registry):
+    server, registry = stub_registry
+    auth = StubRegistryAuthenticator(registry)
+
+    for _ in range(2):
+        architectures = get_image_architectures(
+            auth=auth, repo="test/image", reference=MANIFEST_DIGEST, registry=registry
+        )
+
+    assert architectures == [ImageArchitectureTuple(os="linux", arch="amd64")]
+    assert server.requests[f"/v2/test/image/manifests/{MANIFEST_DIGEST}"] == 1
+    assert sum(server.requests.values()) == 3
+
+
+def test_missing_image_returns_no_architectures(stub_registry):
+    _, registry = stub_registry
+    auth = StubRegistryAuthenticator(registry)
+
+    assert get_image_architectures(auth=auth, repo="test/missing", reference="latest", registry=registry) == []
+
+
+def test_manifest_digest_is_resolved_with_head(stub_registry):
+    server, registry = stub_registry
+    auth = StubRegistryAuthenticator(registry)
+
+    for _ in range(2):
+        digest = get_manifest_digest(registry_auth=auth, repository="test/image", reference="latest", registry=registry)
+
+    assert digest == MANIFEST_DIGEST
+    assert server.requests["HEAD /v2/test/image/manifests/latest"] == 1
+
+    # The architecture check shares the resolved digest
+    get_image_architectures(auth=auth, repo="test/image", reference="latest", registry=registry)
+    assert server.requests["/v2/test/image/manifests/latest"] == 0
+    assert server.requests[f"/v2/test/image/manifests/{MANIFEST_DIGEST}"] == 1
+    assert server.requests["/token"] == 1
+
+    assert (
+        get_manifest_digest(registry_auth=auth, repository="test/missing", reference="latest", registry=registry)
+        is None
+    )
+
+
+@override_settings(GITHUB_API_USERNAME=None, GITHUB_API_TOKEN=None)
+def test_validate_ghcr_image_checks_the_resolved_digest():
+    with patch("apps.helpers.get_manifest_digest", return_value=MANIFEST_DIGEST) as mock_digest, patch(
+        "apps.helpers.waffle.switch_is_active", return_value=True
+    ), patch(
+        "apps.helpers.get_image_architectures", return_value=[ImageArchitectureTuple(os="linux", arch="amd64")]
+    ) as mock_architectures:
+        assert validate_ghcr_image("ghcr.io/test/image:latest") == "ghcr.io/test/image:latest"
+
+    assert mock_digest.call_args.kwargs["repository"] == "test/image"
+    assert mock_digest.call_args.kwargs["reference"] == "latest"
+    assert mock_architectures.call_args.kwargs["reference"] == MANIFEST_DIGEST
+
+    with patch("apps.helpers.get_manifest_digest", return_value=None):
+        with pytest.raises(ValidationError, match="Tag 'latest' not found"):
+            validate_ghcr_image("ghcr.io/test/image:latest")
@@ -0,0 +1,269 @@
+import subprocess
+from datetime import timedelta
+from unittest.mock import call, patch
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from projects.models import Project
+from studio.celery import app
+
+from ..constants import AppActionOrigin
+from ..models import Apps, CustomAppInstance, ReleaseOperation, Subdomain
+from ..tasks import (
+    get_helm_timeout,
+    helm_delete,
+    helm_install,
+    queue_delete_resource,
+    queue_deploy_resource,
+    run_release_operations,
+)
+from ..types_.chart_cache import parse_chart_reference
+
+User = get_user_model()
+
+RELEASE = "test-release-queue"
+
+
+class ReleaseOperationQueueTestCase(TestCase):
+    """Test case for the per-release queue of Helm deploy and delete operations."""
+
+    def setUp(self):
+        self.user = User.objects.create_user("foo1", "foo@test.com", "bar")
+        self.project = Project.objects.create_project(name="test-release-queue", owner=self.user, description="")
+        self.app = Apps.objects.create(name="Custom App", slug="customapp")
+        self.app_instance = CustomAppInstance.objects.create(
+            owner=self.user,
+            name="test-release-queue",
+            app=self.app,
+            project=self.project,
+            chart="charts/customapp",
+            subdomain=Subdomain.objects.create(subdomain=RELEASE),
+            k8s_values={"subdomain": RELEASE, "namespace": "default"},
+        )
+
+    def enqueue(self, operation, initiated_by=None):
+        return ReleaseOperation.objects.enqueue(RELEASE, operation, self.app_instance, initiated_by)
+
+    def test_pending_deploys_are_coalesced(self):
+        first, is_new_first = self.enqueue(ReleaseOperation.DEPLOY)
+        second, is_new_second = self.enqueue(ReleaseOperation.DEPLOY)
+
+        self.assertTrue(is_new_first)
+        self.assertFalse(is_new_second)
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(ReleaseOperation.objects.count(), 1)
+        self.assertEqual(ReleaseOperation.objects.get().n_requests, 2)
+
+    def test_coalesced_deploy_is_forced_if_any_deploy_is_forced(self):
+        ReleaseOperation.objects.enqueue(RELEASE, ReleaseOperation.DEPLOY, self.app_instance, force=True)
+        self.enqueue(ReleaseOperation.DEPLOY)
+
+        self.assertTrue(ReleaseOperation.objects.get().force)
+
+    def test_delete_supersedes_pending_deploys(self):
+        self.enqueue(ReleaseOperation.DEPLOY)
+        self.enqueue(ReleaseOperation.DEPLOY)
+        self.enqueue(ReleaseOperation.DELETE, AppActionOrigin.USER.value)
+
+        operation = ReleaseOperation.objects.get()
+        self.assertEqual(operation.operation, ReleaseOperation.DELETE)
+        self.assertEqual(operation.initiated_by, AppActionOrigin.USER.value)
+        self.assertEqual(operation.n_requests, 3)
+
+    def test_started_operation_is_not_coalesced(self):
+        self.enqueue(ReleaseOperation.DEPLOY)
+        running = ReleaseOperation.objects.claim_next()
+
+        _, is_new = self.enqueue(ReleaseOperation.DEPLOY)
+
+        self.assertTrue(is_new)
+        self.assertEqual(ReleaseOperation.objects.filter(started_on__isnull=True).count(), 1)
+        self.assertIsNotNone(ReleaseOperation.objects.get(pk=running.pk).started_on)
+
+    def test_operations_of_a_release_are_serialised(self):
+        self.enqueue(ReleaseOperation.DEPLOY)
+        running = ReleaseOperation.objects.claim_next()
+        self.enqueue(ReleaseOperation.DELETE, AppActionOrigin.USER.value)
+
+        # The delete waits for the running deploy
+        self.assertIsNone(ReleaseOperation.objects.claim_next())
+
+        running.delete()
+
+        self.assertEqual(ReleaseOperation.objects.claim_next().operation, ReleaseOperation.DELETE)
+
+    def test_abandoned_operation_is_removed(self):
+        self.enqueue(ReleaseOperation.DEPLOY)
+        ReleaseOperation.objects.update(started_on=timezone.now() - timedelta(hours=1))
+        self.enqueue(ReleaseOperation.DELETE, AppActionOrigin.USER.value)
+
+        self.assertEqual(ReleaseOperation.objects.claim_next().operation, ReleaseOperation.DELETE)
+        self.assertEqual(ReleaseOperation.objects.count(), 1)
+
+    def test_helm_commands_are_killed_before_the_operation_is_abandoned(self):
+        self.assertLess(get_helm_timeout(), settings.RELEASE_OPERATION_STALE_AFTER)
+
+        with patch("apps.tasks.subprocess.run") as mock_run:
+            helm_install(RELEASE, "charts/customapp", values="")
+            helm_delete(RELEASE)
+
+        for command_call in mock_run.call_args_list:
+            command = command_call.args[0]
+            self.assertEqual(command[command.index("--timeout") + 1], f"{settings.HELM_TIMEOUT}s")
+            self.assertEqual(command_call.kwargs["timeout"], get_helm_timeout())
+
+    def test_helm_command_that_times_out_fails(self):
+        with patch("apps.tasks.subprocess.run", side_effect=subprocess.TimeoutExpired("helm", get_helm_timeout())):
+            output, error = helm_delete(RELEASE)
+
+        self.assertIsNone(output)
+        self.assertIn("timed out", error)
+
+    def test_get_queue_depth(self):
+        self.assertEqual(
+            ReleaseOperation.objects.get_queue_depth(),
+            {"pending": 0, "running": 0, "releases": 0, "pending_user": 0, "pending_system": 0, "max_wait_seconds": 0},
+        )
+
+        self.enqueue(ReleaseOperation.DEPLOY)
+        ReleaseOperation.objects.claim_next()
+        self.enqueue(ReleaseOperation.DEPLOY)
+
+        ReleaseOperation.objects.update(created_on=timezone.now() - timedelta(minutes=1))
+
+        depth = ReleaseOperation.objects.get_queue_depth()
+        self.assertEqual(
+            {k: v for k, v in depth.items() if k != "max_wait_seconds"},
+            {"pending": 1, "running": 1, "releases": 1, "pending_user": 1, "pending_system": 0},
+        )
+        self.assertGreaterEqual(depth["max_wait_seconds"], 60)
+
+    def test_queue_deploy_resource_starts_processing_once(self):
+        with patch("apps.tasks.run_release_operations.delay") as mock_process:
+            with self.captureOnCommitCallbacks(execute=True):
+                queue_deploy_resource(self.app_instance)
+                queue_deploy_resource(self.app_instance)
+
+        mock_process.assert_called_once_with()
+        self.assertEqual(ReleaseOperation.objects.get().n_requests, 2)
+
+    @patch("apps.tasks.delete_resource")
+    @patch("apps.tasks.deploy_resource")
+    def test_run_release_operations_runs_operations_in_order(self, mock_deploy, mock_delete):
+        order = []
+        mock_deploy.side_effect = lambda *args: order.append("deploy")
+        mock_delete.side_effect = lambda *args: order.append("delete")
+
+        with patch("apps.tasks.run_release_operations.delay"):
+            queue_deploy_resource(self.app_instance)
+            ReleaseOperation.objects.claim_next()
+            # Queued while the deploy is running
+            queue_delete_resource(self.app_instance, AppActionOrigin.USER.value)
+            ReleaseOperation.objects.filter(started_on__isnull=False).update(started_on=None)
+
+        run_release_operations()
+
+        self.assertEqual(order, ["deploy", "delete"])
+        mock_delete.assert_has_calls([call(self.app_instance.serialize(), AppActionOrigin.USER.value, RELEASE)])
+        self.assertFalse(ReleaseOperation.objects.exists())
+
+
+class ReleaseOperationSchedulerTestCase(TestCase):
+    """Test case for the fair-share scheduling of the release operations of all releases."""
+
+    def setUp(self):
+        self.user = User.objects.create_user("foo1", "foo@test.com", "bar")
+        self.app = Apps.objects.create(name="Custom App", slug="customapp")
+        self.course = Project.objects.create_project(name="test-course", owner=self.user, description="")
+        self.other = Project.objects.create_project(name="test-other", owner=self.user, description="")
+
+        app.conf.task_always_eager = True
+        app.conf.task_eager_propagates = True
+        self.addCleanup(setattr, app.conf, "task_always_eager", False)
+        self.addCleanup(setattr, app.conf, "task_eager_propagates", False)
+
+    def create_app_instance(self, project, release):
+        return CustomAppInstance.objects.create(
+            owner=self.user,
+            name=release,
+            app=self.app,
+            project=project,
+            chart="charts/customapp",
+            subdomain=Subdomain.objects.create(subdomain=release),
+            k8s_values={"subdomain": release, "namespace": "default"},
+        )
+
+    def enqueue_deploy(self, project, release):
+        app_instance = self.create_app_instance(project, release)
+        ReleaseOperation.objects.enqueue(release, ReleaseOperation.DEPLOY, app_instance)
+        return app_instance
+
+    def test_projects_share_the_helm_concurrency(self):
+        for i in range(5):
+            self.enqueue_deploy(self.course, f"test-course-{i}")
+        self.enqueue_deploy(self.other, "test-other-0")
+
+        first = ReleaseOperation.objects.claim_next()
+        second = ReleaseOperation.objects.claim_next()
+
+        self.assertEqual(first.release, "test-course-0")
+        # The other project goes before the remaining operations of the course
+        self.assertEqual(second.release, "test-other-0")
+
+    def test_user_queue_goes_before_system_queue(self):
+        expired = self.create_app_instance(self.other, "test-other-expired")
+        ReleaseOperation.objects.enqueue(
+            "test-other-expired", ReleaseOperation.DELETE, expired, AppActionOrigin.SYSTEM.value
+        )
+        self.enqueue_deploy(self.course, "test-course-0")
+
+        self.assertEqual(ReleaseOperation.objects.claim_next().release, "test-course-0")
+        self.assertEqual(ReleaseOperation.objects.claim_next().queue, ReleaseOperation.SYSTEM_QUEUE)
+
+    def test_claim_cost_does_not_grow_with_the_backlog(self):
+        def count_claim_queries():
+            with CaptureQueriesContext(connection) as queries:
+                self.assertIsNotNone(ReleaseOperation.objects.claim_next())
+            return len(queries)
+
+        self.enqueue_deploy(self.course, "test-course-0")
+        n_queries = count_claim_queries()
+
+        for i in range(1, 20):
+            self.enqueue_deploy(self.course, f"test-course-{i}")
+
+        self.assertEqual(count_claim_queries(), n_queries)
+
+    @override_settings(HELM_CONCURRENCY_LIMIT=2)
+    def test_helm_concurrency_is_capped(self):
+        for i in range(3):
+            self.enqueue_deploy(self.course, f"test-course-{i}")
+
+        self.assertIsNotNone(ReleaseOperation.objects.claim_next())
+        self.assertIsNotNone(ReleaseOperation.objects.claim_next())
+        self.assertIsNone(ReleaseOperation.objects.claim_next())
+
+    def test_burst_of_deploys_is_run_with_a_stub_helm(self):
+        deployed = []
+
+        def stub_helm_install(release_name, chart, namespace="default", values_file=None, version=None, values=None):
+            deployed.append(release_name)
+            return "deployed", None
+
+        app_instances = []
+        with patch("apps.tasks.helm_install", side_effect=stub_helm_install), patch(
+            "apps.tasks.get_chart_cache"
+        ) as mock_chart_cache:
+            mock_chart_cache.return_value.resolve.side_effect = parse_chart_reference
+            with self.captureOnCommitCallbacks(execute=True):
+                for i in range(3):
+                    app_instances.append(self.create_app_instance(self.course, f"test-course-{i}"))
+                    queue_deploy_resource(app_instances[-1])
+
+        self.assertEqual(deployed, ["test-course-0", "test-course-1", "test-course-2"])
+        self.assertFalse(ReleaseOperation.objects.exists())
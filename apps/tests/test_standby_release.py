@@ -0,0 +1,143 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from projects.models import Environment, Flavor, Project, ProjectTemplate
+
+from ..app_registry import APP_REGISTRY
+from ..helpers import create_instance_from_form
+from ..models import Apps, JupyterInstance, ReleaseOperation, StandbyRelease, Subdomain
+from ..tasks import (
+    delete_standby_releases,
+    deploy_standby_release,
+    refill_standby_pools,
+)
+from ..types_.chart_cache import parse_chart_reference
+from ..types_.subdomain import SubdomainCandidateName
+
+User = get_user_model()
+
+
+class StandbyReleasePoolTestCase(TestCase):
+    """Test case for the warm pools of pre-installed JupyterLab releases."""
+
+    def setUp(self):
+        self.user = User.objects.create_user("foo1", "foo@test.com", "bar")
+        self.template = ProjectTemplate.objects.create(name="Course", slug="course", standby_pool_size=2)
+        self.project = Project.objects.create_project(
+            name="test-standby", owner=self.user, description="", project_template=self.template
+        )
+        self.app = Apps.objects.create(name="Jupyter Lab", slug="jupyter-lab", chart="charts/lab")
+        self.flavor = Flavor.objects.create(name="flavor", project=self.project)
+        self.environment = Environment.objects.create(
+            name="Jupyter", image="jupyter/minimal-notebook:latest", app=self.app, project=self.project
+        )
+
+    def add_standby_release(self, status=StandbyRelease.READY, subdomain="rstandby1"):
+        return StandbyRelease.objects.create(
+            project=self.project,
+            flavor=self.flavor,
+            environment=self.environment,
+            subdomain=Subdomain.objects.create(subdomain=subdomain, project=self.project),
+            status=status,
+        )
+
+    def refill(self):
+        with patch("apps.tasks.deploy_standby_release.delay") as mock_deploy, patch(
+            "apps.tasks.delete_standby_release.delay"
+        ) as mock_delete:
+            with self.captureOnCommitCallbacks(execute=True):
+                refill_standby_pools()
+        return mock_deploy, mock_delete
+
+    def test_refill_deploys_the_missing_standby_releases(self):
+        self.add_standby_release()
+
+        mock_deploy, _ = self.refill()
+
+        self.assertEqual(StandbyRelease.objects.filter(project=self.project).count(), 2)
+        mock_deploy.assert_called_once_with(StandbyRelease.objects.get(status=StandbyRelease.DEPLOYING).pk)
+
+    def test_refill_replaces_failed_and_removes_surplus_standby_releases(self):
+        failed = self.add_standby_release(StandbyRelease.FAILED, "rfailed1")
+        self.template.standby_pool_size = 0
+        self.template.save()
+        ready = self.add_standby_release()
+
+        mock_deploy, mock_delete = self.refill()
+
+        mock_deploy.assert_not_called()
+        self.assertCountEqual([c.args[0] for c in mock_delete.call_args_list], [failed.pk, ready.pk])
+
+    @override_settings(STANDBY_POOL_DEPLOY_LIMIT=1)
+    def test_refill_deploys_at_most_the_limit(self):
+        mock_deploy, _ = self.refill()
+        self.assertEqual(mock_deploy.call_count, 1)
+
+        # The deploying standby release counts against the limit
+        mock_deploy, _ = self.refill()
+        mock_deploy.assert_not_called()
+        self.assertEqual(StandbyRelease.objects.count(), 1)
+
+    @override_settings(HELM_CONCURRENCY_LIMIT=1)
+    def test_refill_waits_for_the_queued_release_operations(self):
+        user_app = Apps.objects.create(name="Custom App", slug="customapp")
+        app_instance = JupyterInstance.objects.create(
+            owner=self.user, name="test-queued", app=user_app, project=self.project
+        )
+        ReleaseOperation.objects.enqueue("rqueued", ReleaseOperation.DEPLOY, app_instance)
+
+        mock_deploy, _ = self.refill()
+
+        mock_deploy.assert_not_called()
+        self.assertFalse(StandbyRelease.objects.exists())
+
+    def test_standby_releases_of_a_project_are_deleted_in_the_background(self):
+        standby_release = self.add_standby_release()
+
+        with patch("apps.tasks.delete_standby_release.delay") as mock_delete, patch(
+            "apps.tasks.helm_delete"
+        ) as mock_helm:
+            delete_standby_releases(self.project)
+
+        mock_delete.assert_called_once_with(standby_release.pk)
+        mock_helm.assert_not_called()
+
+    def test_deploy_standby_release_installs_the_release(self):
+        standby_release = self.add_standby_release(StandbyRelease.DEPLOYING)
+
+        with patch("apps.tasks.helm_install", return_value=("deployed", None)) as mock_helm, patch(
+            "apps.tasks.get_chart_cache"
+        ) as mock_chart_cache:
+            mock_chart_cache.return_value.resolve.side_effect = parse_chart_reference
+            self.assertTrue(deploy_standby_release(standby_release.pk))
+
+        self.assertEqual(mock_helm.call_args.args[0], "rstandby1")
+        standby_release.refresh_from_db()
+        self.assertEqual(standby_release.status, StandbyRelease.READY)
+
+    def test_new_jupyter_instance_takes_over_a_standby_release(self):
+        self.add_standby_release()
+
+        data = {
+            "name": "test-standby-lab",
+            "flavor": str(self.flavor.pk),
+            "access": "project",
+            "environment": str(self.environment.pk),
+        }
+        form = APP_REGISTRY.get_form_class("jupyter-lab")(data, project_pk=self.project.pk)
+        self.assertTrue(form.is_valid(), f"The form should be valid but has errors: {form.errors}")
+
+        with patch("apps.tasks.queue_deploy_resource") as mock_deploy:
+            instance_id = create_instance_from_form(form, self.project, "jupyter-lab")
+
+        instance = JupyterInstance.objects.get(pk=instance_id)
+        self.assertEqual(instance.subdomain.subdomain, "rstandby1")
+        self.assertFalse(StandbyRelease.objects.exists())
+        mock_deploy.assert_called_once()
+
+    def test_standby_release_subdomain_is_not_available(self):
+        self.add_standby_release()
+
+        self.assertFalse(SubdomainCandidateName("rstandby1", self.project.pk).is_available())
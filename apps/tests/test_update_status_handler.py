@@ -1,18 +1,29 @@
 import concurrent.futures
 import time
 from datetime import datetime, timedelta
+from unittest.mock import patch
 
 import pytest
 import pytz
+import redis
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import connection
 from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 
 from projects.models import Project
 
 from ..constants import HandleUpdateStatusResponseCode
-from ..helpers import handle_update_status_request
+from ..helpers import (
+    flush_buffered_status_times,
+    handle_bulk_update_status_request,
+    handle_update_status_request,
+)
 from ..models import AppCategories, Apps, JupyterInstance, K8sUserAppStatus, Subdomain
+from ..types_.status_event import K8sStatusEvent
+from ..types_.status_write_buffer import BufferedStatus, K8sStatusWriteBuffer
 
 utc = pytz.UTC
 
@@ -172,6 +183,322 @@ class UpdateAppStatusTestCase(TestCase):
         assert actual_k8suser_appstatus.time == newer_ts
 
 
+class BulkUpdateAppStatusTestCase(TestCase):
+    """Test case for batches of status events operating on existing app instances."""
+
+    RELEASE_WITH_STATUS = "test-release-with-status"
+    RELEASE_WITHOUT_STATUS = "test-release-without-status"
+    INITIAL_STATUS = "Unknown"
+    INITIAL_EVENT_TS = utc.localize(datetime.now())
+
+    def setUp(self) -> None:
+        self.user = User.objects.create_user(test_user["username"], test_user["email"], test_user["password"])
+        self.category = AppCategories.objects.create(name="Network", priority=100, slug="network")
+        self.app = Apps.objects.create(
+            name="Jupyter Lab",
+            slug="jupyter-lab",
+            user_can_edit=False,
+            category=self.category,
+        )
+
+        self.project = Project.objects.create_project(name="test-perm-get_status", owner=self.user, description="")
+
+        k8s_user_app_status = K8sUserAppStatus.objects.create(status=self.INITIAL_STATUS)
+        k8s_user_app_status.time = self.INITIAL_EVENT_TS
+        k8s_user_app_status.save()
+
+        for release, status_object in [
+            (self.RELEASE_WITH_STATUS, k8s_user_app_status),
+            (self.RELEASE_WITHOUT_STATUS, None),
+        ]:
+            JupyterInstance.objects.create(
+                access="private",
+                owner=self.user,
+                name=f"app_{release}",
+                app=self.app,
+                project=self.project,
+                subdomain=Subdomain.objects.create(subdomain=release),
+                k8s_user_app_status=status_object,
+            )
+
+    def get_status_object(self, release):
+        return JupyterInstance.objects.get(subdomain__subdomain=release).k8s_user_app_status
+
+    def test_handle_empty_batch(self):
+        assert handle_bulk_update_status_request([]) == []
+
+    def test_handle_batch_should_return_per_event_codes(self):
+        ts = self.INITIAL_EVENT_TS
+        events = [
+            K8sStatusEvent(self.RELEASE_WITH_STATUS, "PodInitializing", ts - timedelta(seconds=1)),
+            K8sStatusEvent(self.RELEASE_WITH_STATUS, self.INITIAL_STATUS, ts + timedelta(seconds=1)),
+            K8sStatusEvent(self.RELEASE_WITH_STATUS, "Running", ts + timedelta(seconds=2), {"pod-msg": "ok"}),
+            K8sStatusEvent(self.RELEASE_WITHOUT_STATUS, "PodInitializing", ts + timedelta(seconds=1)),
+            K8sStatusEvent(self.RELEASE_WITHOUT_STATUS, "PodInitializing", ts + timedelta(seconds=3)),
+            K8sStatusEvent("non-existing-app-release", "Running", ts),
+        ]
+
+        actual = handle_bulk_update_status_request(events)
+
+        assert actual == [
+            HandleUpdateStatusResponseCode.NO_ACTION,
+            HandleUpdateStatusResponseCode.UPDATED_TIME_OF_STATUS,
+            HandleUpdateStatusResponseCode.UPDATED_STATUS,
+            HandleUpdateStatusResponseCode.CREATED_FIRST_STATUS,
+            HandleUpdateStatusResponseCode.UPDATED_TIME_OF_STATUS,
+            HandleUpdateStatusResponseCode.OBJECT_NOT_FOUND,
+        ]
+
+        status_object = self.get_status_object(self.RELEASE_WITH_STATUS)
+        assert status_object.status == "Running"
+        assert status_object.time == ts + timedelta(seconds=2)
+        assert status_object.info == {"pod-msg": "ok"}
+
+        status_object = self.get_status_object(self.RELEASE_WITHOUT_STATUS)
+        assert status_object.status == "PodInitializing"
+        assert status_object.time == ts + timedelta(seconds=3)
+
+    def test_handle_batch_should_match_single_event_handling(self):
+        """The result of a batch should be the same as submitting the events one at a time."""
+        ts = self.INITIAL_EVENT_TS
+        events = [
+            K8sStatusEvent(self.RELEASE_WITH_STATUS, "Running", ts + timedelta(seconds=2)),
+            K8sStatusEvent(self.RELEASE_WITH_STATUS, "PodInitializing", ts + timedelta(seconds=1)),
+            K8sStatusEvent(self.RELEASE_WITHOUT_STATUS, "Running", ts + timedelta(seconds=1)),
+        ]
+
+        actual = handle_bulk_update_status_request(events)
+        actual_state = [
+            (status_object.status, status_object.time)
+            for status_object in map(self.get_status_object, [self.RELEASE_WITH_STATUS, self.RELEASE_WITHOUT_STATUS])
+        ]
+
+        # Reset the statuses and handle the same events one at a time
+        instance = JupyterInstance.objects.get(subdomain__subdomain=self.RELEASE_WITHOUT_STATUS)
+        instance.k8s_user_app_status = None
+        instance.save(update_fields=["k8s_user_app_status"])
+        K8sUserAppStatus.objects.filter(pk=self.get_status_object(self.RELEASE_WITH_STATUS).pk).update(
+            status=self.INITIAL_STATUS, time=self.INITIAL_EVENT_TS
+        )
+
+        expected = [handle_update_status_request(*event) for event in events]
+        expected_state = [
+            (status_object.status, status_object.time)
+            for status_object in map(self.get_status_object, [self.RELEASE_WITH_STATUS, self.RELEASE_WITHOUT_STATUS])
+        ]
+
+        assert actual == expected
+        assert actual_state == expected_state
+
+
+class UpdateAppStatusQueryCountTestCase(TestCase):
+    """
+    Regression benchmark of the number of database queries per status event.
+    The counts include the savepoint and release statements of the transaction.
+    """
+
+    RELEASE = "test-release-query-count"
+    INITIAL_STATUS = "ContainerCreating"
+    INITIAL_EVENT_TS = utc.localize(datetime.now())
+
+    def setUp(self) -> None:
+        self.user = User.objects.create_user(test_user["username"], test_user["email"], test_user["password"])
+        self.category = AppCategories.objects.create(name="Network", priority=100, slug="network")
+        self.app = Apps.objects.create(name="Jupyter Lab", slug="jupyter-lab", category=self.category)
+        self.project = Project.objects.create_project(name="test-perm-get_status", owner=self.user, description="")
+
+        self.app_instance = JupyterInstance.objects.create(
+            access="private",
+            owner=self.user,
+            name="app_query_count",
+            app=self.app,
+            project=self.project,
+            subdomain=Subdomain.objects.create(subdomain=self.RELEASE),
+        )
+
+    def get_status_object(self):
+        return JupyterInstance.objects.get(pk=self.app_instance.pk).k8s_user_app_status
+
+    def test_query_count_per_event(self):
+        ts = self.INITIAL_EVENT_TS
+        events = [
+            (self.INITIAL_STATUS, ts, HandleUpdateStatusResponseCode.CREATED_FIRST_STATUS, 4),
+            (self.INITIAL_STATUS, ts - timedelta(seconds=1), HandleUpdateStatusResponseCode.NO_ACTION, 3),
+            (self.INITIAL_STATUS, ts + timedelta(seconds=1), HandleUpdateStatusResponseCode.UPDATED_TIME_OF_STATUS, 4),
+            ("Running", ts + timedelta(seconds=2), HandleUpdateStatusResponseCode.UPDATED_STATUS, 4),
+        ]
+
+        for new_status, event_ts, expected_result, expected_n_queries in events:
+            with self.subTest(result=expected_result.name), self.assertNumQueries(expected_n_queries):
+                actual = handle_update_status_request(self.RELEASE, new_status, event_ts, {"pod-msg": new_status})
+
+            assert actual == expected_result
+
+        with self.assertNumQueries(3):
+            actual = handle_update_status_request("non-existing-app-release", "Running", ts)
+
+        assert actual == HandleUpdateStatusResponseCode.OBJECT_NOT_FOUND
+
+    def test_first_status_should_store_the_event_time(self):
+        ts = utc.localize(datetime(2024, 1, 25, 16, 2, 50))
+
+        handle_update_status_request(self.RELEASE, self.INITIAL_STATUS, ts, {"pod-msg": "created"})
+
+        status_object = self.get_status_object()
+        assert status_object.status == self.INITIAL_STATUS
+        assert status_object.time == ts
+        assert status_object.info == {"pod-msg": "created"}
+
+    def test_event_storm_query_count(self):
+        """The number of queries grows linearly with the number of events."""
+        ts = self.INITIAL_EVENT_TS
+        handle_update_status_request(self.RELEASE, self.INITIAL_STATUS, ts)
+
+        n_events = 50
+        with CaptureQueriesContext(connection) as context:
+            for i in range(1, n_events + 1):
+                new_status = self.INITIAL_STATUS if i % 2 else "Running"
+                handle_update_status_request(self.RELEASE, new_status, ts + timedelta(seconds=i))
+
+        assert len(context.captured_queries) == 4 * n_events
+
+        status_object = self.get_status_object()
+        assert status_object.status == "Running"
+        assert status_object.time == ts + timedelta(seconds=n_events)
+
+
+def _get_redis_client():
+    client = redis.Redis.from_url(settings.K8S_STATUS_WRITE_BEHIND_REDIS_URL)
+    try:
+        client.ping()
+    except redis.RedisError:
+        return None
+    return client
+
+
+class StatusWriteBufferTestCase(TestCase):
+    """Test case for status events handled with the status write-behind buffer enabled."""
+
+    RELEASE = "test-release-buffered"
+    INITIAL_STATUS = "Running"
+    INITIAL_EVENT_TS = utc.localize(datetime.now())
+
+    def setUp(self) -> None:
+        client = _get_redis_client()
+        if client is None:
+            self.skipTest("Redis is not available")
+
+        self.status_buffer = K8sStatusWriteBuffer(client, ttl=60)
+        self.status_buffer.discard(self.RELEASE)
+
+        patcher = patch("apps.helpers.get_status_write_buffer", return_value=self.status_buffer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.user = User.objects.create_user(test_user["username"], test_user["email"], test_user["password"])
+        self.category = AppCategories.objects.create(name="Network", priority=100, slug="network")
+        self.app = Apps.objects.create(name="Jupyter Lab", slug="jupyter-lab", category=self.category)
+        self.project = Project.objects.create_project(name="test-perm-get_status", owner=self.user, description="")
+
+        self.status_object = K8sUserAppStatus.objects.create(status=self.INITIAL_STATUS)
+        self.status_object.time = self.INITIAL_EVENT_TS
+        self.status_object.save()
+
+        JupyterInstance.objects.create(
+            access="private",
+            owner=self.user,
+            name="app_buffered",
+            app=self.app,
+            project=self.project,
+            subdomain=Subdomain.objects.create(subdomain=self.RELEASE),
+            k8s_user_app_status=self.status_object,
+        )
+
+    def test_heartbeats_should_be_buffered_and_flushed(self):
+        ts = self.INITIAL_EVENT_TS
+
+        # The first event is written through and seeds the buffer
+        actual = handle_update_status_request(self.RELEASE, self.INITIAL_STATUS, ts + timedelta(seconds=1))
+        assert actual == HandleUpdateStatusResponseCode.UPDATED_TIME_OF_STATUS
+
+        # Subsequent heartbeats do not touch the database
+        with self.assertNumQueries(0):
+            for seconds in range(2, 10):
+                actual = handle_update_status_request(
+                    self.RELEASE, self.INITIAL_STATUS, ts + timedelta(seconds=seconds), {"pod-msg": str(seconds)}
+                )
+                assert actual == HandleUpdateStatusResponseCode.UPDATED_TIME_OF_STATUS
+
+            actual = handle_update_status_request(self.RELEASE, self.INITIAL_STATUS, ts + timedelta(seconds=5))
+            assert actual == HandleUpdateStatusResponseCode.NO_ACTION
+
+        self.status_object.refresh_from_db()
+        assert self.status_object.time == ts + timedelta(seconds=1)
+
+        entries = self.status_buffer.pop_dirty()
+        assert len(entries) == 1
+
+        with self.assertNumQueries(1):
+            assert flush_buffered_status_times(entries) == 1
+
+        self.status_object.refresh_from_db()
+        assert self.status_object.status == self.INITIAL_STATUS
+        assert self.status_object.time == ts + timedelta(seconds=9)
+        assert self.status_object.info == {"pod-msg": "9"}
+
+    def test_status_transition_should_be_written_through(self):
+        ts = self.INITIAL_EVENT_TS
+
+        handle_update_status_request(self.RELEASE, self.INITIAL_STATUS, ts + timedelta(seconds=1))
+        handle_update_status_request(self.RELEASE, self.INITIAL_STATUS, ts + timedelta(seconds=2))
+
+        actual = handle_update_status_request(self.RELEASE, "CrashLoopBackOff", ts + timedelta(seconds=3))
+        assert actual == HandleUpdateStatusResponseCode.UPDATED_STATUS
+
+        self.status_object.refresh_from_db()
+        assert self.status_object.status == "CrashLoopBackOff"
+        assert self.status_object.time == ts + timedelta(seconds=3)
+
+        # The pending heartbeat is superseded by the transition
+        assert self.status_buffer.pop_dirty() == []
+
+
+class FlushBufferedStatusTestCase(TestCase):
+    """Test case for persisting buffered statuses."""
+
+    INITIAL_EVENT_TS = utc.localize(datetime.now())
+
+    def setUp(self) -> None:
+        self.status_object = K8sUserAppStatus.objects.create(status="Running")
+        self.status_object.time = self.INITIAL_EVENT_TS
+        self.status_object.save()
+
+    def test_flush_should_only_apply_newer_states(self):
+        ts = self.INITIAL_EVENT_TS
+        other_status_object = K8sUserAppStatus.objects.create(status="Running")
+        other_status_object.time = ts
+        other_status_object.save()
+
+        entries = [
+            BufferedStatus("release-1", self.status_object.pk, "Running", ts + timedelta(seconds=5), {"pod-msg": "a"}),
+            BufferedStatus("release-2", other_status_object.pk, "Running", ts - timedelta(seconds=5)),
+        ]
+
+        with self.assertNumQueries(1):
+            assert flush_buffered_status_times(entries) == 1
+
+        self.status_object.refresh_from_db()
+        assert self.status_object.time == ts + timedelta(seconds=5)
+        assert self.status_object.info == {"pod-msg": "a"}
+
+        other_status_object.refresh_from_db()
+        assert other_status_object.time == ts
+
+    def test_flush_empty_entries(self):
+        with self.assertNumQueries(0):
+            assert flush_buffered_status_times([]) == 0
+
+
 '''
 #TODO: THIS TEST NEEDS TO BE UPDATED TO ADHERE TO NEW LOGIC
 @pytest.mark.skip(
@@ -1,3 +1,8 @@
+from collections import defaultdict
+from typing import Any, Callable, Iterable, Optional
+
+from django.db.models import Model, Q, QuerySet
+
 from apps.types_.app_types import ModelFormTuple, OptionalModelFormTuple
 
 
@@ -31,5 +36,89 @@ class AppRegistry:
         for app in self._apps.values():
             yield app.Form
 
+    def iter_unique_orm_models(self):
+        """Iterates the ORM models once each, since several app slugs may share an ORM model."""
+        yield from dict.fromkeys(self.iter_orm_models())
+
+    def get_orm_model_field_filter(self, lookup: str, value: Any, orm_models: Optional[Iterable] = None) -> Q:
+        """
+        Builds a filter on the parent model BaseAppInstance for a field that only exists in some concrete ORM models.
+        The filter follows the parent links to the concrete ORM models having the field,
+        so that it can be evaluated in the single query over the parent model.
+
+        :param lookup str: The field lookup in the concrete ORM models, e.g. access or collections__slug.
+        :param value Any: The value of the lookup.
+        :param orm_models list: An optional subset of the ORM models to include. Defaults to all ORM models.
+        :returns: A Q object matching the app instances of the ORM models with the field and value.
+        """
+        field_name = lookup.split("__")[0]
+        orm_models = self.iter_unique_orm_models() if orm_models is None else dict.fromkeys(orm_models)
+
+        q = Q(pk__in=[])
+        for orm_model in orm_models:
+            if hasattr(orm_model, field_name):
+                q |= Q(**{f"{orm_model._meta.model_name}__{lookup}": value})
+
+        return q
+
+    def fetch_app_instances(
+        self,
+        queryset: QuerySet,
+        model_filter: Optional[Callable[[type[Model]], Q]] = None,
+        select_related: Iterable[str] = (),
+        prefetch_related: Iterable[str] = (),
+    ) -> list[Model]:
+        """
+        Fetches app instances of all registered app types as instances of their concrete ORM models.
+
+        The queryset over the parent model BaseAppInstance is evaluated in a single query that selects the
+        primary keys, the slug of the app type, and thereby the concrete ORM model, and any annotations.
+        Each concrete ORM model that occurs is then loaded with a single IN query.
+        The annotations of the queryset are copied to the returned instances.
+
+        :param queryset QuerySet: A queryset of BaseAppInstance determining which instances to fetch and their order.
+        :param model_filter Callable: An optional function returning an additional filter for a concrete ORM model,
+            e.g. on fields that only exist in some of the ORM models.
+        :param select_related list[str]: Related fields to select in the queries of the concrete ORM models.
+        :param prefetch_related list[str]: Related fields to prefetch for the concrete ORM models
+            that have them. Prefetching is performed once per concrete ORM model.
+        :returns: A list of app instances in the order of the queryset.
+        """
+        annotations = list(queryset.query.annotations)
+        rows = list(queryset.values("pk", "app__slug", *annotations))
+
+        pks_per_model = defaultdict(list)
+        for row in rows:
+            orm_model = self.get_orm_model(row["app__slug"])
+            if orm_model is not None:
+                pks_per_model[orm_model].append(row["pk"])
+
+        instances_by_pk = {}
+        for orm_model, pks in pks_per_model.items():
+            model_queryset = orm_model.objects.filter(pk__in=pks)
+
+            if model_filter is not None:
+                model_queryset = model_queryset.filter(model_filter(orm_model))
+
+            if select_related:
+                model_queryset = model_queryset.select_related(*select_related)
+
+            model_prefetch_related = [field for field in prefetch_related if hasattr(orm_model, field)]
+            if model_prefetch_related:
+                model_queryset = model_queryset.prefetch_related(*model_prefetch_related)
+
+            instances_by_pk.update((instance.pk, instance) for instance in model_queryset)
+
+        instances = []
+        for row in rows:
+            # Pop so that rows duplicated by joins in the queryset only yield the instance once
+            instance = instances_by_pk.pop(row["pk"], None)
+            if instance is not None:
+                for annotation in annotations:
+                    setattr(instance, annotation, row[annotation])
+                instances.append(instance)
+
+        return instances
+
     def __contains__(self, item):
         return item in self._apps
@@ -0,0 +1,206 @@
+import hashlib
+import os
+import re
+import subprocess
+import tarfile
+import tempfile
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, NamedTuple, Optional
+
+import yaml
+from django.conf import settings
+
+from studio.utils import get_logger
+
+logger = get_logger(__name__)
+
+CHART_REGEX = re.compile(r"^(?P<chart>.+):(?P<version>.+)$")
+
+
+class ChartReference(NamedTuple):
+    """A chart reference as passed to Helm."""
+
+    chart: str
+    """The chart, i.e. an oci:// reference or a local path."""
+
+    version: Optional[str] = None
+    """The chart version of an OCI chart."""
+
+    @property
+    def is_oci(self) -> bool:
+        return self.chart.startswith("oci://") and self.version is not None
+
+
+@lru_cache(maxsize=None)
+def parse_chart_reference(chart: str) -> ChartReference:
+    """
+    Parses the chart of an app, e.g. ghcr.io/scilifelabdatacentre/serve-charts/custom-app:1.1.3,
+    into the chart and version arguments of Helm.
+
+    :param chart str: The chart of the app or app instance.
+    :returns ChartReference: The chart reference.
+    """
+    if "ghcr" in chart:
+        return ChartReference("oci://" + chart.split(":")[0], chart.split(":")[-1])
+
+    if chart.startswith("oci://"):
+        match = CHART_REGEX.match(chart)
+        if match:
+            return ChartReference(match.group("chart"), match.group("version"))
+
+    return ChartReference(chart)
+
+
+class ChartCache:
+    """
+    A local cache of packaged OCI charts, keyed by chart and version.
+
+    A chart version is pulled from the registry once and then deployed from the local package, so that deploys
+    neither wait for the registry nor fail when the registry is unavailable. Chart versions are immutable,
+    so cached packages are never refreshed. A package is verified against its Chart.yaml when pulled,
+    and against its recorded sha256 digest once per process before it is used.
+    """
+
+    # Seconds to wait for helm pull
+    PULL_TIMEOUT = 300
+    # Seconds to wait before pulling a chart again after a failed pull, e.g. during a registry outage
+    PULL_RETRY_AFTER = 60
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = Path(cache_dir)
+        self._lock = threading.Lock()
+        # The packages verified by this process
+        self._verified: dict[ChartReference, str] = {}
+        # The monotonic times of the last failed pulls
+        self._failed: dict[ChartReference, float] = {}
+
+    def get_package_path(self, reference: ChartReference) -> Path:
+        """Gets the path of the local package of an OCI chart version."""
+        return self.cache_dir / reference.chart.removeprefix("oci://") / f"{reference.version}.tgz"
+
+    def resolve(self, chart: str) -> ChartReference:
+        """
+        Resolves the chart of an app to a local package, pulling the chart version if it is not cached.
+        Charts that are not OCI charts are returned as is.
+        If the chart cannot be pulled, the remote reference is returned so that Helm pulls the chart itself.
+
+        :param chart str: The chart of the app or app instance.
+        :returns ChartReference: The chart reference to pass to Helm.
+        """
+        reference = parse_chart_reference(chart)
+
+        if not reference.is_oci:
+            return reference
+
+        path = self._verified.get(reference)
+
+        if path is None:
+            with self._lock:
+                path = self._verified.get(reference)
+
+                if path is None:
+                    failed_at = self._failed.get(reference)
+                    if failed_at is not None and time.monotonic() - failed_at < self.PULL_RETRY_AFTER:
+                        return reference
+
+                    try:
+                        path = self._get_or_pull(reference)
+                    except Exception as e:
+                        logger.warning(f"Unable to cache the chart {chart}. Deploying from the registry. {e}")
+                        self._failed[reference] = time.monotonic()
+                        return reference
+
+                    self._verified[reference] = path
+                    self._failed.pop(reference, None)
+
+        return ChartReference(path)
+
+    def warm(self, charts: Iterable[str]) -> int:
+        """
+        Pulls the OCI charts that are not yet cached.
+
+        :param charts Iterable[str]: The charts of the apps.
+        :returns int: The number of cached OCI charts.
+        """
+        n_cached = 0
+
+        for chart in set(charts):
+            if not parse_chart_reference(chart).is_oci:
+                continue
+
+            if self.resolve(chart).version is None:
+                n_cached += 1
+
+        return n_cached
+
+    def _get_or_pull(self, reference: ChartReference) -> str:
+        package_path = self.get_package_path(reference)
+        digest_path = package_path.with_name(package_path.name + ".sha256")
+
+        if package_path.exists() and digest_path.exists():
+            if _get_file_digest(package_path) == digest_path.read_text().strip():
+                return str(package_path)
+
+            logger.warning(f"The cached chart package {package_path} is corrupt. Pulling it again.")
+
+        self._pull(reference, package_path, digest_path)
+        return str(package_path)
+
+    def _pull(self, reference: ChartReference, package_path: Path, digest_path: Path) -> None:
+        logger.info(f"Pulling the chart {reference.chart} version {reference.version} to the chart cache")
+
+        package_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Pull into a temporary directory next to the cache entry and move the package in place,
+        # so that other processes never see a partially written package
+        with tempfile.TemporaryDirectory(dir=package_path.parent) as pull_dir:
+            command = f"helm pull {reference.chart} --version {reference.version} --destination {pull_dir}"
+            subprocess.run(command.split(" "), check=True, text=True, capture_output=True, timeout=self.PULL_TIMEOUT)
+
+            pulled = list(Path(pull_dir).glob("*.tgz"))
+            if len(pulled) != 1:
+                raise ValueError(f"Expected one chart package from helm pull but got {len(pulled)}")
+
+            _verify_package_version(pulled[0], reference.version)
+
+            digest_path.write_text(_get_file_digest(pulled[0]))
+            os.replace(pulled[0], package_path)
+
+
+def _get_file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _verify_package_version(path: Path, version: str) -> None:
+    """Verifies that a chart package is readable and contains the expected chart version."""
+    with tarfile.open(path, "r:gz") as package:
+        chart_files = [m for m in package.getmembers() if m.name.count("/") == 1 and m.name.endswith("/Chart.yaml")]
+        if not chart_files:
+            raise ValueError(f"The chart package {path.name} has no Chart.yaml")
+
+        chart_yaml = yaml.safe_load(package.extractfile(chart_files[0]))
+
+    if str(chart_yaml.get("version")) != version:
+        raise ValueError(f"The chart package {path.name} has version {chart_yaml.get('version')} and not {version}")
+
+
+_chart_cache: Optional[ChartCache] = None
+
+
+def get_chart_cache() -> ChartCache:
+    """
+    Returns the chart cache shared by the process.
+    """
+    global _chart_cache
+
+    if _chart_cache is None:
+        _chart_cache = ChartCache(settings.HELM_CHART_CACHE_DIR)
+
+    return _chart_cache
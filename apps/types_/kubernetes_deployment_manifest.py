@@ -55,17 +55,28 @@ class KubernetesDeploymentManifest:
         """Gets the unique deployment id"""
         return self._deployment_id
 
-    def save_as_values_file(self, values_data: str) -> None:
-        """Saves values data to a yaml file."""
-        values_file, _ = self.get_filepaths()
+    def save_as_values_file(self, values_data: str, manifest_data: str | None = None) -> None:
+        """Saves values data to a yaml file, and the manifest data if any to the deployment file."""
+        values_file, deployment_file = self.get_filepaths()
         with open(values_file, "w") as f:
             f.write(values_data)
+        if manifest_data:
+            with open(deployment_file, "w") as f:
+                f.write(manifest_data)
 
     def generate_manifest_yaml_from_template(
-        self, chart: str, values_file: str, namespace: str, version: str = None, save_to_file: bool = False
+        self,
+        chart: str,
+        values_file: str | None,
+        namespace: str,
+        version: str = None,
+        save_to_file: bool = False,
+        values: str | None = None,
     ) -> tuple[str | None, str | None]:
         """
         Generate the manifest yaml for this deployment.
+        The values are read from the values file, or from the values yaml if given, which is passed to Helm
+        over stdin so that no values file is needed.
         The Helm command should be run as a Celery task but Celery lacks support for class methods.
         Therefore we import the Helm command function from the tasks module.
         When run in unit tests, this needs to use syncronously using CELERY_ALWAYS_EAGER
@@ -73,7 +84,7 @@ class KubernetesDeploymentManifest:
 
         from ..tasks import helm_template
 
-        output, error = helm_template(chart, values_file, namespace, version)
+        output, error = helm_template(chart, values_file, namespace, version, values)
 
         if not error:
             if save_to_file:
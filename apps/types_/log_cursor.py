@@ -0,0 +1,67 @@
+import hashlib
+import json
+import re
+from typing import NamedTuple, Optional
+
+# The maximum number of line digests accepted in a cursor sent by a client
+MAX_CURSOR_DIGESTS = 100
+
+DIGEST_PATTERN = re.compile(r"[0-9a-f]{16}")
+
+
+def log_line_digest(timestamp: int, stream: dict, line: str) -> str:
+    """
+    Computes the digest identifying a log line, by its timestamp, the labels of its stream and its message.
+    """
+    content = json.dumps([timestamp, stream, line], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(content.encode()).hexdigest()[:16]
+
+
+class LogCursor(NamedTuple):
+    """
+    The position of the last log line fetched by a client of the logs of an app instance.
+
+    The next lines are queried from the timestamp of the cursor inclusively, since the lines of several streams
+    may have the same timestamp. The lines with that timestamp that were already fetched are skipped by their digests.
+    """
+
+    timestamp: int
+    """The nanosecond timestamp of the last line fetched."""
+
+    digests: frozenset[str] = frozenset()
+    """The digests of the lines with this timestamp that were already fetched."""
+
+    def __str__(self) -> str:
+        if not self.digests:
+            return str(self.timestamp)
+        return f"{self.timestamp}:{'.'.join(sorted(self.digests))}"
+
+    def is_fetched(self, timestamp: int, digest: str) -> bool:
+        """
+        Checks whether a log line was already fetched, i.e. it is before the cursor or one of its lines.
+        """
+        return timestamp < self.timestamp or (timestamp == self.timestamp and digest in self.digests)
+
+    @classmethod
+    def parse(cls, value: Optional[str]) -> Optional["LogCursor"]:
+        """
+        Parses a cursor as formatted by str, i.e. the nanosecond timestamp optionally followed by a colon
+        and the dot-separated digests of the lines with that timestamp.
+
+        :returns: The cursor, or None if not given.
+        :raises ValueError: If the cursor is not valid.
+        """
+        if value in (None, ""):
+            return None
+
+        timestamp, _, digests = value.partition(":")
+
+        timestamp = int(timestamp)
+        if timestamp < 0:
+            raise ValueError(f"Negative cursor timestamp {timestamp}")
+
+        digests = frozenset(digests.split(".")) if digests else frozenset()
+        if len(digests) > MAX_CURSOR_DIGESTS or not all(DIGEST_PATTERN.fullmatch(digest) for digest in digests):
+            raise ValueError("Invalid digests of the cursor")
+
+        return cls(timestamp, digests)
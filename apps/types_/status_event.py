@@ -0,0 +1,18 @@
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+
+class K8sStatusEvent(NamedTuple):
+    """A single k8s pod status event as submitted by the k8s event listener."""
+
+    release: str
+    """The release of the app instance, i.e. the subdomain."""
+
+    new_status: str
+    """The new k8s status code, e.g. Running."""
+
+    event_ts: datetime
+    """The timestamp of the event in UTC."""
+
+    event_msg: Optional[dict] = None
+    """An optional json dict containing pod-msg and/or container-msg."""
@@ -0,0 +1,184 @@
+import json
+from datetime import datetime, timezone
+from typing import NamedTuple, Optional
+
+import redis
+from django.conf import settings
+
+
+class BufferedStatus(NamedTuple):
+    """The latest buffered state of a k8s user app status, as read from the write-behind buffer."""
+
+    release: str
+    """The release of the app instance, i.e. the subdomain."""
+
+    status_id: int
+    """The primary key of the K8sUserAppStatus object to flush the state to."""
+
+    status: str
+    """The k8s status code that the buffered time applies to."""
+
+    time: datetime
+    """The newest event timestamp seen for the status."""
+
+    info: Optional[dict] = None
+    """The newest event message seen for the status, if any."""
+
+
+class K8sStatusWriteBuffer:
+    """
+    A write-behind buffer on Redis for k8s user app status events that only update the time of the status.
+
+    The buffer holds the latest known (status, time, info) per release. An incoming event with the same status
+    and a newer timestamp is absorbed by the buffer and the release is marked as dirty. All other events are
+    left to the caller to write through to the database, after which the caller re-seeds the buffer with the
+    persisted state. The dirty releases are periodically flushed to the database in bulk.
+    """
+
+    KEY_PREFIX = "serve:k8s-status:"
+    DIRTY_KEY = "serve:k8s-status-dirty"
+
+    # Return values of the absorb script
+    UNKNOWN = -1
+    TRANSITION = -2
+    STALE = 0
+    ABSORBED = 1
+
+    # Atomically absorbs a heartbeat event if the buffered status is the same and the event is newer.
+    # KEYS: entry key, dirty set. ARGV: status, time in microseconds, info json or "", ttl, release.
+    _ABSORB_SCRIPT = """
+        local current_status = redis.call('HGET', KEYS[1], 'status')
+        if not current_status then
+            return -1
+        end
+        if tonumber(ARGV[2]) <= tonumber(redis.call('HGET', KEYS[1], 'time')) then
+            return 0
+        end
+        if current_status ~= ARGV[1] then
+            return -2
+        end
+        redis.call('HSET', KEYS[1], 'time', ARGV[2])
+        if ARGV[3] ~= '' then
+            redis.call('HSET', KEYS[1], 'info', ARGV[3])
+        end
+        redis.call('EXPIRE', KEYS[1], ARGV[4])
+        redis.call('SADD', KEYS[2], ARGV[5])
+        return 1
+    """
+
+    # Atomically replaces the buffered state with a persisted state unless the buffer already holds newer data.
+    # KEYS: entry key, dirty set. ARGV: status id, status, time in microseconds, ttl, release.
+    _SEED_SCRIPT = """
+        local current_time = redis.call('HGET', KEYS[1], 'time')
+        if current_time and tonumber(current_time) > tonumber(ARGV[3]) then
+            return 0
+        end
+        redis.call('DEL', KEYS[1])
+        redis.call('HSET', KEYS[1], 'status_id', ARGV[1], 'status', ARGV[2], 'time', ARGV[3])
+        redis.call('EXPIRE', KEYS[1], ARGV[4])
+        redis.call('SREM', KEYS[2], ARGV[5])
+        return 1
+    """
+
+    def __init__(self, client: redis.Redis, ttl: int):
+        self.__client = client
+        self.__ttl = ttl
+        self.__absorb = client.register_script(self._ABSORB_SCRIPT)
+        self.__seed = client.register_script(self._SEED_SCRIPT)
+
+    def absorb(self, release: str, new_status: str, event_ts: datetime, event_msg: Optional[dict] = None) -> int:
+        """
+        Absorbs a status event into the buffer if it only updates the time of the buffered status.
+
+        :param release str: The release of the app instance.
+        :param new_status str: The new status code.
+        :param event_ts datetime: The timestamp of the event in UTC.
+        :param event_msg json dict: An optional json dict containing pod-msg and/or container-msg.
+        :returns: ABSORBED if the event was buffered, STALE if the event is older than the buffered state,
+            TRANSITION if the status differs from the buffered status and UNKNOWN if nothing is buffered.
+        """
+        info = "" if event_msg is None else json.dumps(event_msg)
+        return int(
+            self.__absorb(
+                keys=[self._key(release), self.DIRTY_KEY],
+                args=[new_status, self._to_micros(event_ts), info, self.__ttl, release],
+            )
+        )
+
+    def seed(self, release: str, status_id: int, status: str, time: datetime) -> None:
+        """
+        Replaces the buffered state of a release with the state persisted in the database.
+        Any pending, older, buffered time is discarded since the persisted state supersedes it.
+        """
+        self.__seed(
+            keys=[self._key(release), self.DIRTY_KEY],
+            args=[status_id, status, self._to_micros(time), self.__ttl, release],
+        )
+
+    def discard(self, release: str) -> None:
+        """Removes any buffered state of a release, e.g. when the release is re-used by another app instance."""
+        pipe = self.__client.pipeline()
+        pipe.delete(self._key(release))
+        pipe.srem(self.DIRTY_KEY, release)
+        pipe.execute()
+
+    def pop_dirty(self, count: int = 1000) -> list[BufferedStatus]:
+        """
+        Pops up to count dirty releases and returns their buffered state.
+        A release that is updated again while being popped is re-marked as dirty by the absorb script,
+        so no buffered time is lost.
+        """
+        releases = [r.decode() for r in self.__client.spop(self.DIRTY_KEY, count) or []]
+        if not releases:
+            return []
+
+        pipe = self.__client.pipeline()
+        for release in releases:
+            pipe.hgetall(self._key(release))
+
+        entries = []
+        for release, entry in zip(releases, pipe.execute()):
+            if not entry:
+                # The entry expired or was discarded
+                continue
+            info = entry.get(b"info")
+            entries.append(
+                BufferedStatus(
+                    release=release,
+                    status_id=int(entry[b"status_id"]),
+                    status=entry[b"status"].decode(),
+                    time=self._from_micros(int(entry[b"time"])),
+                    info=None if info is None else json.loads(info),
+                )
+            )
+        return entries
+
+    def _key(self, release: str) -> str:
+        return f"{self.KEY_PREFIX}{release}"
+
+    @staticmethod
+    def _to_micros(ts: datetime) -> int:
+        return int(ts.timestamp()) * 1_000_000 + ts.microsecond
+
+    @staticmethod
+    def _from_micros(micros: int) -> datetime:
+        return datetime.fromtimestamp(micros // 1_000_000, tz=timezone.utc).replace(microsecond=micros % 1_000_000)
+
+
+_buffer: Optional[K8sStatusWriteBuffer] = None
+
+
+def get_status_write_buffer() -> Optional[K8sStatusWriteBuffer]:
+    """
+    Returns the shared k8s status write-behind buffer, or None if the buffer is disabled in settings.
+    """
+    global _buffer
+
+    if not settings.K8S_STATUS_WRITE_BEHIND_ENABLED:
+        return None
+
+    if _buffer is None:
+        client = redis.Redis.from_url(settings.K8S_STATUS_WRITE_BEHIND_REDIS_URL)
+        _buffer = K8sStatusWriteBuffer(client, settings.K8S_STATUS_WRITE_BEHIND_TTL)
+
+    return _buffer
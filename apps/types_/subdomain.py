@@ -3,7 +3,7 @@ from typing import NamedTuple
 from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator
 
-from apps.models import BaseAppInstance, Subdomain
+from apps.models import BaseAppInstance, StandbyRelease, Subdomain
 
 
 class SubdomainCandidateName:
@@ -26,6 +26,9 @@ class SubdomainCandidateName:
             if str(Subdomain.objects.get(subdomain=self.__name).project_id) == str(self.__project_id):
                 if BaseAppInstance.objects.filter(subdomain__subdomain=self.__name).exists():
                     return False
+                elif StandbyRelease.objects.filter(subdomain__subdomain=self.__name).exists():
+                    # The subdomain is the release of a standby release in the warm pool
+                    return False
                 else:
                     return True
             else:
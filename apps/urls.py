@@ -8,6 +8,7 @@ urlpatterns = [
     path("status", views.GetStatusView.as_view(), name="get_status"),
     path("logs", views.GetLogs.as_view(), name="get_logs"),
     path("logs/<app_slug>/<app_id>", views.GetLogs.as_view(), name="logs"),
+    path("logs/<app_slug>/<app_id>/stream", views.GetLogsStream.as_view(), name="logs_stream"),
     path("create/<app_slug>", views.CreateApp.as_view(), name="create"),
     path("settings/<app_slug>/<app_id>", views.CreateApp.as_view(), name="appsettings"),
     path("delete/<app_slug>/<app_id>", views.delete, name="delete"),
@@ -1,7 +1,11 @@
+import threading
+import time
+from collections import OrderedDict
 from typing import NamedTuple, Protocol
 
 import requests
 from django.conf import settings
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
 
 from studio.utils import get_logger
@@ -31,6 +35,175 @@ class ImageArchitectureTuple(NamedTuple):
     """CPU architecture of the image, e.g., 'amd64', 'arm64'."""
 
 
+class RegistryClient:
+    """
+    A client of the container registries used to validate images, shared by the process.
+
+    Requests go through a pooled session with strict timeouts, so that repeated validations reuse
+    the TLS connections to the token services and registries. Bearer tokens are cached per token service
+    and scope until shortly before they expire. Manifests fetched by digest, and the architectures
+    of manifests, are cached by the immutable digest. Tags are mutable, so the digests they resolve to
+    are only cached briefly.
+    """
+
+    # Seconds to wait for a connection and for a response
+    TIMEOUT = (3.05, 10)
+    # Seconds before the expiry of a bearer token that it is fetched again
+    TOKEN_EXPIRY_MARGIN = 10
+    # The expiry of a bearer token without expires_in, as defined by the Docker token specification
+    DEFAULT_TOKEN_EXPIRES_IN = 60
+    # Seconds that the digest a tag resolves to is cached
+    TAG_DIGEST_TTL = 60
+    # The maximum number of cached manifests, architectures and tag digests
+    CACHE_SIZE = 1024
+
+    def __init__(self) -> None:
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._lock = threading.Lock()
+        # The bearer tokens and their monotonic expiry times, by token service URL and username
+        self._tokens: dict[tuple[str, str | None], tuple[str, float]] = {}
+        self._manifests: OrderedDict[str, dict] = OrderedDict()
+        self._architectures: OrderedDict[str, list[ImageArchitectureTuple]] = OrderedDict()
+        # The digests of tags and their monotonic expiry times
+        self._tag_digests: OrderedDict[str, tuple[str, float]] = OrderedDict()
+
+    def get(self, url: str, **kwargs) -> requests.Response | None:
+        """
+        Makes a GET request with the timeouts of the client.
+
+        :returns: The response, or None if the request failed, e.g. timed out.
+        """
+        return self.request("GET", url, **kwargs)
+
+    def head(self, url: str, **kwargs) -> requests.Response | None:
+        """
+        Makes a HEAD request with the timeouts of the client.
+
+        :returns: The response, or None if the request failed, e.g. timed out.
+        """
+        return self.request("HEAD", url, **kwargs)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response | None:
+        try:
+            return self.session.request(method, url, timeout=self.TIMEOUT, **kwargs)
+        except requests.RequestException as e:
+            logger.error(f"{method} request to {url} failed: {e}")
+            return None
+
+    def get_bearer_token(self, token_service_url: str, username: str | None, auth=None) -> str | None:
+        """Gets a bearer token from a token service, cached until shortly before it expires."""
+        key = (token_service_url, username)
+
+        with self._lock:
+            cached = self._tokens.get(key)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+
+        resp = self.get(token_service_url, auth=auth)
+        if resp is None:
+            return None
+
+        if resp.status_code != 200:
+            logger.error(f"Failed to get Bearer token: {resp.status_code} {resp.text}")
+            return None
+
+        data = resp.json()
+        token = data.get("token") or data.get("access_token")
+        if not token:
+            logger.error(f"No token received in response: {resp.text}")
+            return None
+
+        expires_in = data.get("expires_in") or self.DEFAULT_TOKEN_EXPIRES_IN
+        with self._lock:
+            self._tokens[key] = (token, time.monotonic() + expires_in - self.TOKEN_EXPIRY_MARGIN)
+
+        return token
+
+    def get_cached_manifest(self, key: str) -> dict | None:
+        """Gets a cached manifest by its key, i.e. registry/repository@digest."""
+        return self._get_cached(self._manifests, key)
+
+    def cache_manifest(self, key: str, manifest: dict) -> None:
+        self._set_cached(self._manifests, key, manifest)
+
+    def get_cached_architectures(self, key: str) -> list[ImageArchitectureTuple] | None:
+        """Gets the cached architectures of a manifest by its key, i.e. registry/repository@digest."""
+        return self._get_cached(self._architectures, key)
+
+    def cache_architectures(self, key: str, architectures: list[ImageArchitectureTuple]) -> None:
+        self._set_cached(self._architectures, key, architectures)
+
+    def get_cached_tag_digest(self, key: str) -> str | None:
+        """Gets the cached digest of a tag by its key, i.e. registry/repository:tag, unless it has expired."""
+        cached = self._get_cached(self._tag_digests, key)
+        if cached is None or cached[1] <= time.monotonic():
+            return None
+        return cached[0]
+
+    def cache_tag_digest(self, key: str, digest: str) -> None:
+        self._set_cached(self._tag_digests, key, (digest, time.monotonic() + self.TAG_DIGEST_TTL))
+
+    def clear(self) -> None:
+        """Clears the cached tokens, manifests, architectures and tag digests."""
+        with self._lock:
+            self._tokens.clear()
+            self._manifests.clear()
+            self._architectures.clear()
+            self._tag_digests.clear()
+
+    def _get_cached(self, cache: OrderedDict, key: str):
+        with self._lock:
+            value = cache.get(key)
+            if value is not None:
+                cache.move_to_end(key)
+            return value
+
+    def _set_cached(self, cache: OrderedDict, key: str, value) -> None:
+        with self._lock:
+            cache[key] = value
+            cache.move_to_end(key)
+            while len(cache) > self.CACHE_SIZE:
+                cache.popitem(last=False)
+
+
+_registry_client: RegistryClient | None = None
+
+
+def get_registry_client() -> RegistryClient:
+    """
+    Returns the registry client shared by the process.
+    """
+    global _registry_client
+
+    if _registry_client is None:
+        _registry_client = RegistryClient()
+
+    return _registry_client
+
+
+MANIFEST_ACCEPT_HEADER = (
+    "application/vnd.docker.distribution.manifest.list.v2+json,"
+    "application/vnd.oci.image.index.v1+json,"
+    "application/vnd.docker.distribution.manifest.v2+json,"
+    "application/vnd.oci.image.manifest.v1+json"
+)
+
+
+def get_registry_url(registry: str) -> str:
+    """Gets the base URL of a registry, which is https unless the scheme is given, e.g. of a local registry."""
+    if registry.startswith(("http://", "https://")):
+        return registry
+    return f"https://{registry}"
+
+
+def is_digest(reference: str) -> bool:
+    """Whether an image reference is an immutable digest rather than a tag."""
+    return reference.startswith("sha256:")
+
+
 class DockerHubAuthenticator:
     """Handles authentication for DockerHub Container Registry."""
 
@@ -54,28 +227,20 @@ class DockerHubAuthenticator:
         """
         Always use Docker Hub's token service to get a Bearer token.
         Supports anonymous access (public images) or user+PAT for private.
+        The token is cached by the registry client until it expires.
         """
-        logger.info("Requesting Docker Hub Bearer token...")
         token_service_url = self.get_token_service_url(repo=repo)
 
+        logger.info("Requesting Docker Hub Bearer token...")
         if not self._username or not self._pat_token:
             # If no username or PAT is provided, use anonymous access
             logger.info("Using anonymous access for token exchange")
-            resp = requests.get(token_service_url)
-        else:
-            logger.info("Using Basic Auth (username/PAT) for token exchange")
-            resp = requests.get(token_service_url, auth=HTTPBasicAuth(self._username, self._pat_token))
-
-        if resp.status_code != 200:
-            logger.error(f"Failed to get Bearer token: {resp.status_code} {resp.text}")
-            return None
-
-        token = resp.json().get("token")
-        if not token:
-            logger.error(f"No token received in response: {resp.text}")
-            return None
+            return get_registry_client().get_bearer_token(token_service_url, None)
 
-        return token
+        logger.info("Using Basic Auth (username/PAT) for token exchange")
+        return get_registry_client().get_bearer_token(
+            token_service_url, self._username, auth=HTTPBasicAuth(self._username, self._pat_token)
+        )
 
 
 class GHCRAuthenticator(DockerHubAuthenticator):
@@ -103,42 +268,103 @@ def get_manifest_list(
 ):
     """
     Fetches the OCI manifest or manifest list for Docker Hub and GHCR.
-    Returns the JSON manifest and the auth method used (Bearer token or Basic Auth).
+    Returns the JSON manifest, or None if it could not be fetched.
+    Manifests are cached by digest, so a manifest fetched by digest is only fetched once.
     """
-    headers = {
-        "Accept": (
-            "application/vnd.docker.distribution.manifest.list.v2+json,"
-            "application/vnd.oci.image.index.v1+json,"
-            "application/vnd.docker.distribution.manifest.v2+json,"
-            "application/vnd.oci.image.manifest.v1+json"
-        )
-    }
+    client = get_registry_client()
+
+    if is_digest(reference):
+        manifest = client.get_cached_manifest(f"{registry}/{repository}@{reference}")
+        if manifest is not None:
+            return manifest
+
+    headers = {"Accept": MANIFEST_ACCEPT_HEADER}
 
     token = registry_auth.get_bearer_token(repository)
     headers["Authorization"] = f"Bearer {token}"
 
-    url = f"https://{registry}/v2/{repository}/manifests/{reference}"
+    url = f"{get_registry_url(registry)}/v2/{repository}/manifests/{reference}"
     logger.info(f"Fetching manifest from: {url}")
 
-    resp = requests.get(url, headers=headers)
+    resp = client.get(url, headers=headers)
+    if resp is None:
+        return None
+
     if resp.status_code != 200:
         logger.error(f"Error fetching manifest: {resp.status_code} {resp.text}")
         return None
 
-    return resp.json()
+    manifest = resp.json()
+
+    digest = resp.headers.get("Docker-Content-Digest") or (reference if is_digest(reference) else None)
+    if digest:
+        manifest["_digest"] = digest
+        client.cache_manifest(f"{registry}/{repository}@{digest}", manifest)
+        if not is_digest(reference):
+            client.cache_tag_digest(f"{registry}/{repository}:{reference}", digest)
+
+    return manifest
+
+
+def get_manifest_digest(
+    *, registry_auth: BaseRegistryAuth, repository: str, reference: str, registry: str = "registry-1.docker.io"
+) -> str | None:
+    """
+    Resolves an image reference to the digest of its manifest with a single HEAD request to the registry.
+
+    :param registry_auth: BaseRegistryAuth: Authenticator for the registry.
+    :param repository: Repository name in the format 'namespace/repo'.
+    :param reference: Reference (tag or digest) of the image.
+    :param registry: Registry URL, default is 'registry-1.docker.io'.
+    :return: The digest of the manifest, or None if the image does not exist or is not accessible.
+    """
+    if is_digest(reference):
+        return reference
+
+    client = get_registry_client()
+    cache_key = f"{registry}/{repository}:{reference}"
+
+    digest = client.get_cached_tag_digest(cache_key)
+    if digest is not None:
+        return digest
+
+    token = registry_auth.get_bearer_token(repository)
+    headers = {"Accept": MANIFEST_ACCEPT_HEADER, "Authorization": f"Bearer {token}"}
+
+    url = f"{get_registry_url(registry)}/v2/{repository}/manifests/{reference}"
+    logger.info(f"Resolving manifest digest: {url}")
+
+    resp = client.head(url, headers=headers)
+    if resp is None:
+        return None
+
+    if resp.status_code != 200:
+        logger.info(f"Manifest not found: {resp.status_code} {url}")
+        return None
+
+    digest = resp.headers.get("Docker-Content-Digest")
+    if not digest:
+        logger.error(f"No digest in the manifest response: {url}")
+        return None
+
+    client.cache_tag_digest(cache_key, digest)
+    return digest
 
 
 def get_config_blob(*, auth: BaseRegistryAuth, repo: str, digest: str, registry: str = "registry-1.docker.io"):
     """
     Fetches the config blob to read architecture/os for single-platform images.
     """
-    url = f"https://{registry}/v2/{repo}/blobs/{digest}"
+    url = f"{get_registry_url(registry)}/v2/{repo}/blobs/{digest}"
     headers = {}
     token = auth.get_bearer_token(repo)
     headers["Authorization"] = f"Bearer {token}"
 
     logger.info(f"Fetching config blob: {url}")
-    resp = requests.get(url, headers=headers)
+    resp = get_registry_client().get(url, headers=headers)
+    if resp is None:
+        return None
+
     if resp.status_code != 200:
         logger.error(f"Error fetching config blob: {resp.status_code} {resp.text}")
         return None
@@ -187,6 +413,10 @@ def get_image_architectures(
     :param registry: Registry URL, default is 'registry-1.docker.io'.
     :return: list[ImageArchitectureTuple]: List of architectures and OS for the image.
     """
+    if not is_digest(reference):
+        # Use the manifest and architectures cached by digest if the tag was recently resolved
+        reference = get_registry_client().get_cached_tag_digest(f"{registry}/{repo}:{reference}") or reference
+
     manifest = get_manifest_list(
         registry=registry,
         repository=repo,
@@ -194,6 +424,18 @@ def get_image_architectures(
         registry_auth=auth,
     )
 
+    if manifest is None:
+        logger.error(f"Unable to fetch the manifest of {repo}:{reference}")
+        return []
+
+    client = get_registry_client()
+    manifest_digest = manifest.get("_digest")
+    cache_key = f"{registry}/{repo}@{manifest_digest}"
+    if manifest_digest:
+        cached = client.get_cached_architectures(cache_key)
+        if cached is not None:
+            return cached
+
     media_type = manifest.get("mediaType")
     logger.info(f"Manifest mediaType: {media_type}")
     architectures = []
@@ -207,9 +449,12 @@ def get_image_architectures(
         logger.info(f"Single-platform image detected. Config digest: {config_digest}")
 
         config = get_config_blob(registry=registry, repo=repo, digest=config_digest, auth=auth)
-        architectures = _get_architecture_from_config(config)
+        architectures = _get_architecture_from_config(config) if config else []
 
     else:
         logger.error("Unknown or unsupported manifest format!")
 
+    if manifest_digest and architectures:
+        client.cache_architectures(cache_key, architectures)
+
     return architectures
@@ -1,23 +1,35 @@
+import asyncio
 import base64
 import json
 import subprocess
+import time
 from datetime import datetime
 
+import aiohttp
 import dateutil.parser
 import requests
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.exceptions import PermissionDenied
+from django.core.handlers.asgi import ASGIRequest
 from django.db import transaction
-from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
+from django.http import (
+    HttpResponse,
+    HttpResponseForbidden,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import HttpResponseRedirect, render, reverse
 from django.utils import timezone
 from django.utils.decorators import method_decorator
 from django.views import View
 from guardian.decorators import permission_required_or_403
 
+from apps.types_.log_cursor import LogCursor, log_line_digest
 from apps.types_.subdomain import SubdomainCandidateName
 from projects.models import Project
+from studio.async_http import get_json
 from studio.utils import get_logger
 
 from .app_registry import APP_REGISTRY
@@ -28,20 +40,38 @@ from .helpers import (
     get_minio_usage,
 )
 from .models import BaseAppInstance
-from .tasks import delete_resource
+from .tasks import queue_delete_resource
 
 logger = get_logger(__name__)
 
 User = get_user_model()
 
+# Nanoseconds that the logs of apps are kept in Loki
+LOGS_RETENTION_NS = 24 * 60 * 60 * 10**9
+
+
+@sync_to_async
+@permission_required_or_403("can_view_project", (Project, "slug", "project"))
+def check_can_view_project(request, project):
+    """Checks the permission of the user to view a project in async views, returning a 403 response if denied."""
+    return None
+
 
-@method_decorator(
-    permission_required_or_403("can_view_project", (Project, "slug", "project")),
-    name="dispatch",
-)
 class GetLogs(View):
+    """
+    The logs of an app instance, fetched from Loki.
+    This is an async view, so waiting for Loki does not occupy a worker thread.
+    """
+
     template = "apps/logs.html"
 
+    async def dispatch(self, request, *args, **kwargs):
+        response = await check_can_view_project(request, project=kwargs.get("project"))
+        if response is not None:
+            return response
+
+        return await super().dispatch(request, *args, **kwargs)
+
     def get_instance(self, app_slug, app_id, post=False):
         model_class = APP_REGISTRY.get_orm_model(app_slug)
         if model_class:
@@ -66,20 +96,34 @@ class GetLogs(View):
                 logger.error(message)
                 raise PermissionDenied()
 
-    def get(self, request, project, app_slug, app_id):
+    async def get(self, request, project, app_slug, app_id):
+        return await sync_to_async(self.render_logs_page)(request, project, app_slug, app_id)
+
+    def render_logs_page(self, request, project, app_slug, app_id):
         project = self.get_project(project)
         instance = self.get_instance(app_slug, app_id)
 
         context = {"instance": instance, "project": project}
         return render(request, self.template, context)
 
-    def post(self, request, project, app_slug, app_id):
+    def get_log_query(self, project, app_slug, app_id, container=""):
+        """
+        Gets the Loki query of the logs of an app instance.
+
+        :param container str: The container of the logs, i.e. subdomain or copy-to-pvc. Defaults to the subdomain.
+        :returns: The LogQL stream selector, or a JsonResponse with the error if the logs cannot be queried.
+        """
         # Validate project and instance existence
         project = self.get_project(project, post=True)
+        if isinstance(project, JsonResponse):
+            return project
+
         instance = self.get_instance(app_slug, app_id, post=True)
+        if isinstance(instance, JsonResponse):
+            return instance
 
         # get container name from UI (subdomain or copy-to-pvc) if none exists then use subdomain name
-        container = request.POST.get("container", "") or instance.subdomain.subdomain
+        container = container or instance.subdomain.subdomain
 
         # Perform data validation
         if not SubdomainCandidateName(container, project.id).is_valid() and container != "":
@@ -92,41 +136,89 @@ class GetLogs(View):
         if not settings.LOKI_SVC:
             return JsonResponse({"error": "LOKI_SVC not set"}, status=403)
 
+        container = "serve" if instance.app.slug == "shinyproxyapp" else container
+        log_query = f'{{release="{instance.subdomain.subdomain}",container="{container}"}}'
+        logger.info(f"Log query: {log_query}")
+
+        return log_query
+
+    async def query_logs(self, log_query, cursor=None):
+        """
+        Queries Loki for the log lines of an app instance.
+
+        :param log_query str: The LogQL stream selector of the logs.
+        :param cursor LogCursor: The position of the last log line already fetched. If given, only the lines
+            after it are fetched, oldest first, instead of the latest lines of the last 24 hours.
+        :returns: The log lines as [time, message], and the cursor of the last line.
+        :raises aiohttp.ClientError: If the logs cannot be fetched from Loki.
+        """
+        url = settings.LOKI_SVC + "/loki/api/v1/query_range"
+        query_params = {"query": log_query, "limit": "500"}
+
+        if cursor is None:
+            query_params["since"] = "24h"
+        else:
+            # The start is inclusive, since lines of other streams may have the timestamp of the cursor.
+            # Loki only keeps the logs of the last 24 hours.
+            query_params["start"] = str(max(cursor.timestamp, time.time_ns() - LOGS_RETENTION_NS))
+            query_params["direction"] = "forward"
+
+        # Raises a ClientResponseError for bad responses (4xx and 5xx)
+        res_json = (await get_json(url, params=query_params)).get("data", {}).get("result", [])
+
+        start_cursor = cursor
         logs = []
+        for item in res_json:
+            stream = item.get("stream", {})
+            # The lines are newest first, unless fetched forward from the cursor
+            values = item["values"] if start_cursor is not None else reversed(item["values"])
+            for log_line in values:
+                # Separate timestamp and log message
+                timestamp, log_message = log_line[0], log_line[1]
+                if len(log_message) < 2:
+                    continue  # Skip log lines that do not have a message
+
+                # Parse and format the timestamp
+                try:
+                    timestamp_ns = int(timestamp)
+                    digest = log_line_digest(timestamp_ns, stream, log_message)
+                    if start_cursor is not None and start_cursor.is_fetched(timestamp_ns, digest):
+                        continue  # Skip log lines already fetched by the client
+
+                    formatted_time = datetime.fromtimestamp(timestamp_ns / 1e9).strftime("%Y-%m-%d %H:%M:%S")
+                    logs.append([formatted_time, log_message])
+
+                    if cursor is None or timestamp_ns > cursor.timestamp:
+                        cursor = LogCursor(timestamp_ns, frozenset([digest]))
+                    elif timestamp_ns == cursor.timestamp:
+                        cursor = LogCursor(timestamp_ns, cursor.digests | {digest})
+                except ValueError as ve:
+                    logger.warning(f"Timestamp parsing failed: {ve}")
+                    logs.append(["-", log_message])
+                    continue
+
+        return logs, cursor
+
+    async def post(self, request, project, app_slug, app_id):
+        """
+        Responds with the log lines of the last 24 hours, or with the new log lines after the cursor if given.
+        The cursor of the last line is included in the response, as a string that the client sends back as is.
+        """
+        # The project and app instance are read from the database in a worker thread
+        log_query = await sync_to_async(self.get_log_query)(
+            project, app_slug, app_id, request.POST.get("container", "")
+        )
+        if isinstance(log_query, JsonResponse):
+            return log_query
+
+        try:
+            cursor = LogCursor.parse(request.POST.get("cursor"))
+        except ValueError:
+            return JsonResponse({"error": "Invalid cursor value. It must be a cursor of the logs."}, status=400)
+
         try:
-            url = settings.LOKI_SVC + "/loki/api/v1/query_range"
-            container = "serve" if instance.app.slug == "shinyproxyapp" else container
-            log_query = f'{{release="{instance.subdomain.subdomain}",container="{container}"}}'
-            logger.info(f"Log query: {log_query}")
-
-            query_params = {
-                "query": log_query,
-                "limit": 500,
-                "since": "24h",
-            }
-
-            res = requests.get(url, params=query_params)
-            res.raise_for_status()  # Raise an HTTPError for bad responses (4xx and 5xx)
-
-            res_json = res.json().get("data", {}).get("result", [])
-
-            for item in res_json:
-                for log_line in reversed(item["values"]):
-                    # Separate timestamp and log message
-                    timestamp, log_message = log_line[0], log_line[1]
-                    if len(log_message) < 2:
-                        continue  # Skip log lines that do not have a message
-
-                    # Parse and format the timestamp
-                    try:
-                        formatted_time = datetime.fromtimestamp(int(timestamp) / 1e9).strftime("%Y-%m-%d %H:%M:%S")
-                        logs.append([formatted_time, log_message])
-                    except ValueError as ve:
-                        logger.warning(f"Timestamp parsing failed: {ve}")
-                        logs.append(["-", log_message])
-                        continue
-
-        except requests.RequestException as e:
+            logs, cursor = await self.query_logs(log_query, cursor)
+        except aiohttp.ClientError as e:
             logger.error(f"HTTP request failed: {e}", exc_info=True)
             return JsonResponse({"error": "Failed to retrieve logs from Loki"}, status=500)
         except KeyError as e:
@@ -136,7 +228,74 @@ class GetLogs(View):
             logger.error(f"An unexpected error occurred: {e}", exc_info=True)
             return JsonResponse({"error": "An unexpected error occurred"}, status=500)
 
-        return JsonResponse({"data": logs})
+        return JsonResponse({"data": logs, "cursor": str(cursor) if cursor is not None else None})
+
+
+class GetLogsStream(GetLogs):
+    """
+    Streams the new log lines of an app instance as server-sent events, for the logs page to tail the logs.
+
+    Each event holds the new lines after the cursor, and its id is the cursor of the last line, so that
+    the browser resumes from it when it reconnects. The stream ends after a while for the browser to reconnect,
+    which bounds the lifetime of a request. Under WSGI, the stream ends after the first batch of new lines.
+    """
+
+    http_method_names = ["get"]
+
+    # Seconds between the queries of new log lines
+    poll_interval = 5
+    # Seconds after which the stream ends
+    max_duration = 10 * 60
+
+    async def get(self, request, project, app_slug, app_id):
+        log_query = await sync_to_async(self.get_log_query)(project, app_slug, app_id, request.GET.get("container", ""))
+        if isinstance(log_query, JsonResponse):
+            return log_query
+
+        # The browser sends the id of the last event when it reconnects
+        try:
+            cursor = LogCursor.parse(request.headers.get("Last-Event-ID") or request.GET.get("cursor"))
+        except ValueError:
+            return JsonResponse({"error": "Invalid cursor value. It must be a cursor of the logs."}, status=400)
+
+        if cursor is None:
+            cursor = LogCursor(time.time_ns())
+
+        if isinstance(request, ASGIRequest):
+            events = self.stream_logs(log_query, cursor, self.max_duration)
+        else:
+            # A WSGI server, such as the development server, sends a response built from an async iterator only
+            # once it is exhausted. So a single batch of new lines is sent, and the browser polls for the next batch
+            # by reconnecting after the retry interval.
+            events = [event async for event in self.stream_logs(log_query, cursor, max_duration=0)]
+
+        response = StreamingHttpResponse(events, content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        # Disable the response buffering of the ingress
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    async def stream_logs(self, log_query, cursor, max_duration):
+        deadline = time.monotonic() + max_duration
+        yield f"retry: {self.poll_interval * 1000}\n\n"
+
+        while True:
+            try:
+                logs, cursor = await self.query_logs(log_query, cursor)
+            except (aiohttp.ClientError, KeyError) as e:
+                logger.warning(f"Unable to fetch new log lines from Loki: {e}")
+                logs = []
+
+            if logs:
+                yield f"id: {cursor}\ndata: {json.dumps(logs)}\n\n"
+            else:
+                # Keeps the connection open through the ingress
+                yield ": keepalive\n\n"
+
+            if time.monotonic() + self.poll_interval > deadline:
+                break
+
+            await asyncio.sleep(self.poll_interval)
 
 
 @method_decorator(
@@ -152,29 +311,32 @@ class GetStatusView(View):
         if len(body) > 0:
             arr = body.split(",")
 
-            for orm_model in APP_REGISTRY.iter_orm_models():
-                instances = orm_model.objects.filter(pk__in=arr)
+            # The status only depends on fields of the parent model,
+            # so all app types are fetched from the parent table in a single query.
+            instances = BaseAppInstance.objects.filter(
+                pk__in=arr, app__slug__in=list(APP_REGISTRY.get_apps())
+            ).select_related("app", "k8s_user_app_status")
 
-                for instance in instances:
-                    status = instance.get_app_status()
+            for instance in instances:
+                status = instance.get_app_status()
 
-                    # Also set the k8s app status
-                    k8s_app_status_object = instance.k8s_user_app_status
-                    if k8s_app_status_object:
-                        k8s_app_status = k8s_app_status_object.status
-                    else:
-                        k8s_app_status = None
+                # Also set the k8s app status
+                k8s_app_status_object = instance.k8s_user_app_status
+                if k8s_app_status_object:
+                    k8s_app_status = k8s_app_status_object.status
+                else:
+                    k8s_app_status = None
 
-                    status_group = instance.get_status_group()
+                status_group = instance.get_status_group()
 
-                    obj = {
-                        "status": status,
-                        "statusGroup": status_group,
-                        "latestUserAction": instance.latest_user_action,
-                        "k8sStatus": k8s_app_status,
-                    }
+                obj = {
+                    "status": status,
+                    "statusGroup": status_group,
+                    "latestUserAction": instance.latest_user_action,
+                    "k8sStatus": k8s_app_status,
+                }
 
-                    result[f"{instance.app.slug}-{instance.pk}"] = obj
+                result[f"{instance.app.slug}-{instance.pk}"] = obj
 
             return JsonResponse(result)
 
@@ -197,9 +359,7 @@ def delete(request, project, app_slug, app_id):
     if not instance.app.user_can_delete:
         return HttpResponseForbidden()
 
-    serialized_instance = instance.serialize()
-
-    delete_resource.delay(serialized_instance, AppActionOrigin.USER.value)
+    queue_delete_resource(instance, AppActionOrigin.USER.value)
 
     # fix: in case appinstance is public switch to private
     instance.access = "private"
@@ -1,4 +1,3 @@
-import json
 import re
 import uuid
 from dataclasses import dataclass
@@ -19,18 +18,16 @@ from django.utils import timezone
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 
+from api.services.lookups import get_departments, get_universities
 from common.models import EmailVerificationTable, UserProfile
 from studio.utils import get_logger
 
 logger = get_logger(__name__)
 
 
-with open(settings.STATICFILES_DIRS[0] + "/common/departments.json", "r") as f:
-    DEPARTMENTS = json.load(f).get("departments", [])
+DEPARTMENTS = get_departments()
 
-with open(settings.STATICFILES_DIRS[0] + "/common/universities.json", "r") as f:
-    UNIVERSITIES = json.load(f).get("universities", dict())
-    UNIVERSITIES = [(k, v) for k, v in UNIVERSITIES.items()]
+UNIVERSITIES = [(k, v) for k, v in get_universities().items()]
 
 
 # Regex for validating email domain
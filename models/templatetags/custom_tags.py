@@ -1,8 +1,7 @@
-import requests
 from django import template
-from django.conf import settings
 from django.db.models.functions import Length
 
+from api.services.lookups import get_university_name
 from studio.utils import get_logger
 
 logger = get_logger(__name__)
@@ -51,5 +50,4 @@ def subtract(value, arg):
 
 @register.filter(name="university_name")
 def university_name(value):
-    r = requests.get(settings.STUDIO_URL + "/openapi/v1/lookups/universities", params={"code": value})
-    return r.json().get("data").get("name")
+    return get_university_name(value)
@@ -0,0 +1,50 @@
+# Generated by Django 5.1.4 on 2026-10-18 07:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("apps", "0033_alter_customappinstance_description_and_more"),
+        ("portal", "0002_eventsobject"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PublicAppCatalogueEntry",
+            fields=[
+                (
+                    "app_instance",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="public_catalogue_entry",
+                        serialize=False,
+                        to="apps.baseappinstance",
+                    ),
+                ),
+                ("name", models.CharField(max_length=512)),
+                ("description", models.TextField(default="")),
+                ("url", models.URLField(blank=True, null=True)),
+                ("source_code_url", models.URLField(blank=True, null=True)),
+                ("app_name", models.CharField(max_length=512)),
+                ("app_slug", models.CharField(max_length=512)),
+                ("app_logo", models.CharField(blank=True, max_length=512, null=True)),
+                ("project_slug", models.CharField(max_length=512)),
+                ("owner_name", models.CharField(blank=True, max_length=512)),
+                ("owner_affiliation", models.CharField(blank=True, max_length=100)),
+                ("owner_department", models.CharField(blank=True, max_length=100)),
+                ("tags", models.JSONField(default=list)),
+                ("collections", models.JSONField(default=list, help_text="The slugs of the collections of the app")),
+                ("appconfig", models.JSONField(default=dict)),
+                ("pvc", models.JSONField(blank=True, null=True)),
+                ("created_on", models.DateTimeField()),
+                ("updated_on", models.DateTimeField(db_index=True)),
+            ],
+            options={
+                "verbose_name": "Public App Catalogue Entry",
+                "verbose_name_plural": "Public App Catalogue Entries",
+            },
+        ),
+    ]
@@ -2,7 +2,8 @@ import random
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Q
 from django.db.models.signals import pre_save
 from django.dispatch import receiver
 from django.utils.text import slugify
@@ -142,3 +143,179 @@ class EventsObject(models.Model):
     @property
     def event_recording_url(self):
         return self.recording_url
+
+
+class PublicAppCatalogueEntryManager(models.Manager):
+    def with_app_status(self):
+        """
+        Annotates the catalogue entries with the latest user action and k8s status of their app instances.
+        The app status changes with every k8s event and is therefore not denormalised,
+        but joined in from the app instance.
+        """
+        return self.annotate(
+            latest_user_action=F("app_instance__latest_user_action"),
+            k8s_user_app_status=F("app_instance__k8s_user_app_status__status"),
+        )
+
+    def refresh(self, app_instance_pks):
+        """
+        Rebuilds the catalogue entries of the given app instances from their current state.
+        App instances that are no longer public, or are being deleted, are removed from the catalogue.
+
+        :param app_instance_pks list: The primary keys of the app instances to refresh.
+        """
+        # Imported here because the app registry imports the app forms and models
+        from apps.app_registry import APP_REGISTRY
+        from apps.models import BaseAppInstance, SocialMixin
+
+        app_instance_pks = set(app_instance_pks)
+        if not app_instance_pks:
+            return
+
+        app_orms = [
+            app_model for app_model in APP_REGISTRY.iter_unique_orm_models() if issubclass(app_model, SocialMixin)
+        ]
+        queryset = BaseAppInstance.objects.filter(pk__in=app_instance_pks).filter(
+            ~Q(latest_user_action__in=["Deleting", "SystemDeleting"])
+            & APP_REGISTRY.get_orm_model_field_filter("access", "public", app_orms)
+        )
+
+        app_instances = APP_REGISTRY.fetch_app_instances(
+            queryset,
+            select_related=["owner__userprofile", "project", "app"],
+            prefetch_related=["tags", "collections"],
+        )
+
+        entries = [self.model.from_app_instance(app_instance) for app_instance in app_instances]
+
+        with transaction.atomic():
+            self.filter(app_instance__in=app_instance_pks).exclude(
+                app_instance__in=[entry.app_instance_id for entry in entries]
+            ).delete()
+
+            self.bulk_create(
+                entries,
+                update_conflicts=True,
+                unique_fields=["app_instance"],
+                update_fields=self.model.DENORMALISED_FIELDS,
+            )
+
+    def rebuild(self):
+        """Rebuilds the whole catalogue from the public app instances."""
+        from apps.models import BaseAppInstance
+
+        app_instance_pks = set(BaseAppInstance.objects.values_list("pk", flat=True))
+        # Entries of app instances that no longer exist are removed by the cascade
+        self.refresh(app_instance_pks)
+
+
+class PublicAppCatalogueEntry(models.Model):
+    """
+    A denormalised, read-only view of a public app instance as shown in the public apps catalogue.
+    The entries are kept up to date by signals on the app instances, their tags and collections,
+    their owners and app types. See portal.signals.
+    """
+
+    DENORMALISED_FIELDS = [
+        "name",
+        "description",
+        "url",
+        "source_code_url",
+        "app_name",
+        "app_slug",
+        "app_logo",
+        "project_slug",
+        "owner_name",
+        "owner_affiliation",
+        "owner_department",
+        "tags",
+        "collections",
+        "appconfig",
+        "pvc",
+        "created_on",
+        "updated_on",
+    ]
+
+    app_instance = models.OneToOneField(
+        "apps.BaseAppInstance",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="public_catalogue_entry",
+    )
+    name = models.CharField(max_length=512)
+    description = models.TextField(default="")
+    url = models.URLField(blank=True, null=True)
+    source_code_url = models.URLField(blank=True, null=True)
+    app_name = models.CharField(max_length=512)
+    app_slug = models.CharField(max_length=512)
+    app_logo = models.CharField(max_length=512, null=True, blank=True)
+    project_slug = models.CharField(max_length=512)
+    owner_name = models.CharField(max_length=512, blank=True)
+    owner_affiliation = models.CharField(max_length=100, blank=True)
+    owner_department = models.CharField(max_length=100, blank=True)
+    tags = models.JSONField(default=list)
+    collections = models.JSONField(default=list, help_text="The slugs of the collections of the app")
+    appconfig = models.JSONField(default=dict)
+    pvc = models.JSONField(blank=True, null=True)
+    created_on = models.DateTimeField()
+    updated_on = models.DateTimeField(db_index=True)
+
+    objects = PublicAppCatalogueEntryManager()
+
+    class Meta:
+        verbose_name = "Public App Catalogue Entry"
+        verbose_name_plural = "Public App Catalogue Entries"
+
+    def __str__(self):
+        return str(self.name)
+
+    @classmethod
+    def from_app_instance(cls, app_instance):
+        """
+        Creates an unsaved catalogue entry from an app instance of a social app type.
+
+        :param app_instance BaseAppInstance: The app instance with its owner, project, app, tags and collections.
+        :returns PublicAppCatalogueEntry: The catalogue entry.
+        """
+        owner = app_instance.owner
+        userprofile = getattr(owner, "userprofile", None)
+        k8s_values = app_instance.k8s_values or {}
+
+        return cls(
+            app_instance_id=app_instance.pk,
+            name=app_instance.name,
+            description=app_instance.description,
+            url=app_instance.url,
+            source_code_url=app_instance.source_code_url,
+            app_name=app_instance.app.name,
+            app_slug=app_instance.app.slug,
+            app_logo=app_instance.app.logo,
+            project_slug=app_instance.project.slug,
+            owner_name=owner.first_name + " " + owner.last_name if owner else "",
+            owner_affiliation=userprofile.affiliation if userprofile else "",
+            owner_department=userprofile.department if userprofile else "",
+            tags=app_instance.tags.get_tag_list(),
+            collections=[collection.slug for collection in app_instance.collections.all()],
+            appconfig=k8s_values.get("appconfig", {}),
+            pvc=k8s_values.get("apps", {}).get("volumeK8s") or None,
+            created_on=app_instance.created_on,
+            updated_on=app_instance.updated_on,
+        )
+
+    def get_app_status(self) -> str:
+        """Get the app status of an entry annotated with the status of its app instance."""
+        from apps.models import BaseAppInstance
+
+        return BaseAppInstance.convert_to_app_status(self.latest_user_action, self.k8s_user_app_status)
+
+    def get_status_group(self) -> str:
+        """Get the status group from the app status."""
+        status = self.get_app_status()
+        group = (
+            "success"
+            if status in settings.APPS_STATUS_SUCCESS
+            else "warning"
+            if status in settings.APPS_STATUS_WARNING
+            else "danger"
+        )
+        return group
@@ -1,8 +1,123 @@
 import structlog
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 from django_structlog.signals import bind_extra_request_metadata
 
+from apps.app_registry import APP_REGISTRY
+from apps.models import Apps, BaseAppInstance, SocialMixin
+from common.models import UserProfile
+from studio.utils import get_logger
+
+from .models import Collection, PublicAppCatalogueEntry
+
+logger = get_logger(__name__)
+
+User = get_user_model()
+
+CATALOGUE_UID = "public_app_catalogue_refresh"
+
+# The fields of the app instances and their owners that the public app catalogue is built from
+CATALOGUE_SOURCE_FIELDS = {
+    "name",
+    "description",
+    "url",
+    "source_code_url",
+    "access",
+    "latest_user_action",
+    "k8s_values",
+    "app",
+    "project",
+    "owner",
+    "updated_on",
+}
+CATALOGUE_OWNER_SOURCE_FIELDS = {"first_name", "last_name", "affiliation", "department"}
+
 
 @receiver(bind_extra_request_metadata)
 def remove_ip_address(sender, request, logger, **kwargs):
     structlog.contextvars.bind_contextvars(ip=None)
+
+
+def refresh_public_app_catalogue_entry(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Refreshes the catalogue entry of a saved app instance, unless none of the catalogued fields were saved."""
+    if raw or (update_fields is not None and not CATALOGUE_SOURCE_FIELDS.intersection(update_fields)):
+        return
+
+    PublicAppCatalogueEntry.objects.refresh([instance.pk])
+
+
+def refresh_public_app_catalogue_m2m(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Refreshes the catalogue entries after the tags or collections of app instances change.
+    The change can be made from either side of the relation, i.e. from an app instance or from a tag or collection.
+    """
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        PublicAppCatalogueEntry.objects.refresh([instance.pk])
+    elif pk_set:
+        PublicAppCatalogueEntry.objects.refresh(pk_set)
+    elif isinstance(instance, Collection):
+        # A cleared collection does not report the removed app instances
+        refresh_public_app_catalogue_collection(sender, instance)
+
+
+def refresh_public_app_catalogue_tag(sender, instance, created, raw=False, **kwargs):
+    """Refreshes the catalogue entries of the app instances having a renamed tag."""
+    if created or raw:
+        return
+
+    PublicAppCatalogueEntry.objects.refresh(app_instance.pk for app_instance in instance.get_related_objects(flat=True))
+
+
+@receiver(post_save, sender=Collection, dispatch_uid=CATALOGUE_UID)
+@receiver(post_delete, sender=Collection, dispatch_uid=CATALOGUE_UID)
+def refresh_public_app_catalogue_collection(sender, instance, raw=False, **kwargs):
+    """Refreshes the catalogue entries listing a collection that was renamed, cleared or deleted."""
+    if raw:
+        return
+
+    app_instance_pks = PublicAppCatalogueEntry.objects.filter(collections__contains=[instance.slug]).values_list(
+        "app_instance", flat=True
+    )
+    PublicAppCatalogueEntry.objects.refresh(app_instance_pks)
+
+
+@receiver(post_save, sender=Apps, dispatch_uid=CATALOGUE_UID)
+def refresh_public_app_catalogue_app_type(sender, instance, raw=False, **kwargs):
+    """Refreshes the catalogue entries of an app type whose name or logo may have changed."""
+    if raw:
+        return
+
+    app_instance_pks = PublicAppCatalogueEntry.objects.filter(app_slug=instance.slug).values_list(
+        "app_instance", flat=True
+    )
+    PublicAppCatalogueEntry.objects.refresh(app_instance_pks)
+
+
+@receiver(post_save, sender=User, dispatch_uid=CATALOGUE_UID)
+@receiver(post_save, sender=UserProfile, dispatch_uid=CATALOGUE_UID)
+def refresh_public_app_catalogue_owner(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Refreshes the catalogue entries of a user whose name, affiliation or department may have changed."""
+    # A new user has no apps yet, and e.g. logins only update the last login time
+    if created or raw or (update_fields is not None and not CATALOGUE_OWNER_SOURCE_FIELDS.intersection(update_fields)):
+        return
+
+    user = instance.user if isinstance(instance, UserProfile) else instance
+    app_instance_pks = BaseAppInstance.objects.filter(owner=user).values_list("pk", flat=True)
+    PublicAppCatalogueEntry.objects.refresh(app_instance_pks)
+
+
+for model in APP_REGISTRY.iter_unique_orm_models():
+    if not issubclass(model, SocialMixin):
+        continue
+
+    # Deleted app instances are removed from the catalogue by the cascade on the catalogue entry
+    receiver(post_save, sender=model, dispatch_uid=CATALOGUE_UID)(refresh_public_app_catalogue_entry)
+    receiver(m2m_changed, sender=model.tags.through, dispatch_uid=CATALOGUE_UID)(refresh_public_app_catalogue_m2m)
+    receiver(m2m_changed, sender=model.collections.through, dispatch_uid=CATALOGUE_UID)(
+        refresh_public_app_catalogue_m2m
+    )
+    receiver(post_save, sender=model.tags.tag_model, dispatch_uid=CATALOGUE_UID)(refresh_public_app_catalogue_tag)
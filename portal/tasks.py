@@ -0,0 +1,17 @@
+from studio.celery import app
+from studio.utils import get_logger
+
+from .models import PublicAppCatalogueEntry
+
+logger = get_logger(__name__)
+
+
+@app.task
+def rebuild_public_app_catalogue():
+    """
+    Rebuilds the public app catalogue from the public app instances.
+    The catalogue is kept up to date by signals, so this only repairs entries changed
+    outside of the ORM, e.g. by queryset updates or manual database changes.
+    """
+    PublicAppCatalogueEntry.objects.rebuild()
+    logger.info(f"Rebuilt the public app catalogue with {PublicAppCatalogueEntry.objects.count()} apps")
@@ -1,9 +1,16 @@
 import pytest
+from django.contrib.auth import get_user_model
 from django.contrib.sessions.backends.db import SessionStore
-from django.test import RequestFactory
+from django.test import RequestFactory, TestCase
 from django.urls import reverse
 
+from apps.models import Apps, CustomAppInstance, K8sUserAppStatus, Subdomain
+from common.models import UserProfile
 from portal import views
+from portal.models import Collection, PublicAppCatalogueEntry
+from projects.models import Project
+
+User = get_user_model()
 
 
 @pytest.mark.django_db
@@ -75,3 +82,150 @@ def test_privacy_view():
     # Check status code
     assert response.status_code == 200
     assert "<title>Privacy policy | SciLifeLab Serve (beta)</title>" in response.content.decode()
+
+
+class PublicAppCatalogueTestCase(TestCase):
+    """Test case for keeping the public app catalogue up to date with the app instances."""
+
+    def setUp(self):
+        self.user = User.objects.create_user("foo1", "foo@test.com", "bar", first_name="Foo", last_name="Bar")
+        UserProfile.objects.create(user=self.user, affiliation="uu", department="Department of Biology")
+        self.project = Project.objects.create_project(name="test-catalogue", owner=self.user, description="")
+        self.app = Apps.objects.create(name="Custom App", slug="customapp", logo="custom-app-logo.svg")
+        self.app_instance = self.create_app_instance("test-catalogue-public", access="public")
+
+    def create_app_instance(self, name, access):
+        return CustomAppInstance.objects.create(
+            access=access,
+            owner=self.user,
+            name=name,
+            description="My app description",
+            app=self.app,
+            project=self.project,
+            subdomain=Subdomain.objects.create(subdomain=name),
+            k8s_user_app_status=K8sUserAppStatus.objects.create(status="Running"),
+            k8s_values={"appconfig": {"image": "some-image:latest", "port": 8000}},
+        )
+
+    def get_entry(self, app_instance=None):
+        app_instance = app_instance or self.app_instance
+        return PublicAppCatalogueEntry.objects.with_app_status().filter(app_instance=app_instance).first()
+
+    def test_public_app_instance_should_be_catalogued(self):
+        entry = self.get_entry()
+
+        assert entry is not None
+        assert entry.name == "test-catalogue-public"
+        assert entry.description == "My app description"
+        assert entry.app_name == "Custom App"
+        assert entry.app_slug == "customapp"
+        assert entry.app_logo == "custom-app-logo.svg"
+        assert entry.project_slug == self.project.slug
+        assert entry.owner_name == "Foo Bar"
+        assert entry.owner_affiliation == "uu"
+        assert entry.owner_department == "Department of Biology"
+        assert entry.appconfig == {"image": "some-image:latest", "port": 8000}
+        assert entry.updated_on == self.app_instance.updated_on
+        assert entry.get_app_status() == "Running"
+
+    def test_non_public_app_instance_should_not_be_catalogued(self):
+        app_instance = self.create_app_instance("test-catalogue-project", access="project")
+
+        assert self.get_entry(app_instance) is None
+
+        app_instance.access = "public"
+        app_instance.save()
+        assert self.get_entry(app_instance) is not None
+
+        self.app_instance.access = "private"
+        self.app_instance.save()
+        assert self.get_entry() is None
+
+    def test_deleted_app_instance_should_be_removed(self):
+        self.app_instance.latest_user_action = "Deleting"
+        self.app_instance.save(update_fields=["latest_user_action", "deleted_on"])
+        assert self.get_entry() is None
+
+        app_instance = self.create_app_instance("test-catalogue-delete", access="public")
+        # Skip the helm uninstall of the deleted app instance
+        app_instance.k8s_values = None
+        app_instance.delete()
+        assert not PublicAppCatalogueEntry.objects.filter(app_instance_id=app_instance.pk).exists()
+
+    def test_tag_and_collection_changes_should_be_catalogued(self):
+        self.app_instance.tags.add("genomics", "proteomics")
+        assert sorted(self.get_entry().tags) == ["genomics", "proteomics"]
+
+        self.app_instance.tags.remove("genomics")
+        assert self.get_entry().tags == ["proteomics"]
+
+        collection = Collection.objects.create(name="Some Collection")
+        self.app_instance.collections.add(collection)
+        assert self.get_entry().collections == [collection.slug]
+
+        # Changes from the other side of the relation
+        collection.customappinstance.clear()
+        assert self.get_entry().collections == []
+
+        collection.customappinstance.add(self.app_instance)
+        assert self.get_entry().collections == [collection.slug]
+
+        collection.delete()
+        assert self.get_entry().collections == []
+
+    def test_owner_and_app_type_changes_should_be_catalogued(self):
+        self.user.userprofile.department = "Department of Chemistry"
+        self.user.userprofile.save()
+        self.user.first_name = "Baz"
+        self.user.save()
+        self.app.logo = "new-logo.svg"
+        self.app.save()
+
+        entry = self.get_entry()
+        assert entry.owner_department == "Department of Chemistry"
+        assert entry.owner_name == "Baz Bar"
+        assert entry.app_logo == "new-logo.svg"
+
+    def test_app_instance_without_owner_should_be_catalogued(self):
+        CustomAppInstance.objects.filter(pk=self.app_instance.pk).update(owner=None)
+        PublicAppCatalogueEntry.objects.refresh([self.app_instance.pk])
+
+        entry = self.get_entry()
+        assert entry.owner_name == ""
+        assert entry.owner_affiliation == ""
+        assert entry.owner_department == ""
+
+    def test_app_status_should_be_read_from_the_app_instance(self):
+        K8sUserAppStatus.objects.filter(pk=self.app_instance.k8s_user_app_status.pk).update(status="ErrImagePull")
+
+        entry = self.get_entry()
+        assert entry.get_app_status() == "Error"
+        assert entry.get_status_group() == "danger"
+
+    def test_rebuild_should_repair_the_catalogue(self):
+        PublicAppCatalogueEntry.objects.all().delete()
+        CustomAppInstance.objects.filter(pk=self.app_instance.pk).update(name="test-catalogue-renamed")
+
+        PublicAppCatalogueEntry.objects.rebuild()
+
+        assert self.get_entry().name == "test-catalogue-renamed"
+
+    def test_get_public_apps_should_use_a_single_query(self):
+        for i in range(5):
+            self.create_app_instance(f"test-catalogue-public-{i}", access="public")
+
+        with self.assertNumQueries(1):
+            published_apps = list(views.get_public_apps(None, order_by="updated_on", order_reverse=True))
+
+        assert len(published_apps) == 6
+        assert published_apps[0].name == "test-catalogue-public-4"
+
+    def test_additional_context_should_resolve_the_affiliation_in_process(self):
+        serialized_apps, organizations, departments, _ = views.add_additional_context_to_public_apps(
+            views.get_public_apps(None)
+        )
+
+        assert serialized_apps[0]["affiliation"] == "Uppsala University"
+        assert serialized_apps[0]["department"] == " Biology"
+        assert organizations == ["Uppsala University"]
+        assert departments == [" Biology"]
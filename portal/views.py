@@ -1,5 +1,4 @@
 import markdown
-import requests
 import waffle  # type: ignore
 from django.apps import apps
 from django.conf import settings
@@ -8,11 +7,11 @@ from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
 from django.views.generic import View
 
-from apps.app_registry import APP_REGISTRY
-from apps.models import Apps, BaseAppInstance, SocialMixin
+from api.services.lookups import get_university_name
+from apps.models import Apps
 from studio.utils import get_logger
 
-from .models import EventsObject, NewsObject
+from .models import EventsObject, NewsObject, PublicAppCatalogueEntry
 
 logger = get_logger(__name__)
 
@@ -27,94 +26,64 @@ Collection = apps.get_model(app_label="portal.Collection")
 
 
 def get_public_apps(request, app_id=0, collection=None, order_by="updated_on", order_reverse=False):
-    published_apps = []
-    seen_app_ids = set()
-
-    def get_queryset_for_model(app_orm):
-        filters = ~Q(latest_user_action__in=["Deleting", "SystemDeleting"]) & Q(access="public")
-        if collection:
-            filters &= Q(collections__slug=collection)
-
-        queryset = (
-            app_orm.objects.filter(filters)
-            .select_related("owner__userprofile", "k8s_user_app_status", "project", "app")
-            .prefetch_related("tags")
-        )
-        return queryset
-
-    app_orms = (app_model for app_model in APP_REGISTRY.iter_orm_models() if issubclass(app_model, SocialMixin))
-
-    for app_orm in app_orms:
-        queryset = get_queryset_for_model(app_orm)
-        for app in queryset:
-            if app.id not in seen_app_ids:
-                published_apps.append(app)
-                seen_app_ids.add(app.id)
-
-    if all(hasattr(app, order_by) for app in published_apps):
-        published_apps.sort(
-            key=lambda app: (getattr(app, order_by) is None, getattr(app, order_by, "")), reverse=order_reverse
-        )
+    # Read the public apps from the materialised catalogue rather than from the app instances
+    queryset = PublicAppCatalogueEntry.objects.with_app_status().exclude(
+        latest_user_action__in=["Deleting", "SystemDeleting"]
+    )
+    if collection:
+        queryset = queryset.filter(collections__contains=[collection])
+
+    if order_by in PublicAppCatalogueEntry.DENORMALISED_FIELDS:
+        queryset = queryset.order_by(("-" if order_reverse else "") + order_by, "app_instance")
     else:
         logger.error("Error: Invalid order_by field", exc_info=True)
 
-    return published_apps
+    return queryset
 
 
 def add_additional_context_to_public_apps(published_apps):
     serialized_apps = []
     organizations, departments, tags = set(), set(), set()
 
-    universities_lookup = requests.get(settings.STUDIO_URL + "/openapi/v1/lookups/universities")
-    universities = universities_lookup.json().get("data")
-    universities_obj = {u["code"]: u["name"] for u in universities}
-
     for app in published_apps:
-        try:
-            affiliation = universities_obj.get(app.owner.userprofile.affiliation, app.owner.userprofile.affiliation)
-            organizations.add(affiliation)
-            department = app.owner.userprofile.department
-            if department not in [None, ""]:
-                dep_cleaned = (
-                    department.replace("Department of", "")
-                    .replace("Division of ", "")
-                    .replace("Institute of", "")
-                    .replace("Institute for ", "")
-                )
-                departments.add(dep_cleaned)
-        except Exception as e:
-            logger.error("Error: " + e.__str__())
-
-        print(f"Processing app: {app.name} ({app.id})")
-        tag_list = app.tags.get_tag_list()
-        tags.update(tag_list)
-        k8s_values = getattr(app, "k8s_values", {})
+        affiliation = get_university_name(app.owner_affiliation, default=app.owner_affiliation)
+        organizations.add(affiliation)
+        department = app.owner_department
+        if department not in [None, ""]:
+            department = (
+                department.replace("Department of", "")
+                .replace("Division of ", "")
+                .replace("Institute of", "")
+                .replace("Institute for ", "")
+            )
+            departments.add(department)
+
+        tags.update(app.tags)
 
         try:
-            app.status_group = app.get_status_group()
+            status_group = app.get_status_group()
         except Exception:
-            app.latest_status = "unknown"
-            app.status_group = "unknown"
+            status_group = "unknown"
         serialized_apps.append(
             {
-                "id": app.id,
+                "id": app.app_instance_id,
                 "name": app.name,
                 "description": app.description,
-                "owner": app.owner.first_name + " " + app.owner.last_name,
-                "affiliation": affiliation if "affiliation" in locals() else "",
-                "department": dep_cleaned if "dep_cleaned" in locals() else "",
-                "tag_list": tag_list,
-                "tag_string": ",".join(tag_list),
-                "image": k8s_values.get("appconfig", {}).get("image", "Not available"),
-                "port": k8s_values.get("appconfig", {}).get("port", "Not available"),
-                "userid": k8s_values.get("appconfig", {}).get("userid", "Not available"),
-                "pvc": k8s_values.get("apps", {}).get("volumeK8s") or None,
-                "logo": app.app.logo,
-                "slug": app.app.slug,
-                "app_type": "Shiny App" if app.app.name == "ShinyProxy App" else app.app.name,
-                "project_slug": app.project.slug,
+                "owner": app.owner_name,
+                "affiliation": affiliation,
+                "department": department,
+                "tag_list": app.tags,
+                "tag_string": ",".join(app.tags),
+                "image": app.appconfig.get("image", "Not available"),
+                "port": app.appconfig.get("port", "Not available"),
+                "userid": app.appconfig.get("userid", "Not available"),
+                "pvc": app.pvc,
+                "logo": app.app_logo,
+                "slug": app.app_slug,
+                "app_type": "Shiny App" if app.app_name == "ShinyProxy App" else app.app_name,
+                "project_slug": app.project_slug,
                 "source_code_url": app.source_code_url,
-                "status_group": app.status_group,
+                "status_group": status_group,
                 "updated_on": app.updated_on,
                 "url": app.url,
             }
@@ -152,7 +121,6 @@ class HomeView(View):
     def get(self, request, app_id=0):
         published_apps_updated_on = get_public_apps(request, app_id=app_id, order_by="updated_on", order_reverse=True)
         published_apps_updated_on = published_apps_updated_on[:6]  # we display only 6 apps
-        # TODO: add selection of N apps into the function so that it is optimized in the future with more apps in the db
 
         news_objects = NewsObject.objects.all().order_by("-created_on")
         link_all_news = False
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.4 on 2026-10-18 09:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("projects", "0008_project_deleted_on"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="projecttemplate",
+            name="standby_pool_size",
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text="The number of pre-installed JupyterLab releases kept ready per flavor and environment in each active project created from this template, e.g. for courses. 0 disables the pool.",
+            ),
+        ),
+    ]
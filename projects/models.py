@@ -201,6 +201,11 @@ class ProjectTemplate(models.Model):
     slug = models.CharField(max_length=512, default="")
     template = models.TextField(null=True, blank=True)
     available_apps = models.ManyToManyField("apps.Apps", blank=True, related_name="available_apps")
+    standby_pool_size = models.PositiveIntegerField(
+        default=0,
+        help_text="The number of pre-installed JupyterLab releases kept ready per flavor and environment "
+        "in each active project created from this template, e.g. for courses. 0 disables the pool.",
+    )
 
     enabled = models.BooleanField(default=True)
 
@@ -5,13 +5,19 @@ from celery import shared_task
 from django.apps import apps
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.utils import timezone
 
 from apps.app_registry import APP_REGISTRY
-from apps.constants import AppActionOrigin
 from apps.helpers import create_instance_from_form
-from apps.models import BaseAppInstance, VolumeInstance
-from apps.tasks import delete_resource
+from apps.models import (
+    BaseAppInstance,
+    BulkOperation,
+    BulkOperationItem,
+    ReleaseOperation,
+    VolumeInstance,
+)
+from apps.tasks import delete_standby_releases, run_bulk_operation
 from studio.utils import get_logger
 
 from .exceptions import ProjectCreationException
@@ -53,6 +59,10 @@ def create_resources_from_template(user, project_slug, template):
         )
         flavor.save()
 
+    # The app instances are created one by one, and their resources are then deployed by a workflow
+    volume_ids = []
+    app_ids = []
+
     logger.info("Creating Project Volumes...")
     volume_dict = template.get("volumes", {})
     for volume_name, data in volume_dict.items():
@@ -61,7 +71,7 @@ def create_resources_from_template(user, project_slug, template):
         form_class = APP_REGISTRY.get_form_class("volumeK8s")
         form = form_class(data, project_pk=project.pk)
         if form.is_valid():
-            create_instance_from_form(form, project, "volumeK8s")
+            volume_ids.append(create_instance_from_form(form, project, "volumeK8s", queue_deploy=False))
         else:
             logger.error(f"Form is invalid: {form.errors.as_data()}")
             raise ProjectCreationException(f"Form is invalid: {form.errors.as_data()}")
@@ -112,7 +122,7 @@ def create_resources_from_template(user, project_slug, template):
     # All forms are valid, lets create apps.
     logger.info("All forms valid, creating apps...")
     for app_slug, form in form_dict.items():
-        create_instance_from_form(form, project, app_slug)
+        app_ids.append(create_instance_from_form(form, project, app_slug, queue_deploy=False))
 
     env_dict = template.get("environments", {})
     logger.info("Creating Project Environments...")
@@ -160,33 +170,82 @@ def create_resources_from_template(user, project_slug, template):
                 exc_info=True,
             )
 
-    project.status = "active"
-    project.save()
+    # Deploy the volumes before the apps that mount them. The project is activated as the final step.
+    start_project_workflow(project, BulkOperation.DEPLOY, [volume_ids, app_ids], project_status="active")
 
 
 @shared_task
 def delete_project(project_pk):
     logger.info("SCHEDULING DELETION OF ALL INSTALLED APPS")
     project = Project.objects.get(pk=project_pk)
-    delete_project_apps(project)
-
-    project.status = "deleted"
-    project.deleted_on = timezone.now()
-    project.save()
+    # The project is marked as deleted as the final step
+    delete_project_apps(project, project_status="deleted")
 
 
 @shared_task
-def delete_project_apps(project):
-    for orm_model in APP_REGISTRY.iter_orm_models():
-        queryset = orm_model.objects.filter(project=project)
-        for instance in queryset:
-            serialized_instance = instance.serialize()
-            # Set latest_user_action to Deleting
-            # This hides the app from the user UI
-            instance.latest_user_action = "Deleting"
-            instance.deleted_on = timezone.now()
-            instance.save(update_fields=["latest_user_action", "deleted_on"])
-            delete_resource(serialized_instance, AppActionOrigin.USER.value)
+def delete_project_apps(project, project_status=None):
+    """
+    Deletes the resources of all app instances of a project by a workflow.
+    The apps are deleted before the volumes that they mount.
+
+    :param project Project: The project.
+    :param project_status str: The status to set on the project when all resources are deleted, if any.
+    """
+    app_instances = APP_REGISTRY.fetch_app_instances(BaseAppInstance.objects.filter(project=project).order_by("pk"))
+
+    volume_ids = []
+    app_ids = []
+    for instance in app_instances:
+        # Set latest_user_action to Deleting
+        # This hides the app from the user UI
+        instance.latest_user_action = "Deleting"
+        instance.deleted_on = timezone.now()
+        instance.save(update_fields=["latest_user_action", "deleted_on"])
+        (volume_ids if isinstance(instance, VolumeInstance) else app_ids).append(instance.pk)
+
+    # The workflow deletes the resources, so the pending deploys of the apps are dropped,
+    # including those of a workflow still deploying the apps of the project
+    reason = "Superseded by the deletion of the project"
+    ReleaseOperation.objects.drop_pending(reason, app_instance__project=project)
+    BulkOperationItem.objects.filter(
+        app_instance__project=project, status=BulkOperationItem.PENDING, release_operation__isnull=True
+    ).update(status=BulkOperationItem.FAILED, message=reason, finished_on=timezone.now())
+
+    delete_standby_releases(project)
+
+    start_project_workflow(project, BulkOperation.DELETE, [app_ids, volume_ids], project_status=project_status)
+
+
+def start_project_workflow(
+    project: Project, operation: str, stages: list[list[int]], project_status: str | None = None
+) -> BulkOperation:
+    """
+    Starts a workflow deploying or deleting the resources of the app instances of a project in stages,
+    as a bulk operation of the project. The app instances of a stage are queued on the release queues,
+    by at most PROJECT_WORKFLOW_CONCURRENCY at a time, once all app instances of the earlier stages are processed.
+    The outcome is logged in the project when the workflow is finished.
+
+    :param project Project: The project.
+    :param operation str: The operation, BulkOperation.DEPLOY or BulkOperation.DELETE.
+    :param stages list: The primary keys of the app instances of each stage.
+    :param project_status str: The status to set on the project when the workflow is finished, if any.
+    :returns BulkOperation: The bulk operation of the workflow.
+    """
+    bulk_operation = BulkOperation.objects.create(
+        operation=operation,
+        concurrency=max(1, settings.PROJECT_WORKFLOW_CONCURRENCY),
+        project=project,
+        project_status=project_status,
+    )
+    BulkOperationItem.objects.bulk_create(
+        BulkOperationItem(bulk_operation=bulk_operation, app_instance_id=pk, stage=stage)
+        for stage, app_instance_ids in enumerate(stages)
+        for pk in app_instance_ids
+    )
+
+    transaction.on_commit(lambda: run_bulk_operation.delay(bulk_operation.pk))
+
+    return bulk_operation
 
 
 @shared_task
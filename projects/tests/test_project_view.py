@@ -1,8 +1,19 @@
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
-from ..models import Project
+from apps.models import (
+    AppCategories,
+    Apps,
+    CustomAppInstance,
+    JupyterInstance,
+    K8sUserAppStatus,
+    Subdomain,
+)
+
+from ..models import Project, ProjectTemplate
 
 User = get_user_model()
 test_user = {"username": "foo1", "email": "foo@test.com", "password": "bar"}
@@ -82,3 +93,63 @@ class FrobiddenProjectViewTestCase(TestCase):
         )
         self.assertTemplateUsed(response, "403.html")
         self.assertEqual(response.status_code, 403)
+
+
+class ProjectOverviewQueryCountTestCase(TestCase):
+    """The project overview should run a constant number of queries whatever the number of app instances."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(test_user["username"], test_user["email"], test_user["password"])
+        self.project = Project.objects.create_project(name="test-overview", owner=self.user, description="")
+        self.client.login(username=test_user["email"], password=test_user["password"])
+
+        develop = AppCategories.objects.create(name="Develop", priority=100, slug="develop")
+        serve = AppCategories.objects.create(name="Serve", priority=200, slug="serve")
+        self.app_types = [
+            (JupyterInstance, Apps.objects.create(name="Jupyter Lab", slug="jupyter-lab", category=develop)),
+            (CustomAppInstance, Apps.objects.create(name="Custom App", slug="customapp", category=serve)),
+        ]
+
+        project_template = ProjectTemplate.objects.create(name="Template")
+        project_template.available_apps.set([app for _, app in self.app_types])
+        self.project.project_template = project_template
+        self.project.save()
+
+        self.n_instances = 0
+
+    def add_app_instances(self, n):
+        for _ in range(n):
+            for model_class, app in self.app_types:
+                self.n_instances += 1
+                model_class.objects.create(
+                    owner=self.user,
+                    name=f"test-app-{self.n_instances}",
+                    app=app,
+                    project=self.project,
+                    subdomain=Subdomain.objects.create(subdomain=f"test-overview-{self.n_instances}"),
+                    k8s_user_app_status=K8sUserAppStatus.objects.create(status="Running"),
+                )
+
+    def get_overview_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            resp = self.client.get(reverse("projects:details", kwargs={"project_slug": self.project.slug}))
+
+        self.assertEqual(resp.status_code, 200)
+        return context.captured_queries
+
+    def test_project_overview_query_count_is_constant(self):
+        self.add_app_instances(1)
+        # Warm up per-session state such as the session and permission caches
+        self.get_overview_queries()
+
+        n_queries_few_apps = len(self.get_overview_queries())
+
+        self.add_app_instances(20)
+        queries_many_apps = self.get_overview_queries()
+
+        self.assertEqual(
+            len(queries_many_apps),
+            n_queries_few_apps,
+            "\n".join(query["sql"] for query in queries_many_apps),
+        )
+        self.assertEqual(len(self.get_overview_queries()), n_queries_few_apps)
@@ -0,0 +1,146 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from apps.models import (
+    Apps,
+    BulkOperation,
+    CustomAppInstance,
+    ReleaseOperation,
+    Subdomain,
+    VolumeInstance,
+)
+from apps.tasks import run_bulk_operation
+from studio.celery import app
+
+from ..models import Project, ProjectLog
+from ..tasks import delete_project, start_project_workflow
+
+User = get_user_model()
+
+
+class ProjectWorkflowTestCase(TestCase):
+    """Test case for the workflows deploying and deleting the resources of the apps of a project."""
+
+    def setUp(self):
+        self.user = User.objects.create_user("foo1", "foo@test.com", "bar")
+        self.project = Project.objects.create_project(name="test-workflow", owner=self.user, description="")
+
+        volume_app = Apps.objects.create(name="Persistent Volume", slug="volumeK8s")
+        custom_app = Apps.objects.create(name="Custom App", slug="customapp")
+
+        self.volume = self.create_app_instance(VolumeInstance, volume_app, "test-workflow-volume")
+        self.app_instances = [
+            self.create_app_instance(CustomAppInstance, custom_app, f"test-workflow-app-{i}") for i in range(3)
+        ]
+
+        # Run the tasks of the workflow in process
+        app.conf.task_always_eager = True
+        app.conf.task_eager_propagates = True
+        self.addCleanup(setattr, app.conf, "task_always_eager", False)
+        self.addCleanup(setattr, app.conf, "task_eager_propagates", False)
+
+    def create_app_instance(self, model_class, app_, name):
+        return model_class.objects.create(
+            owner=self.user,
+            name=name,
+            app=app_,
+            project=self.project,
+            subdomain=Subdomain.objects.create(subdomain=name),
+            k8s_values={"subdomain": name, "namespace": "default"},
+        )
+
+    def test_delete_project_deletes_volumes_after_apps(self):
+        deleted = []
+
+        def fake_delete_resource(serialized_instance, initiated_by_str, release=None):
+            deleted.append(serialized_instance["pk"])
+            # The last app fails to be deleted
+            return serialized_instance["pk"] != self.app_instances[-1].pk
+
+        with patch("apps.tasks.delete_resource", side_effect=fake_delete_resource):
+            with self.captureOnCommitCallbacks(execute=True):
+                delete_project(self.project.pk)
+
+        self.assertCountEqual(deleted[:-1], [app_instance.pk for app_instance in self.app_instances])
+        self.assertEqual(deleted[-1], self.volume.pk)
+
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.status, "deleted")
+        self.assertIsNotNone(self.project.deleted_on)
+
+        for app_instance in [self.volume, *self.app_instances]:
+            app_instance.refresh_from_db()
+            self.assertEqual(app_instance.latest_user_action, "Deleting")
+
+        log = ProjectLog.objects.get(project=self.project, module="DE")
+        self.assertEqual(log.description, "Deleted the resources of 3 of 4 apps. Failed: test-workflow-app-2")
+
+    def test_delete_project_waits_for_the_running_operations_of_the_apps(self):
+        ReleaseOperation.objects.enqueue("test-workflow-app-0", ReleaseOperation.DEPLOY, self.app_instances[0])
+        ReleaseOperation.objects.claim_next()
+        ReleaseOperation.objects.enqueue("test-workflow-app-1", ReleaseOperation.DEPLOY, self.app_instances[1])
+
+        with patch("apps.tasks.delete_resource", return_value=True) as mock_delete:
+            with self.captureOnCommitCallbacks(execute=True):
+                delete_project(self.project.pk)
+
+        # The pending deploy is dropped and the release with a running deploy is not deleted meanwhile
+        deleted = [call.args[0]["pk"] for call in mock_delete.call_args_list]
+        self.assertCountEqual(deleted, [app_instance.pk for app_instance in self.app_instances[1:]])
+        self.assertFalse(ReleaseOperation.objects.filter(operation=ReleaseOperation.DEPLOY, started_on=None).exists())
+
+        # The volume is not deleted, and the project not marked as deleted, until the app behind the deploy is deleted
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.status, "active")
+
+    def test_deploy_workflow_deploys_volumes_before_apps_and_activates_the_project(self):
+        deployed = []
+
+        def fake_deploy_resource(serialized_instance, force):
+            deployed.append(serialized_instance["pk"])
+            return True
+
+        stages = [[self.volume.pk], [app_instance.pk for app_instance in self.app_instances]]
+
+        with patch("apps.tasks.deploy_resource", side_effect=fake_deploy_resource):
+            with self.captureOnCommitCallbacks(execute=True):
+                start_project_workflow(self.project, BulkOperation.DEPLOY, stages, project_status="active")
+
+        self.assertEqual(deployed[0], self.volume.pk)
+        self.assertCountEqual(deployed[1:], [app_instance.pk for app_instance in self.app_instances])
+
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.status, "active")
+        log = ProjectLog.objects.get(project=self.project, module="DE")
+        self.assertEqual(log.description, "Deployed the resources of 4 of 4 apps.")
+
+    @override_settings(PROJECT_WORKFLOW_CONCURRENCY=2)
+    def test_workflow_concurrency_is_bounded(self):
+        stages = [[self.volume.pk], [app_instance.pk for app_instance in self.app_instances]]
+
+        with patch("apps.tasks.run_bulk_operation.delay"):
+            bulk_operation = start_project_workflow(self.project, BulkOperation.DEPLOY, stages)
+
+        with patch("apps.tasks.run_release_operations.delay"):
+            run_bulk_operation(bulk_operation.pk)
+
+            # The apps are not queued before the volume is deployed
+            self.assertEqual(list(ReleaseOperation.objects.values_list("release", flat=True)), ["test-workflow-volume"])
+
+            ReleaseOperation.objects.all().delete()
+            bulk_operation.items.filter(app_instance=self.volume).update(status="succeeded")
+            run_bulk_operation(bulk_operation.pk)
+
+        self.assertEqual(ReleaseOperation.objects.count(), 2)
+
+    def test_workflow_without_app_instances_finishes_at_once(self):
+        self.project.status = "created"
+        self.project.save()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            start_project_workflow(self.project, BulkOperation.DEPLOY, [[], []], project_status="active")
+
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.status, "active")
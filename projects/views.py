@@ -1,4 +1,5 @@
 import logging
+from collections import defaultdict
 
 from django.apps import apps
 from django.conf import settings as django_settings
@@ -6,7 +7,7 @@ from django.contrib import messages
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import FieldDoesNotExist
-from django.db.models import Model, Q
+from django.db.models import Count, Model, Q
 from django.http import (
     HttpResponse,
     HttpResponseBadRequest,
@@ -21,6 +22,7 @@ from guardian.decorators import permission_required_or_403
 from guardian.shortcuts import assign_perm, get_users_with_perms, remove_perm
 
 from apps.app_registry import APP_REGISTRY
+from apps.models import BaseAppInstance
 from common.tasks import send_email_task
 
 from .exceptions import ProjectCreationException
@@ -566,52 +568,74 @@ class DetailsView(View):
     template_name = "projects/overview.html"
 
     def get(self, request, project_slug):
-        project = Project.objects.get(slug=project_slug)
+        project = Project.objects.select_related("owner", "project_template").get(slug=project_slug)
 
         if request.user.is_superuser and project.status == "deleted":
             return HttpResponse("This project has been deleted by the user.")
 
+        # The page is built on a fixed number of queries whatever the number of app instances.
+        # Instances and app types are fetched for all categories at once and grouped by category in Python.
+
         resources = []
         app_ids = []
         if request.user.is_superuser:
-            categories = AppCategories.objects.all().order_by("-priority")
+            categories = list(AppCategories.objects.all().order_by("-priority"))
         else:
-            categories = AppCategories.objects.all().exclude(slug__in=["admin-apps"]).order_by("-priority")
+            categories = list(AppCategories.objects.all().exclude(slug__in=["admin-apps"]).order_by("-priority"))
 
-        for category in categories:
-            # Get all subclasses of Base
-
-            instances_per_category_list = []
-            for orm_model in APP_REGISTRY.iter_orm_models():
-                # Filter instances of each subclass by project, user and status.
-                # See the get_app_instances_of_project_filter method in base.py
+        # See the get_app_instances_of_project_filter method in base.py
+        queryset = (
+            BaseAppInstance.objects.annotate_with_app_status()
+            .filter(~Q(atn_app_status="Deleted"), project=project, app__category__in=categories)
+            .order_by("-created_on")
+        )
+        instances = APP_REGISTRY.fetch_app_instances(
+            queryset,
+            model_filter=lambda orm_model: orm_model.objects.get_app_instances_of_user_filter(request.user),
+            select_related=["app", "k8s_user_app_status"],
+            prefetch_related=["tags"],
+        )
 
-                queryset_per_category = orm_model.objects.get_app_instances_of_project(
-                    user=request.user, project=project, filter_func=Q(app__category__slug=category.slug)
+        instances_per_category = defaultdict(list)
+        for instance in instances:
+            instances_per_category[instance.app.category_id].append(instance)
+            app_ids.append(instance.id)
+
+        # Filter the available apps specified in the project template
+        apps = []
+        if project.project_template is not None:
+            apps = (
+                Apps.objects.filter(
+                    category__in=categories,
+                    user_can_create=True,
+                    pk__in=project.project_template.available_apps.values("pk"),
                 )
+                .order_by("category", "slug", "-revision")
+                .distinct("category", "slug")
+            )
 
-                if queryset_per_category:
-                    # SS-1071 Added check for app_ids and instances_per_category
-                    # to avoid duplicates (e.g in case of shinyapps)
-                    app_ids += [obj.id for obj in queryset_per_category if obj.id not in app_ids]
-                    instances_per_category_list.extend(
-                        [instance for instance in queryset_per_category if instance not in instances_per_category_list]
-                    )
-
-            # Filter the available apps specified in the project template
-            available_apps = [app.pk for app in project.project_template.available_apps.all()]
-
-            apps_per_category = (
-                Apps.objects.filter(category=category, user_can_create=True, pk__in=available_apps)
-                .order_by("slug", "-revision")
-                .distinct("slug")
+        # Determine once per app type whether the user can create another app instance
+        num_of_app_instances = dict(
+            BaseAppInstance.objects.annotate_with_app_status()
+            .filter(~Q(atn_app_status="Deleted"), project=project)
+            .values_list("app__slug")
+            .annotate(Count("pk"))
+        )
+
+        apps_per_category = defaultdict(list)
+        for app in apps:
+            orm_model = APP_REGISTRY.get_orm_model(app.slug)
+            app.can_create = orm_model is not None and orm_model.objects.user_can_create(
+                request.user, project, app.slug, app=app, num_of_app_instances=num_of_app_instances.get(app.slug, 0)
             )
+            apps_per_category[app.category_id].append(app)
 
+        for category in categories:
             resources.append(
                 {
                     "title": category.name,
-                    "instances": instances_per_category_list,
-                    "apps": apps_per_category,
+                    "instances": instances_per_category[category.pk],
+                    "apps": apps_per_category[category.pk],
                     "timezone": "Europe/Stockholm Timezone",
                 }
             )
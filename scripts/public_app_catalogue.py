@@ -0,0 +1,7 @@
+from portal.models import PublicAppCatalogueEntry
+
+
+def run(*args):
+    """Rebuilds the public app catalogue from all public app instances"""
+
+    PublicAppCatalogueEntry.objects.rebuild()
@@ -38,6 +38,9 @@ if $INIT; then
     # This script goes through all app instances and assigns/removes permissions to users based on the instance access level
     python manage.py runscript app_instance_permissions
 
+    # This script builds the public app catalogue shown on the landing page from the public app instances
+    python manage.py runscript public_app_catalogue
+
     # HELM deployment: DJANGO_SUPERUSER_PASSWORD should be an env var within the stackn-studio pod
     # python manage.py createsuperuser --email $DJANGO_SUPERUSER_EMAIL --username $DJANGO_SUPERUSER --no-input
 
@@ -4,8 +4,11 @@ set -e
 # Giving time to studio container to run DB migrations
 sleep 25
 
+# The queues consumed by the worker. Separate workers can consume the deploys and housekeeping queues.
+CELERY_WORKER_QUEUES=${CELERY_WORKER_QUEUES:-celery,deploys,housekeeping}
+
 if $DEBUG ; then
-    watchmedo auto-restart -R --patterns="*.py" -- celery -A studio worker -l info --scheduler django
+    watchmedo auto-restart -R --patterns="*.py" -- celery -A studio worker -l info -Q $CELERY_WORKER_QUEUES --scheduler django
 else
-    celery -A studio worker -l info --scheduler django
+    celery -A studio worker -l info -Q $CELERY_WORKER_QUEUES --scheduler django
 fi
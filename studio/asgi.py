@@ -11,6 +11,16 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from studio.async_http import handle_lifespan
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "studio.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+
+async def application(scope, receive, send):
+    # The lifespan events of the server open and close the HTTP client session shared by the async views
+    if scope["type"] == "lifespan":
+        await handle_lifespan(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
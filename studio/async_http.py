@@ -0,0 +1,110 @@
+import asyncio
+import contextlib
+from typing import Any, AsyncIterator
+
+import aiohttp
+
+# Seconds to wait for a connection, and for the whole request, unless the caller sets another timeout
+CONNECT_TIMEOUT = 3.05
+TOTAL_TIMEOUT = 15
+# The maximum number of pooled connections in total and to a single host
+CONNECTION_LIMIT = 100
+CONNECTION_LIMIT_PER_HOST = 20
+
+# The session shared by the async views served by an ASGI server, and the event loop of the server
+_shared_session: aiohttp.ClientSession | None = None
+_shared_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _create_session() -> aiohttp.ClientSession:
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=CONNECTION_LIMIT, limit_per_host=CONNECTION_LIMIT_PER_HOST),
+        timeout=aiohttp.ClientTimeout(total=TOTAL_TIMEOUT, connect=CONNECT_TIMEOUT),
+        raise_for_status=True,
+    )
+
+
+async def open_shared_session() -> None:
+    """
+    Opens the session shared by the async views on the event loop of the ASGI server, at the lifespan startup.
+    """
+    global _shared_session, _shared_loop
+
+    _shared_loop = asyncio.get_running_loop()
+    _shared_session = _create_session()
+
+
+async def close_shared_session() -> None:
+    """
+    Closes the shared session, and the pooled connections, at the lifespan shutdown of the ASGI server.
+    """
+    global _shared_session, _shared_loop
+
+    if _shared_session is not None:
+        await _shared_session.close()
+
+    _shared_session = None
+    _shared_loop = None
+
+
+async def handle_lifespan(scope: dict, receive, send) -> None:
+    """
+    Handles the ASGI lifespan protocol, which Django does not handle, by opening the shared session
+    at the startup of the server and closing it at the shutdown.
+    """
+    while True:
+        message = await receive()
+
+        if message["type"] == "lifespan.startup":
+            await open_shared_session()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await close_shared_session()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+@contextlib.asynccontextmanager
+async def http_session() -> AsyncIterator[aiohttp.ClientSession]:
+    """
+    Provides the HTTP client session for the calls of the async views to external services.
+
+    On the event loop of the ASGI server, this is the shared session, which pools the connections.
+    Elsewhere, e.g. under the development server, where each async view runs on an event loop of its own,
+    a session is created for the block and closed at its end, so that no session outlives its event loop.
+    """
+    if _shared_session is not None and not _shared_session.closed and asyncio.get_running_loop() is _shared_loop:
+        yield _shared_session
+    else:
+        async with _create_session() as session:
+            yield session
+
+
+async def get_json(
+    url: str,
+    *,
+    params: dict[str, str] | None = None,
+    headers: dict[str, str] | None = None,
+    timeout: float | None = None,
+) -> Any:
+    """
+    Makes a GET request with the session of http_session and decodes the JSON response.
+
+    :param url str: The URL to request.
+    :param params dict: The query parameters of the request.
+    :param headers dict: The headers of the request.
+    :param timeout float: Seconds to wait for the whole request, instead of TOTAL_TIMEOUT.
+    :returns: The decoded JSON response.
+    :raises aiohttp.ClientError: If the request fails, times out or the response has an error status.
+    :raises ValueError: If the response is not valid JSON.
+    """
+    kwargs = {"params": params, "headers": headers}
+    if timeout is not None:
+        kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout, connect=CONNECT_TIMEOUT)
+
+    try:
+        async with http_session() as session:
+            async with session.get(url, **kwargs) as resp:
+                return await resp.json(content_type=None)
+    except asyncio.TimeoutError as e:
+        raise aiohttp.ServerTimeoutError(f"Request to {url} timed out") from e
@@ -346,6 +346,9 @@ REST_FRAMEWORK = {
     "DEFAULT_VERSION": "v1",
     "DEFAULT_RENDERER_CLASSES": ("rest_framework.renderers.JSONRenderer",),
     "DEFAULT_PARSER_CLASSES": ("rest_framework.parsers.JSONParser",),
+    "DEFAULT_THROTTLE_RATES": {
+        "container_image_search": "60/min",
+    },
 }
 
 # Tagulous serialization settings
@@ -369,11 +372,68 @@ CELERY_RESULT_SERIALIZER = "json"
 CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TIMEZONE = "UTC"
 CELERY_ENABLE_UTC = True
+# Helm deploys and deletes and the housekeeping tasks are routed to dedicated queues,
+# so that they do not delay each other nor the other tasks, e.g. emails, on the default queue
+CELERY_TASK_ROUTES = {
+    "apps.tasks.run_release_operations": {"queue": "deploys"},
+    "apps.tasks.deploy_resource": {"queue": "deploys"},
+    "apps.tasks.delete_resource": {"queue": "deploys"},
+    "apps.tasks.delete_old_objects": {"queue": "housekeeping"},
+    "apps.tasks.clean_up_apps_in_database": {"queue": "housekeeping"},
+    "apps.tasks.flush_k8s_status_write_buffer": {"queue": "housekeeping"},
+    "apps.tasks.process_release_queues": {"queue": "housekeeping"},
+    "apps.tasks.refill_standby_pools": {"queue": "housekeeping"},
+    "apps.tasks.reconcile_releases": {"queue": "housekeeping"},
+    "apps.tasks.deploy_standby_release": {"queue": "deploys"},
+    "apps.tasks.delete_standby_release": {"queue": "deploys"},
+}
+# Optional write-behind buffer on Redis for k8s status events that only update the time of an app status.
+# The buffered times are flushed to the database by the periodic task flush_k8s_status_write_buffer.
+K8S_STATUS_WRITE_BEHIND_ENABLED = os.getenv("K8S_STATUS_WRITE_BEHIND_ENABLED", default="False").lower() in (
+    "true",
+    "1",
+    "t",
+)
+K8S_STATUS_WRITE_BEHIND_REDIS_URL = CELERY_RESULT_BACKEND
+# Seconds to keep the buffered state of an idle release
+K8S_STATUS_WRITE_BEHIND_TTL = 3600
+
+# The maximum number of app resources queued for deploy or delete at a time when creating or deleting a project.
+# The queued operations also count against HELM_CONCURRENCY_LIMIT.
+PROJECT_WORKFLOW_CONCURRENCY = 4
+# The maximum number of app resources queued for deploy or delete at a time by a bulk operation in the admin.
+# The queued operations also count against HELM_CONCURRENCY_LIMIT.
+ADMIN_BULK_OPERATION_CONCURRENCY = 4
+# Whether to keep the values, and in development the manifest, of failed Helm deploys under charts/values
+HELM_KEEP_FAILED_DEPLOY_FILES = os.getenv("HELM_KEEP_FAILED_DEPLOY_FILES", default="False").lower() in (
+    "true",
+    "1",
+    "t",
+)
+# Seconds within which changed releases and app instances are not reconciled, since they may still be in progress
+RELEASE_RECONCILER_GRACE_PERIOD = 15 * 60
+# The maximum number of Helm deploys and deletes of queued release operations running at the same time
+HELM_CONCURRENCY_LIMIT = 8
+# The maximum number of standby releases of the warm pools of template projects deployed at a time.
+# They are only deployed in the room left under HELM_CONCURRENCY_LIMIT by the queued release operations.
+STANDBY_POOL_DEPLOY_LIMIT = 2
+# Helm deploys and deletes are queued per release and run one at a time.
+# A started release operation older than this number of seconds is considered abandoned.
+RELEASE_OPERATION_STALE_AFTER = 30 * 60
+# Seconds Helm waits for a deploy or delete, passed as --timeout. The Helm process is killed a minute later,
+# so this must stay below RELEASE_OPERATION_STALE_AFTER.
+HELM_TIMEOUT = 20 * 60
+
+# The content stats API serves a snapshot that is refreshed hourly by a periodic task.
+# A snapshot older than this number of seconds is recomputed on request.
+CONTENT_STATS_SNAPSHOT_MAX_AGE = 2 * 3600
 # For Model Objects creation (check models/models.py, pre_save_model() )
 VERSION_BACKEND = "studio.version.Version"
 
 # Other Helm/k8s deployment settings
 CHART_FOLDER = "/app/charts/apps"
+# The local cache of packaged OCI charts, warmed on worker start with the charts of all apps
+HELM_CHART_CACHE_DIR = os.path.join(BASE_DIR, "charts/.cache/helm/charts")
 EXTERNAL_KUBECONF = True
 KUBECONFIG = "/app/cluster.conf"
 NAMESPACE = "default"
@@ -383,6 +443,8 @@ STORAGECLASS = "local-path"
 # Docker hub API
 DOCKER_HUB_REPO_SEARCH = "https://hub.docker.com/v2/search/repositories"
 DOCKER_HUB_TAG_SEARCH = "https://hub.docker.com/v2/repositories"
+# Seconds that the image suggestions of a Docker Hub search are cached
+DOCKER_HUB_SEARCH_CACHE_TTL = 300
 DOCKER_HUB_TOKEN = os.getenv("DOCKER_HUB_TOKEN")
 DOCKER_HUB_USERNAME = os.getenv("DOCKER_HUB_USERNAME", "scilifelab-serve")
 
@@ -1,3 +1,4 @@
+import asyncio
 from datetime import datetime, timedelta, timezone
 
 import pytest
@@ -10,6 +11,7 @@ from common.models import EmailVerificationTable, UserProfile
 from projects.models import Project
 from scripts.app_instance_permissions import run
 
+from .async_http import handle_lifespan, http_session
 from .helpers import do_delete_account, do_pause_account
 from .system_version import SystemVersion
 
@@ -144,3 +146,37 @@ def test_system_version_get_gitref():
 def test_system_version_get_imagetag():
     actual = SystemVersion().get_imagetag()
     assert actual == ""
+
+
+def test_http_session_is_closed_without_a_server_loop():
+    async def use_session():
+        async with http_session() as session:
+            assert not session.closed
+        return session
+
+    assert asyncio.run(use_session()).closed
+
+
+def test_http_session_is_shared_during_the_server_lifespan():
+    async def serve():
+        messages = asyncio.Queue()
+        sent = []
+
+        async def send(message):
+            sent.append(message["type"])
+
+        await messages.put({"type": "lifespan.startup"})
+        lifespan = asyncio.create_task(handle_lifespan({"type": "lifespan"}, messages.get, send))
+        while not sent:
+            await asyncio.sleep(0)
+
+        async with http_session() as first, http_session() as second:
+            assert first is second
+
+        await messages.put({"type": "lifespan.shutdown"})
+        await lifespan
+
+        assert sent == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+        return first
+
+    assert asyncio.run(serve()).closed
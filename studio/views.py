@@ -1,6 +1,5 @@
 from typing import Any, Callable, cast
 
-import requests
 from django.conf import settings
 from django.contrib.auth import logout
 from django.contrib.auth.decorators import login_required
@@ -16,6 +15,7 @@ from rest_framework.permissions import BasePermission, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from api.services.lookups import get_university_name
 from apps.app_registry import APP_REGISTRY
 from apps.models import BaseAppInstance, Subdomain
 from common.models import UserProfile
@@ -213,20 +213,14 @@ def account_deleted(request: Response, user_id: int) -> Response:
 
 
 def __get_university_name(request: Response, code: str) -> str:
-    """Gets the university name by making an API call.
+    """Gets the university name from the in-process lookup.
     :param request: The request object.
     :param str code: The university code.
     :returns str name: The university name.
     """
-    # Get the affiliation name from an API call to /universities by code
-    # Note that reversing the url of openapi-v1 was not working
-    host = request.build_absolute_uri("/")
-    api_url = host + reverse("v1:openapi-lookups-universities")
-    logger.info(f"Making an API request to URL {api_url}")
-    response = requests.get(api_url, params={"code": code})
-
-    if response.status_code == 200:
-        data = response.json()["data"]
-        return cast(str, data["name"])
-    else:
-        raise Exception("API did not return status 200")
+    name = get_university_name(code)
+
+    if name is None:
+        raise Exception(f"No university found for the code {code}")
+
+    return name